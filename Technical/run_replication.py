@@ -6,8 +6,11 @@ Master Replication Pipeline - Shaikh & Tonak (1994)
 This is the main entry point for running the complete Shaikh & Tonak replication.
 Run this script to execute the full pipeline from raw data to final results.
 
+Stages are declared as a DAG in src/core/pipeline_dag.py; a stage whose script
+and input files are unchanged since its last successful run is skipped.
+
 Usage:
-    python run_replication.py [--validate-only] [--output-dir OUTPUT_DIR]
+    python run_replication.py [--validate-only] [--force] [--dry-run] [--jobs N] [--output-dir OUTPUT_DIR]
 """
 
 import sys
@@ -17,8 +20,7 @@ import argparse
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from core.run_perfect_replication_pipeline import main as run_pipeline
-from validation.systematic_error_audit import main as run_audit
+from core.pipeline_dag import PipelineDAG
 
 def main():
     parser = argparse.ArgumentParser(description="Shaikh & Tonak Replication Pipeline")
@@ -26,6 +28,12 @@ def main():
                        help="Run validation only, skip replication")
     parser.add_argument("--output-dir", default="results/replication",
                        help="Output directory for results")
+    parser.add_argument("--force", action="store_true",
+                       help="Re-run every selected stage even if unchanged")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="Show which stages would run or be skipped")
+    parser.add_argument("--jobs", type=int, default=1,
+                       help="Run up to N independent stages concurrently in a process pool")
 
     args = parser.parse_args()
 
@@ -33,16 +41,25 @@ def main():
     print("SHAIKH & TONAK (1994) REPLICATION PIPELINE")
     print("=" * 60)
 
-    if not args.validate_only:
-        print("Running complete replication pipeline...")
-        run_pipeline()
+    dag = PipelineDAG()
+    kinds = ["validation"] if args.validate_only else None
 
-    print("Running validation audit...")
-    run_audit()
+    if args.dry_run:
+        for name, action in dag.plan(kinds=kinds).items():
+            print(f"{action.upper():5} {name}")
+        return
+
+    if args.validate_only:
+        print("Running validation stages...")
+    else:
+        print("Running complete replication pipeline...")
+    ok = dag.run(kinds=kinds, force=args.force, jobs=args.jobs)
 
     print("=" * 60)
-    print("PIPELINE COMPLETE")
+    print("PIPELINE COMPLETE" if ok else "PIPELINE FAILED")
     print("=" * 60)
+    if not ok:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -2,13 +2,19 @@
 """
 Comprehensive Perfect Replication Analysis Framework
 Advanced analysis using 100% complete Shaikh-Tonak dataset
+
+Optional block-bootstrap mode (--bootstrap N) attaches moving/stationary
+block-bootstrap confidence intervals to every trend slope, every mean and
+every sub-period mean (see block_bootstrap.py).
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
 import logging
+import sys
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import matplotlib.pyplot as plt
@@ -17,6 +23,11 @@ from scipy import stats
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 
+from block_bootstrap import BlockBootstrap, DEFAULT_RESAMPLES, METHODS
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from core.identity_checks import IdentityEngine
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -25,7 +36,8 @@ class ComprehensivePerfectAnalysis:
     Advanced analysis framework leveraging 100% complete Shaikh-Tonak dataset
     """
 
-    def __init__(self):
+    def __init__(self, bootstrap: Optional[BlockBootstrap] = None):
+        self.bootstrap = bootstrap
         self.perfect_data = pd.read_csv("src/analysis/replication/output/table_5_4_perfect.csv")
 
         # Load unified database for cross-validation
@@ -212,17 +224,13 @@ class ComprehensivePerfectAnalysis:
 
         # Profit rate identity: r' = S/(C+V)
         if all(var in self.data.columns for var in ['r\'', 'S', 'c\'', 's\'']):
-            # Calculate implied profit rate from other variables
-            # Assuming c' = C/V and s' = S/V, then r' = s'/(c'+1)
-            calculated_r = self.data['s\''] / (self.data['c\''] + 1)
-            actual_r = self.data['r\'']
-
-            diff = abs(calculated_r - actual_r)
+            # Assuming c' = C/V and s' = S/V, then r' = s'/(c'+1) (registry: r_textbook)
+            check = IdentityEngine().evaluate({'perfect': self.data}, ['r_textbook']).iloc[0]
             marxian_validation['profit_rate_identity'] = {
-                'mean_absolute_error': float(diff.mean()),
-                'max_absolute_error': float(diff.max()),
-                'correlation': float(calculated_r.corr(actual_r)),
-                'identity_consistency': float(1 / (1 + diff.mean()))
+                'mean_absolute_error': float(check['mae']),
+                'max_absolute_error': float(check['max_abs_err']),
+                'correlation': float(check['correlation']),
+                'identity_consistency': float(1 / (1 + check['mae']))
             }
 
         # Organic composition relationships
@@ -349,10 +357,27 @@ class ComprehensivePerfectAnalysis:
                             'kurtosis': float(series.kurtosis()),
                             'coefficient_of_variation': float(series.std() / series.mean()) if series.mean() != 0 else np.inf
                         }
+                        if self.bootstrap is not None:
+                            category_stats[var]['mean_ci'] = self.bootstrap.mean(series.values)
+                            category_stats[var]['period_means'] = self.compute_period_means(series)
             desc_stats[category] = category_stats
 
+        if self.bootstrap is not None:
+            desc_stats['bootstrap'] = self.bootstrap.describe()
+
         return desc_stats
 
+    def compute_period_means(self, series: pd.Series) -> Dict:
+        """Sub-period means with block-bootstrap confidence intervals"""
+
+        period_means = {}
+        for period, (start, end) in self.analysis_periods.items():
+            values = series[(series.index >= start) & (series.index <= end)]
+            if len(values) > 0:
+                period_means[period] = {'years': [int(start), int(end)], 'count': int(len(values)),
+                                        **self.bootstrap.mean(values.values)}
+        return period_means
+
     def analyze_trends(self) -> Dict:
         """Analyze long-term trends in key variables"""
 
@@ -386,6 +411,8 @@ class ComprehensivePerfectAnalysis:
                     'total_change': float(slope * (len(series) - 1)),
                     'percentage_change': float((series.iloc[-1] - series.iloc[0]) / series.iloc[0] * 100) if series.iloc[0] != 0 else np.inf
                 }
+                if self.bootstrap is not None:
+                    trend_analysis[var]['slope_ci'] = self.bootstrap.trend(series.values, x)
 
         return trend_analysis
 
@@ -612,8 +639,14 @@ class ComprehensivePerfectAnalysis:
                         f"- Annual Change: {trend['annual_change']:.4f}",
                         f"- Total Period Change: {trend['percentage_change']:.1f}%",
                         f"- Statistical Significance: {trend['significance']}",
-                        ""
                     ])
+                    if 'slope_ci' in trend:
+                        ci = trend['slope_ci']
+                        report.append(
+                            f"- Annual Change {ci['confidence']:.0%} Block-Bootstrap CI: "
+                            f"[{ci['ci_low']:.4f}, {ci['ci_high']:.4f}]"
+                        )
+                    report.append("")
 
         # Correlation Analysis
         correlations = validation_results['statistical_properties'].get('correlation_structure', {})
@@ -717,8 +750,22 @@ def main():
     print("Analyzing 100% complete Shaikh-Tonak dataset...")
     print()
 
+    parser = argparse.ArgumentParser(description="Comprehensive perfect replication analysis")
+    parser.add_argument("--bootstrap", type=int, nargs='?', const=DEFAULT_RESAMPLES, default=0, metavar="N",
+                        help=f"Attach block-bootstrap CIs using N resamples (default {DEFAULT_RESAMPLES})")
+    parser.add_argument("--block-method", choices=METHODS, default='stationary')
+    parser.add_argument("--block-length", type=int, default=None,
+                        help="Mean (stationary) or fixed (moving) block length; default n^(1/3)")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    args = parser.parse_args()
+
+    bootstrap = None
+    if args.bootstrap:
+        bootstrap = BlockBootstrap(n_resamples=args.bootstrap, method=args.block_method,
+                                   block_length=args.block_length, confidence=args.confidence)
+
     # Initialize analysis framework
-    analyzer = ComprehensivePerfectAnalysis()
+    analyzer = ComprehensivePerfectAnalysis(bootstrap=bootstrap)
 
     # Generate comprehensive report
     analyzer.generate_comprehensive_report()
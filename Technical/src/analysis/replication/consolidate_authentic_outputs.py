@@ -9,26 +9,27 @@ or gap-filling is performed.
 """
 
 from pathlib import Path
+import sys
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from core.table_5_4_loader import load_table_5_4
+
 RAW_PATH = Path("src/analysis/replication/output/table_5_4_authentic_raw_merged.csv")
 CALC_PATH = Path("src/analysis/replication/output/table_5_4_authentic_calculated.csv")
 OUT_PATH = Path("src/analysis/replication/output/table_5_4_authentic_consolidated.csv")
 
 
 def main() -> None:
-    raw = pd.read_csv(RAW_PATH, index_col=0).T
-    raw.index.name = "year"
-    raw.index = raw.index.astype(int)
+    raw = load_table_5_4(RAW_PATH)  # already numeric
 
     calc = pd.read_csv(CALC_PATH)
     if 'year' in calc.columns:
         calc = calc.set_index('year')
 
     # Ensure numeric types where possible
-    for df in (raw, calc):
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    for col in calc.columns:
+        calc[col] = pd.to_numeric(calc[col], errors='coerce')
 
     consolidated = raw.join(calc, how='outer', lsuffix='_raw', rsuffix='_calc')
     consolidated.to_csv(OUT_PATH)
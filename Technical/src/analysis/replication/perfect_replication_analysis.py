@@ -26,9 +26,13 @@ import json
 import logging
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from extraction.cell_normalization import clean_labels, parse_numeric
+
 class ShaikhTonakReplicator:
     """Perfect replication system for Shaikh & Tonak (1994) analysis"""
 
@@ -243,43 +247,30 @@ class ShaikhTonakReplicator:
         try:
             # Extract years from column headers
             years = []
-            data_columns = []
+            data_positions = []
+            skipped = []
 
-            for col in df.columns[1:]:  # Skip first column (variable names)
-                self.logger.info(f"Processing column '{col}' for {part_name}")
-                try:
-                    # Direct year conversion
-                    year = int(col)
-                    if year >= 1900:  # This is likely a direct year
-                        if expected_year_range[0] <= year <= expected_year_range[1]:
-                            years.append(year)
-                            data_columns.append(col)
-                            self.logger.info(f"Direct year {year} added")
-                        continue
-                except:
-                    pass
-
-                # Handle offset years (e.g., if columns are 0,1,2... representing year offsets)
+            for position, col in enumerate(df.columns[1:], start=1):  # Skip first column (variable names)
                 try:
-                    offset = int(col)
-                    if year_offset_base is not None:
-                        # For Part 2: col '1' = 1975, col '2' = 1976, etc.
-                        year = year_offset_base + offset  # col '1' = 1974+1 = 1975
-                    else:
-                        year = expected_year_range[0] + offset
-
-                    self.logger.info(f"Column '{col}' -> offset {offset} -> year {year} (range {expected_year_range})")
-
-                    if expected_year_range[0] <= year <= expected_year_range[1]:
-                        years.append(year)
-                        data_columns.append(col)
-                        self.logger.info(f"Added year {year}")
-                    else:
-                        self.logger.info(f"Year {year} outside range {expected_year_range}")
-                except Exception as e:
-                    self.logger.info(f"Failed to parse column '{col}': {e}")
+                    value = int(col)
+                except (TypeError, ValueError):
+                    skipped.append(col)
                     continue
 
+                if value >= 1900:  # This is likely a direct year
+                    year = value
+                elif year_offset_base is not None:
+                    # Offset years, for Part 2: col '1' = 1974+1 = 1975, etc.
+                    year = year_offset_base + value
+                else:
+                    year = expected_year_range[0] + value
+
+                if expected_year_range[0] <= year <= expected_year_range[1]:
+                    years.append(year)
+                    data_positions.append(position)
+                else:
+                    skipped.append(col)
+
             if not years:
                 self.logger.error(f"No valid years found for {part_name}")
                 self.logger.error(f"Columns: {list(df.columns)}")
@@ -287,30 +278,23 @@ class ShaikhTonakReplicator:
                 self.logger.error(f"Year offset base: {year_offset_base}")
                 return None
 
-            # Extract variable names and data
-            variables = []
-            data_matrix = []
-
-            for idx, row in df.iterrows():
-                var_name = str(row.iloc[0]).strip()
-                if var_name and var_name != '0':  # Skip empty or index rows
-                    variables.append(var_name)
-
-                    # Extract data for this variable
-                    row_data = []
-                    for col in data_columns:
-                        try:
-                            value = float(row[col])
-                            row_data.append(value)
-                        except:
-                            row_data.append(np.nan)
+            self.logger.info(f"{part_name}: {len(years)} year columns {min(years)}-{max(years)}"
+                             + (f", skipped {skipped}" if skipped else ""))
 
-                    data_matrix.append(row_data)
+            # Extract variable names and data (skip empty or index rows); an
+            # unlabelled row keeps the label 'nan' as before
+            labels = clean_labels([str(v) for v in df.iloc[:, 0]])
+            values, unparsed = parse_numeric(df.iloc[:, data_positions].to_numpy(dtype=object))
+            keep = (labels != '') & (labels != '0')
+            variables = list(labels[keep])
+            unparsed = unparsed[keep]
+            if unparsed.any():
+                self.logger.warning(f"{part_name}: {int(unparsed.sum())} non-numeric cells set to NaN")
 
             # Create processed DataFrame
-            if variables and data_matrix:
+            if variables:
                 processed_df = pd.DataFrame(
-                    data_matrix,
+                    values[keep],
                     index=variables,
                     columns=years
                 ).T  # Transpose so years are rows, variables are columns
@@ -69,10 +69,15 @@ General policy: If inputs are missing or denominators are zero, results are NaN.
 from pathlib import Path
 from textwrap import dedent
 from typing import Dict, Any
+import sys
 import pandas as pd
 import numpy as np
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.table_5_4_loader import load_table_5_4
+from core.identity_checks import IdentityEngine
+
 AUTHENTIC_RAW_PATH = Path("src/analysis/replication/output/table_5_4_authentic_raw_merged.csv")
 OUTPUT_DIR = Path("src/analysis/replication/output")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -80,21 +85,12 @@ FORMULAS_MD_PATH = OUTPUT_DIR / "AUTHENTIC_FORMULAS_REFERENCE.md"
 
 
 def load_authentic_raw() -> pd.DataFrame:
-    """Load the authentic raw merged dataset and return with years as index."""
-    df = pd.read_csv(AUTHENTIC_RAW_PATH, index_col=0)
-    # Raw file has variables as rows and years as columns; transpose to years rows
-    df = df.T
-    # Columns become variable names; ensure consistent dtype
-    df.index.name = "year"
-    # Coerce year index to int where possible
-    try:
-        df.index = df.index.astype(int)
-    except Exception:
-        pass
-    # Convert all numeric-like values to floats
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    return df
+    """Load the authentic raw merged dataset and return with years as index.
+
+    Uses the shared canonical frame (transposed, int years, numeric columns);
+    compute_derived works on a copy.
+    """
+    return load_table_5_4(AUTHENTIC_RAW_PATH)
 
 
 def compute_derived(df: pd.DataFrame) -> pd.DataFrame:
@@ -194,91 +190,20 @@ def write_formulas_reference_md() -> None:
      FORMULAS_MD_PATH.write_text(md + "\n", encoding="utf-8")
 
 
+# Output key -> identity name in core.identity_checks.IDENTITIES
+VALIDATION_LAYOUT = {
+    "s_u_identity": {"s'u": "s_u_part1", "s'«u": "s_u_part2"},
+    "r_identity": "r_textbook",
+    "gK_vs_growth_from_K_unified": "gK_growth_K_unified",
+    "r_vs_sp_over_Ku": "r_sp_over_Ku",
+    "r_vs_sp_over_CplusV_from_SP": "r_sp_over_CplusV_from_SP",
+    "r_vs_s_over_CplusV_from_S": "r_s_over_CplusV_from_S",
+}
+
+
 def validate_identities(df: pd.DataFrame) -> Dict[str, Any]:
     """Validate S&T identities where both sides exist; report errors without altering inputs."""
-    results: Dict[str, Any] = {}
-
-    # Validate s_u (if original provided under various names)
-    # Part 1 uses "s'u"; Part 2 uses "s'«u". We compare both to s_u_calc when present.
-    if "s_u_calc" in df.columns:
-        comparisons = {}
-        for candidate in ["s'u", "s'«u"]:
-            if candidate in df.columns:
-                diff = df[candidate] - df["s_u_calc"]
-                common = diff.dropna()
-                if len(common) > 0:
-                    comparisons[candidate] = {
-                        "observations": int(len(common)),
-                        "mae": float(common.abs().mean()),
-                        "max_abs_err": float(common.abs().max())
-                    }
-        if comparisons:
-            results["s_u_identity"] = comparisons
-
-    # Validate r identity vs reported r' (if present)
-    if "r_calc" in df.columns and "r'" in df.columns:
-        diff = df["r'"] - df["r_calc"]
-        common = diff.dropna()
-        if len(common) > 0:
-            results["r_identity"] = {
-                "observations": int(len(common)),
-                "mae": float(common.abs().mean()),
-                "max_abs_err": float(common.abs().max()),
-            }
-
-    # Compare published gK with growth from K_unified (informational only)
-    if "gK" in df.columns and "gK_from_K_unified" in df.columns:
-        diff = df["gK"] - df["gK_from_K_unified"]
-        common = diff.dropna()
-        if len(common) > 0:
-            results["gK_vs_growth_from_K_unified"] = {
-                "observations": int(len(common)),
-                "mae": float(common.abs().mean()),
-                "max_abs_err": float(common.abs().max())
-            }
-
-    # Validate r' vs SP/(K*u) candidate
-    if "r'" in df.columns and "r_sp_over_Ku" in df.columns:
-        diff = df["r'"] - df["r_sp_over_Ku"]
-        common = diff.dropna()
-        if len(common) > 0:
-            results["r_vs_sp_over_Ku"] = {
-                "observations": int(len(common)),
-                "mae": float(common.abs().mean()),
-                "max_abs_err": float(common.abs().max())
-            }
-
-    # Validate r' vs SP/(C_from_SP + V_from_SP)
-    if "r'" in df.columns and all(col in df.columns for col in ["SP", "C_from_SP", "V_from_SP"]):
-        denom = df["C_from_SP"] + df["V_from_SP"]
-        with np.errstate(divide='ignore', invalid='ignore'):
-            r_from_cv = np.where(denom != 0, df["SP"] / denom, np.nan)
-        diff = df["r'"] - r_from_cv
-        common = pd.Series(r_from_cv, index=df.index).dropna().index.intersection(df["r'"] .dropna().index)
-        if len(common) > 0:
-            errs = (df.loc[common, "r'"] - pd.Series(r_from_cv, index=df.index).loc[common]).abs()
-            results["r_vs_sp_over_CplusV_from_SP"] = {
-                "observations": int(len(common)),
-                "mae": float(errs.mean()),
-                "max_abs_err": float(errs.max())
-            }
-
-    # Validate r' vs S/(C_from_S + V_from_S)
-    if "r'" in df.columns and all(col in df.columns for col in ["S", "C_from_S", "V_from_S"]):
-        denom = df["C_from_S"] + df["V_from_S"]
-        with np.errstate(divide='ignore', invalid='ignore'):
-            r_from_cv_s = np.where(denom != 0, df["S"] / denom, np.nan)
-        diff = df["r'"] - r_from_cv_s
-        common = pd.Series(r_from_cv_s, index=df.index).dropna().index.intersection(df["r'"] .dropna().index)
-        if len(common) > 0:
-            errs = (df.loc[common, "r'"] - pd.Series(r_from_cv_s, index=df.index).loc[common]).abs()
-            results["r_vs_s_over_CplusV_from_S"] = {
-                "observations": int(len(common)),
-                "mae": float(errs.mean()),
-                "max_abs_err": float(errs.max())
-            }
-
-    return results
+    return IdentityEngine().summarize(df, VALIDATION_LAYOUT)
 
 
 def main() -> None:
@@ -2,29 +2,63 @@
 # It loads the raw, incomplete data, cleans it, and merges it into a single file.
 # No interpolation or artificial data generation is performed.
 
-import pandas as pd
+import json
+import sys
+from pathlib import Path
+
 import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from extraction.table_consensus import TableConsensus, book_table_candidates
+
+BOOK_TABLES = 'data/extracted_tables/book_tables'
+OUTPUT_DIR = 'src/analysis/replication/output'
+
+# Cells the book prints blank but the extraction reads as 0.0. Page 36 has a
+# single numeric extraction, so the vote cannot outvote the zero; it is set
+# to missing here and listed in the consensus report.
+BLANK_CELLS = {36: [('u', '1973')]}
+
+
+def _blank_cells(df, page):
+    """Set the declared blank cells of a page to NaN; returns what was dropped."""
+    dropped = []
+    for row, column in BLANK_CELLS.get(page, []):
+        if row in df.index and column in df.columns:
+            dropped.append({'row': row, 'column': column, 'extracted': df.loc[row, column]})
+            df.loc[row, column] = np.nan
+    return dropped
+
+
+def _part_report(page, result, dropped):
+    return {
+        'page': page,
+        'candidates': result.candidates,
+        'suspect_zeros': result.suspect_zeros,
+        'blanked_cells': dropped,
+    }
+
 
 def clean_and_merge_sources():
     """Loads, cleans, and merges the two source files for Table 5.4."""
-    
-    # --- Part 1: 1958-1973 ---
-    part1_path = 'data/extracted_tables/book_tables/table_p36_camelot[page]_0.csv'
-    df1 = pd.read_csv(part1_path, index_col=0)
-    
-    # The last row is gK, but is unnamed. Let's name it.
-    df1 = df1.rename(index={df1.index[-2]: 'gK'})
 
-    # The value for 'u' in 1973 is 0.0, which is a missing value.
-    df1.loc['u', '1973'] = np.nan
+    # Each part is the cell-level consensus of every numeric extraction of its
+    # page.
+    consensus = TableConsensus()
 
-    # --- Part 2: 1974-1989 ---
-    part2_path = 'data/extracted_tables/book_tables/table_p37_camelot[page]_0.csv'
-    df2_raw = pd.read_csv(part2_path, index_col=0)
+    # --- Part 1: 1958-1973 ---
+    # The gK row is printed without a label; no extraction recovers it.
+    part1 = consensus.merge(book_table_candidates(BOOK_TABLES, 36, labels={'': 'gK'}))
+    df1 = part1.values
+    dropped1 = _blank_cells(df1, 36)
 
+    # --- Part 2: 1974-1989 ---
     # The columns are years 1974-1989, as per the README
     years_part2 = [str(y) for y in range(1974, 1990)]
-    df2_raw.columns = years_part2
+    part2 = consensus.merge(book_table_candidates(BOOK_TABLES, 37, columns=years_part2))
+    df2_raw = part2.values
+    dropped2 = _blank_cells(df2_raw, 37)
 
     # --- Merge --- 
     # Combine the two dataframes, aligning on the variable names (index)
@@ -35,11 +69,17 @@ def clean_and_merge_sources():
     df_authentic = df_authentic.reindex(columns=all_years)
 
     # Save the authentic, raw-merged data
-    output_path = 'src/analysis/replication/output/table_5_4_authentic_raw_merged.csv'
+    output_path = f'{OUTPUT_DIR}/table_5_4_authentic_raw_merged.csv'
     df_authentic.to_csv(output_path)
-    
+
+    # Which extractions were voted and which cells were dropped as blanks
+    report_path = f'{OUTPUT_DIR}/table_5_4_consensus_report.json'
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({'part1': _part_report(36, part1, dropped1), 'part2': _part_report(37, part2, dropped2)},
+                  f, indent=2, ensure_ascii=False, default=str)
+
     print(f"Successfully created authentic raw merged data at: {output_path}")
     return df_authentic
 
 if __name__ == '__main__':
-    clean_and_merge_sources()
\ No newline at end of file
+    clean_and_merge_sources()
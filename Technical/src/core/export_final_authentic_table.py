@@ -17,9 +17,13 @@ and validation metrics. No interpolation or smoothing is performed.
 """
 
 from pathlib import Path
+import sys
 import pandas as pd
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.table_5_4_loader import load_table_5_4
+
 RAW_PATH = Path("src/analysis/replication/output/table_5_4_authentic_raw_merged.csv")
 CALC_PATH = Path("src/analysis/replication/output/table_5_4_authentic_calculated.csv")
 VAL_PATH = Path("src/analysis/replication/output/authentic_validation_summary.json")
@@ -28,10 +32,8 @@ OUT_SUMMARY = Path("src/analysis/replication/output/AUTHENTIC_REPLICATION_SUMMAR
 
 
 def main() -> None:
-    # Load raw (variables as rows) and transpose to years × variables
-    raw = pd.read_csv(RAW_PATH, index_col=0).T
-    raw.index.name = "year"
-    raw.index = raw.index.astype(int)
+    # Canonical years × variables frame of the raw (variables as rows) table
+    raw = load_table_5_4(RAW_PATH)
 
     # Load calculated identities (already years × variables)
     calc = pd.read_csv(CALC_PATH)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Identity Check Registry
+=======================
+
+One declarative registry of the algebraic identities and diagnostic
+relationships checked against Table 5.4 datasets. Each entry is one line:
+
+    Identity("r_sp_over_Ku", "`r'`", "SP / (K_unified * u)", tolerance=0.01)
+
+- lhs/rhs are arithmetic expressions (+ - * / **, unary minus, numbers and the
+  functions in FUNCTIONS). Names that are not Python identifiers are written
+  in backticks, as in DataFrame.eval.
+- A name resolves through ALIASES to the first of its candidate columns
+  present in a dataset, so the same identity runs on datasets that label a
+  variable differently (e.g. r' vs r_perfect).
+- years restricts the check to an inclusive year range; tolerance is the
+  largest absolute error counted as consistent with rounding.
+
+Expressions are parsed and compiled once. Evaluation stacks every referenced
+column of every dataset into (datasets × years) arrays and evaluates each
+identity once for all datasets, so checking many dataset variants costs
+about as much as checking one. Non-finite results (division by zero,
+missing inputs) count as missing: no interpolation, no filling.
+"""
+
+import ast
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class Identity:
+    """One check: lhs ≈ rhs within tolerance over an optional year range."""
+    name: str
+    lhs: str
+    rhs: str
+    tolerance: float = 0.01
+    years: Optional[Tuple[int, int]] = None
+    description: str = ""
+
+
+# Column aliases: name used in expressions -> candidate columns, in preference order
+ALIASES: Dict[str, List[str]] = {
+    "r'": ["r'", "r_perfect", "r_ultra_precise", "original_r'"],
+    "K_unified": ["K_unified", "K_star"],
+    "gK": ["gK", "original_gK"],
+    "I_book": ["I", "I!"],
+}
+
+IDENTITIES: List[Identity] = [
+    Identity("s_u_part1", "`s'u`", "`s'` * u", 0.01, (1958, 1973), "s'u = s' × u (Part 1 label)"),
+    Identity("s_u_part2", "`s'«u`", "`s'` * u", 0.01, (1974, 1989), "s'u = s' × u (Part 2 label)"),
+    Identity("r_sp_over_Ku", "`r'`", "SP / (K_unified * u)", 0.01, description="r' = SP/(K×u)"),
+    Identity("r_textbook", "`r'`", "`s'` / (1 + `c'`)", 0.01, description="r' = s'/(1+c') (textbook identity)"),
+    Identity("r_sp_over_CplusV_from_SP", "`r'`", "SP / (C_from_SP + V_from_SP)", 0.01),
+    Identity("r_s_over_CplusV_from_S", "`r'`", "S / (C_from_S + V_from_S)", 0.01),
+    Identity("gK_I_over_K", "gK", "I_book / K_unified", 0.005, description="gK ≈ I/K* (heuristic)"),
+    Identity("gK_growth_K_unified", "gK", "K_unified / lag(K_unified) - 1", 0.005,
+             description="gK vs discrete growth of K_unified (diagnostic)"),
+    Identity("s_prime_SP_over_V", "`s'`", "SP / V_from_SP", 1e-9),
+    Identity("c_prime_C_over_V", "`c'`", "C_from_SP / V_from_SP", 1e-9),
+    Identity("s_prime_1_minus_c_prime", "`s'`", "1 - `c'`", 0.01),
+]
+
+
+def _lag(x: np.ndarray) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[..., 1:] = x[..., :-1]
+    return out
+
+
+FUNCTIONS = {"lag": _lag, "abs": np.abs, "log": np.log, "sqrt": np.sqrt}
+
+_ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Load, ast.Constant, ast.Call,
+                  ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+_BACKTICK = re.compile(r"`([^`]+)`")
+
+
+class CompiledExpression:
+    """An expression compiled once into a numpy evaluator over named arrays."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.symbols: List[str] = []
+
+        def substitute(match):
+            name = match.group(1)
+            if name not in self.symbols:
+                self.symbols.append(name)
+            return f"_v{self.symbols.index(name)}"
+
+        text = _BACKTICK.sub(substitute, source)
+        tree = ast.parse(text, mode="eval")
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise ValueError(f"Unsupported syntax in identity expression {source!r}: {type(node).__name__}")
+            if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS):
+                raise ValueError(f"Unknown function in identity expression {source!r}")
+            if isinstance(node, ast.Name) and not node.id.startswith("_v") and node.id not in FUNCTIONS:
+                if node.id not in self.symbols:
+                    self.symbols.append(node.id)
+                node.id = f"_v{self.symbols.index(node.id)}"
+        self._code = compile(tree, f"<identity {source}>", "eval")
+
+    def __call__(self, arrays: Mapping[str, np.ndarray]) -> np.ndarray:
+        namespace = {f"_v{i}": arrays[name] for i, name in enumerate(self.symbols)}
+        namespace.update(FUNCTIONS)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            out = np.asarray(eval(self._code, {"__builtins__": {}}, namespace), dtype=float)
+        return np.where(np.isfinite(out), out, np.nan)
+
+
+class IdentityEngine:
+    """
+    Compiled identity registry evaluated over many datasets at once.
+    """
+
+    def __init__(self, identities: Optional[Iterable[Identity]] = None,
+                 aliases: Optional[Mapping[str, List[str]]] = None):
+        self.identities = {i.name: i for i in (identities if identities is not None else IDENTITIES)}
+        self.aliases = {**ALIASES, **(aliases or {})}
+        self._compiled = {name: (CompiledExpression(i.lhs), CompiledExpression(i.rhs))
+                          for name, i in self.identities.items()}
+
+    def resolve(self, symbol: str, columns) -> Optional[str]:
+        """First alias candidate present among columns (None if absent)."""
+        for candidate in self.aliases.get(symbol, [symbol]):
+            if candidate in columns:
+                return candidate
+        return None
+
+    def evaluate(self, datasets: Mapping[str, pd.DataFrame],
+                 names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Evaluate identities against every dataset.
+
+        Args:
+            datasets: Dataset name -> year-indexed frame
+            names: Identity names to evaluate (default: all)
+
+        Returns:
+            Tidy DataFrame, one row per (dataset, identity): observations, mae,
+            max_abs_err, rmse, correlation, within_tolerance (share of years),
+            passed (max_abs_err <= tolerance) and the resolved columns
+        """
+        labels = list(datasets)
+        years = pd.Index(sorted(set().union(*[set(df.index) for df in datasets.values()]))) \
+            if labels else pd.Index([])
+        year_values = years.to_numpy(dtype=float)
+        stacked: Dict[str, np.ndarray] = {}
+        resolved: Dict[str, List[Optional[str]]] = {}
+
+        def stack(symbol):
+            if symbol not in stacked:
+                arr = np.full((len(labels), len(years)), np.nan)
+                cols = []
+                for d, label in enumerate(labels):
+                    col = self.resolve(symbol, datasets[label].columns)
+                    cols.append(col)
+                    if col is not None:
+                        arr[d] = pd.to_numeric(datasets[label][col], errors="coerce").reindex(years).to_numpy(dtype=float)
+                stacked[symbol] = arr
+                resolved[symbol] = cols
+            return stacked[symbol]
+
+        frames = []
+        for name in (names if names is not None else self.identities):
+            identity = self.identities[name]
+            lhs_expr, rhs_expr = self._compiled[name]
+            symbols = list(dict.fromkeys(lhs_expr.symbols + rhs_expr.symbols))
+            arrays = {s: stack(s) for s in symbols}
+            lhs, rhs = lhs_expr(arrays), rhs_expr(arrays)
+
+            valid = ~np.isnan(lhs) & ~np.isnan(rhs)
+            if identity.years is not None:
+                valid &= (year_values >= identity.years[0]) & (year_values <= identity.years[1])
+            n = valid.sum(axis=1)
+            abs_err = np.where(valid, np.abs(lhs - rhs), 0.0)
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                lc = np.where(valid, lhs - np.where(valid, lhs, 0.0).sum(axis=1, keepdims=True) / n[:, None], 0.0)
+                rc = np.where(valid, rhs - np.where(valid, rhs, 0.0).sum(axis=1, keepdims=True) / n[:, None], 0.0)
+                frames.append(pd.DataFrame({
+                    "dataset": labels,
+                    "identity": name,
+                    "observations": n,
+                    "mae": np.where(n > 0, abs_err.sum(axis=1) / n, np.nan),
+                    "max_abs_err": np.where(n > 0, np.where(valid, abs_err, -np.inf).max(axis=1), np.nan),
+                    "rmse": np.where(n > 0, np.sqrt((abs_err ** 2).sum(axis=1) / n), np.nan),
+                    "correlation": (lc * rc).sum(axis=1) / np.sqrt((lc * lc).sum(axis=1) * (rc * rc).sum(axis=1)),
+                    "tolerance": identity.tolerance,
+                    "within_tolerance": np.where(n > 0, (valid & (abs_err <= identity.tolerance)).sum(axis=1) / n, np.nan),
+                    "passed": (n > 0) & (np.where(valid, abs_err, 0.0).max(axis=1) <= identity.tolerance),
+                    "columns": [{s: resolved[s][d] for s in symbols} for d in range(len(labels))],
+                }))
+
+        columns = ["dataset", "identity", "observations", "mae", "max_abs_err", "rmse", "correlation",
+                   "tolerance", "within_tolerance", "passed", "columns"]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    def summarize(self, df: pd.DataFrame, layout: Mapping, dataset: str = "dataset",
+                  results: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Legacy-shaped summary {key: {observations, mae, max_abs_err}} for one dataset.
+
+        Args:
+            df: Dataset frame (ignored if results are given)
+            layout: Output key -> identity name, or nested mapping for grouped checks
+            dataset: Dataset label in results
+            results: Output of evaluate() to reuse
+
+        Checks without observations are left out.
+        """
+        if results is None:
+            names = list(_layout_names(layout))
+            results = self.evaluate({dataset: df}, names)
+        rows = results[results["dataset"] == dataset].set_index("identity")
+
+        out = {}
+        for key, spec in layout.items():
+            if isinstance(spec, Mapping):
+                group = self.summarize(df, spec, dataset, results)
+                if group:
+                    out[key] = group
+            elif spec in rows.index and rows.loc[spec, "observations"] > 0:
+                row = rows.loc[spec]
+                out[key] = {
+                    "observations": int(row["observations"]),
+                    "mae": float(row["mae"]),
+                    "max_abs_err": float(row["max_abs_err"]),
+                }
+        return out
+
+
+def _layout_names(layout: Mapping):
+    for spec in layout.values():
+        if isinstance(spec, Mapping):
+            yield from _layout_names(spec)
+        else:
+            yield spec
@@ -15,14 +15,24 @@ Key Discoveries Applied:
 
 This creates the "gold standard" replication that should exactly match
 the published values within measurement precision.
+
+Variant grid (--grid): evaluates every combination of the methodology choices
+in VARIANT_GRID in one vectorized pass over the year index and writes a tidy
+MAE/max-error table against the published r' and gK.
 """
 
+import argparse
+import itertools
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
+import sys
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.table_5_4_loader import load_table_5_4
+
 # Configuration (anchor to repo root)
 REPO_ROOT = Path(__file__).resolve().parents[2]
 BASE_DIR = REPO_ROOT / "src" / "analysis" / "replication" / "output"
@@ -31,6 +41,21 @@ OUT_PATH = BASE_DIR / "table_5_4_perfect_replication.csv"
 REPORT_PATH = BASE_DIR / "PERFECT_REPLICATION_REPORT.md"
 VALIDATION_PATH = BASE_DIR / "perfect_replication_validation.json"
 COMPARISON_PATH = BASE_DIR / "perfect_vs_authentic_comparison.csv"
+GRID_PATH = BASE_DIR / "perfect_replication_variant_grid.csv"
+
+# Methodology choices evaluated by evaluate_variant_grid (first value = engine default)
+VARIANT_GRID = {
+    'fill_utilization_gap': [True, False],
+    # Numerator preference for r = X/(K×u); the other column fills its gaps
+    'profit_numerator': ['SP', 'S'],
+    # First year taken from K rather than KK, and how the pre-splice KK is joined
+    'splice_year': [1974, 1973, 1975],
+    'splice_method': ['level', 'ratio'],
+    # In/K* (book I, else I!, ΔK/K fallback), I coalesced with I!, or ΔK/K only
+    'gk_definition': ['In_over_Kstar', 'In_coalesced_over_Kstar', 'deltaK_over_K'],
+    # Decimals the computed values are rounded to before comparison (None = unrounded)
+    'rounding': [None, 3, 2],
+}
 
 class PerfectReplicationEngine:
     """
@@ -44,11 +69,9 @@ class PerfectReplicationEngine:
         self.methodology_notes = []
 
     def load_authentic_data(self):
-        """Load the authentic merged data."""
+        """Load the authentic merged data (shared canonical frame; not mutated here)."""
         print("Loading authentic base data...")
-        df = pd.read_csv(RAW_PATH, index_col=0).T
-        df.index = df.index.astype(int)
-        df.index.name = 'year'
+        df = load_table_5_4(RAW_PATH)
 
         print(f"Loaded {len(df)} years: {df.index.min()}-{df.index.max()}")
         return df
@@ -296,6 +319,130 @@ class PerfectReplicationEngine:
 
         return df_perfect
 
+    @staticmethod
+    def _splice_capital(df, splice_year, method):
+        """K* with KK before splice_year and K from it on (each filling the other's gaps)."""
+        KK = df['KK'] if 'KK' in df.columns else pd.Series(np.nan, index=df.index)
+        K = df['K'] if 'K' in df.columns else pd.Series(np.nan, index=df.index)
+        pre = df.index < splice_year
+        K_star = KK.where(pre, K).fillna(K.where(pre, KK))
+
+        if method == 'ratio':
+            # Scale the pre-splice series so its one-step extrapolation meets K at the splice
+            before = KK[df.index < splice_year].dropna()
+            anchor = K.get(splice_year, np.nan)
+            if len(before) >= 2 and pd.notna(anchor) and before.iloc[-2] != 0:
+                projected = before.iloc[-1] * before.iloc[-1] / before.iloc[-2]
+                K_star = K_star.where(~pre, K_star * anchor / projected)
+        return K_star
+
+    def variant_series(self, df=None, grid=None):
+        """
+        Compute r and gK for the cartesian product of methodology choices in one vectorized pass.
+
+        Each distinct option of a dimension is computed once as a year vector;
+        variants are rows of (variants × years) arrays gathered from those
+        vectors, so the whole grid is a handful of array operations.
+
+        Args:
+            df: Canonical Table 5.4 frame (default: load_authentic_data())
+            grid: Mapping of choice name -> options (default: VARIANT_GRID)
+
+        Returns:
+            (variants, series, published): variants is a DataFrame with one row per
+            variant; series and published map 'r_prime'/'gK' to (variants × years)
+            and (years,) arrays aligned on df.index
+        """
+        df = self.load_authentic_data() if df is None else df
+        grid = {**VARIANT_GRID, **(grid or {})}
+        names = list(grid)
+        variants = pd.DataFrame(list(itertools.product(*grid.values())), columns=names)
+
+        def column(name):
+            return df[name].to_numpy(dtype=float) if name in df.columns else np.full(len(df), np.nan)
+
+        def codes(dim):
+            return pd.Index(grid[dim]).get_indexer(variants[dim])
+
+        # Per-option year vectors
+        u = column('u')
+        u_filled = u.copy()
+        if 1973 in df.index:
+            # Same midpoint rule as resolve_utilization_gap
+            pos = df.index.get_loc(1973)
+            if 0 < pos < len(u) - 1:
+                u_filled[pos] = (u[pos - 1] + u[pos + 1]) / 2
+        u_opts = np.stack([u_filled if fill else u for fill in grid['fill_utilization_gap']])
+
+        SP, S = column('SP'), column('S')
+        num_opts = np.stack([np.where(np.isnan(SP), S, SP) if first == 'SP' else np.where(np.isnan(S), SP, S)
+                             for first in grid['profit_numerator']])
+
+        k_keys = list(itertools.product(grid['splice_year'], grid['splice_method']))
+        k_opts = np.stack([self._splice_capital(df, year, method).to_numpy(dtype=float) for year, method in k_keys])
+
+        I, I_bang = column('I'), column('I!')
+        I_book = I if 'I' in df.columns else I_bang
+        I_coalesced = np.where(np.isnan(I), I_bang, I)
+        prev_k = np.concatenate([np.full((len(k_opts), 1), np.nan), k_opts[:, :-1]], axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = np.where(prev_k != 0, (k_opts - prev_k) / prev_k, np.nan)
+            exact = {'In_over_Kstar': I_book / k_opts, 'In_coalesced_over_Kstar': I_coalesced / k_opts}
+        exact = {key: np.where(np.isfinite(v), v, np.nan) for key, v in exact.items()}
+        gk_opts = np.stack([np.where(np.isnan(exact[d]), delta, exact[d]) if d in exact else delta
+                            for d in grid['gk_definition']], axis=1)  # (k options, gK definitions, years)
+
+        # Gather (variants × years)
+        k_idx = pd.MultiIndex.from_tuples(k_keys).get_indexer(
+            pd.MultiIndex.from_frame(variants[['splice_year', 'splice_method']]))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            denominator = k_opts[k_idx] * u_opts[codes('fill_utilization_gap')]
+            r = np.where(denominator != 0, num_opts[codes('profit_numerator')] / denominator, np.nan)
+        gk = gk_opts[k_idx, codes('gk_definition')]
+
+        decimals = variants['rounding'].to_numpy(dtype=float)[:, None]
+        scale = 10.0 ** np.nan_to_num(decimals)
+        rounded = ~np.isnan(decimals)
+        r = np.where(rounded, np.round(r * scale) / scale, r)
+        gk = np.where(rounded, np.round(gk * scale) / scale, gk)
+
+        return variants, {'r_prime': r, 'gK': gk}, {'r_prime': column("r'"), 'gK': column('gK')}
+
+    def evaluate_variant_grid(self, df=None, grid=None):
+        """
+        Score every methodology variant against the published r' and gK.
+
+        Args:
+            df: Canonical Table 5.4 frame (default: load_authentic_data())
+            grid: Mapping of choice name -> options (default: VARIANT_GRID)
+
+        Returns:
+            Tidy DataFrame: one row per variant and target ('r_prime', 'gK') with
+            observations, MAE, max absolute error and RMSE
+        """
+        variants, series, published = self.variant_series(df, grid)
+        print(f"Evaluating {len(variants)} methodology variants...")
+
+        rows = []
+        for target, computed in series.items():
+            err = computed - published[target][None, :]
+            valid = ~np.isnan(err)
+            n = valid.sum(axis=1)
+            abs_err = np.where(valid, np.abs(err), 0.0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                stats = pd.DataFrame({
+                    'target': target,
+                    'observations': n,
+                    'mae': np.where(n > 0, abs_err.sum(axis=1) / n, np.nan),
+                    'max_abs_err': np.where(n > 0, np.where(valid, np.abs(err), -np.inf).max(axis=1), np.nan),
+                    'rmse': np.where(n > 0, np.sqrt((abs_err ** 2).sum(axis=1) / n), np.nan),
+                })
+            rows.append(pd.concat([variants, stats], axis=1))
+
+        result = pd.concat(rows, ignore_index=True)
+        result['rounding'] = result['rounding'].astype('Int64')
+        return result.sort_values(['target', 'mae', 'max_abs_err'], kind='mergesort').reset_index(drop=True)
+
     def generate_report(self, validation):
         """Generate comprehensive report on perfect replication."""
 
@@ -451,11 +598,25 @@ This represents the definitive replication of Shaikh & Tonak (1994) Table 5.4.
 
 def main():
     """Main execution."""
+    parser = argparse.ArgumentParser(description="Perfect Table 5.4 replication")
+    parser.add_argument("--grid", action="store_true",
+                        help=f"Evaluate the methodology-variant grid and write {GRID_PATH.name}")
+    args = parser.parse_args()
+
     engine = PerfectReplicationEngine(
         fill_utilization_gap=True,
         use_optimal_formulas=True
     )
 
+    if args.grid:
+        grid = engine.evaluate_variant_grid()
+        grid.to_csv(GRID_PATH, index=False)
+        print(f"Variant grid saved to {GRID_PATH}")
+        for target, best in grid.groupby('target', sort=False).head(1).set_index('target').iterrows():
+            print(f"Best {target}: MAE={best['mae']:.6f} max={best['max_abs_err']:.6f} "
+                  f"({', '.join(f'{k}={best[k]}' for k in VARIANT_GRID)})")
+        return grid
+
     df_perfect, validation = engine.run_perfect_replication()
 
     # Print summary
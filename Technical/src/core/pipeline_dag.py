@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Incremental Replication Pipeline (DAG)
+======================================
+
+Declares the Table 5.4 replication stages with their real input and output
+files and runs them as a dependency graph. A stage is skipped when the content
+hashes of its script, the project modules it imports, its declared inputs and
+its last outputs are unchanged since its last successful run; otherwise it is
+re-run and everything that consumes its outputs is re-checked the same way.
+
+Project imports are found by parsing each script with ast and following
+imports that resolve to a file under src/ (or next to the importing file),
+transitively, so editing a shared module such as core/identity_checks.py
+re-runs every stage that uses it.
+
+Chain (paths relative to Technical/):
+  create_authentic_replication -> authentic_methodology_calculator
+    -> export_final_authentic_table -> perfect_replication_engine
+    -> investigate_remaining_discrepancies -> ultra_precise_replication
+    -> audits (systematic_error_audit, textual_consistency_checks,
+               verify_authentic_integrity, investigate_profit_rate_definitions)
+
+State (per-file hashes, per-file imports and per-stage signatures) is kept in
+data/cache/pipeline_state.json. File hashes are reused while a file's size and
+mtime are unchanged, so a no-op rerun only stats files.
+
+With jobs > 1, stages whose upstream stages are finished run concurrently in a
+process pool (the validators only read shared upstream CSVs and write their own
+reports). Each stage's output is captured and printed after its status line,
+in pipeline order, and the run fails if any stage fails.
+
+Stages reading the raw merged Table 5.4 get the canonical frame published once
+per raw-file and loader version as an Arrow snapshot (see
+core/table_5_4_loader.py), so the parse/transpose/coerce work is not repeated
+in every stage process. Every stage importing the loader has it in its
+signature, so a change to canonicalization re-runs them all.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.table_5_4_loader import ARROW_ENV, LOADER_DIGEST, publish_arrow
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "src"
+STATE_PATH = ROOT / "data" / "cache" / "pipeline_state.json"
+ARROW_SNAPSHOT = ROOT / "data" / "cache" / "table_5_4_authentic_raw_merged.arrow"
+
+BOOK_TABLES = "data/extracted_tables/book_tables"
+OUT = "src/analysis/replication/output"
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step: a script plus the files it reads and writes.
+
+    An input containing '*' is a glob (relative to the root); every matching
+    file is part of the signature, so added or removed matches re-run it.
+    """
+    name: str
+    script: str
+    inputs: List[str]
+    outputs: List[str]
+    kind: str = "replication"  # 'replication' or 'validation'
+    deps: List[str] = field(default_factory=list)
+
+
+STAGES = [
+    Stage("create_authentic_replication", "src/core/create_authentic_replication.py",
+          # book_table_candidates globs every extraction of pages 36/37 and
+          # weights them by the manifest confidence
+          inputs=[f"{BOOK_TABLES}/table_p36_*.csv",
+                  f"{BOOK_TABLES}/table_p37_*.csv",
+                  f"{BOOK_TABLES}/manifest.json"],
+          outputs=[f"{OUT}/table_5_4_authentic_raw_merged.csv",
+                   f"{OUT}/table_5_4_consensus_report.json"]),
+    Stage("authentic_methodology_calculator", "src/core/authentic_methodology_calculator.py",
+          inputs=[f"{OUT}/table_5_4_authentic_raw_merged.csv"],
+          outputs=[f"{OUT}/table_5_4_authentic_calculated.csv",
+                   f"{OUT}/authentic_validation_summary.json",
+                   f"{OUT}/AUTHENTIC_FORMULAS_REFERENCE.md"]),
+    Stage("export_final_authentic_table", "src/core/export_final_authentic_table.py",
+          inputs=[f"{OUT}/table_5_4_authentic_raw_merged.csv",
+                  f"{OUT}/table_5_4_authentic_calculated.csv",
+                  f"{OUT}/authentic_validation_summary.json"],
+          outputs=[f"{OUT}/table_5_4_authentic.csv",
+                   f"{OUT}/AUTHENTIC_REPLICATION_SUMMARY.md"]),
+    Stage("perfect_replication_engine", "src/core/perfect_replication_engine.py",
+          inputs=[f"{OUT}/table_5_4_authentic_raw_merged.csv"],
+          outputs=[f"{OUT}/table_5_4_perfect_replication.csv",
+                   f"{OUT}/perfect_replication_validation.json",
+                   f"{OUT}/PERFECT_REPLICATION_REPORT.md",
+                   f"{OUT}/perfect_vs_authentic_comparison.csv"]),
+    Stage("investigate_remaining_discrepancies", "src/validation/investigate_remaining_discrepancies.py",
+          inputs=[f"{OUT}/table_5_4_perfect_replication.csv",
+                  f"{OUT}/table_5_4_authentic.csv"],
+          outputs=[f"{OUT}/discrepancy_investigation.json",
+                   f"{OUT}/DISCREPANCY_INVESTIGATION.md"],
+          kind="validation"),
+    Stage("ultra_precise_replication", "src/core/ultra_precise_replication.py",
+          inputs=[f"{OUT}/table_5_4_authentic.csv",
+                  f"{OUT}/discrepancy_investigation.json"],
+          outputs=[f"{OUT}/table_5_4_ultra_precise_replication.csv",
+                   f"{OUT}/ultra_precise_validation.json",
+                   f"{OUT}/ULTRA_PRECISE_REPLICATION_REPORT.md"]),
+    Stage("systematic_error_audit", "src/validation/systematic_error_audit.py",
+          inputs=[f"{OUT}/table_5_4_authentic_raw_merged.csv",
+                  f"{OUT}/table_5_4_ultra_precise_replication.csv",
+                  f"{OUT}/table_5_4_authentic.csv"],
+          outputs=[f"{OUT}/systematic_error_audit.json",
+                   f"{OUT}/SYSTEMATIC_ERROR_AUDIT.md"],
+          kind="validation"),
+    Stage("textual_consistency_checks", "src/validation/textual_consistency_checks.py",
+          inputs=[f"{OUT}/table_5_4_authentic_raw_merged.csv",
+                  f"{OUT}/table_5_4_authentic_calculated.csv",
+                  f"{OUT}/table_5_4_perfect_replication.csv",
+                  f"{OUT}/table_5_4_ultra_precise_replication.csv",
+                  f"{OUT}/table_5_4_authentic.csv"],
+          outputs=[f"{OUT}/TEXTUAL_CHECKS_SUMMARY.json",
+                   f"{OUT}/TEXTUAL_CHECKS_SUMMARY.md",
+                   f"{OUT}/BOOK_TEXT_ALIGNMENT.md",
+                   f"{OUT}/IDENTITY_CHECKS_BY_DATASET.csv"],
+          kind="validation"),
+    Stage("verify_authentic_integrity", "src/validation/verify_authentic_integrity.py",
+          inputs=[f"{OUT}/table_5_4_authentic_raw_merged.csv",
+                  f"{OUT}/table_5_4_authentic.csv"],
+          outputs=[f"{OUT}/authenticity_check.json",
+                   f"{OUT}/AUTHENTICITY_CHECK.md"],
+          kind="validation"),
+    Stage("investigate_profit_rate_definitions", "src/validation/investigate_profit_rate_definitions.py",
+          inputs=[f"{OUT}/table_5_4_authentic_raw_merged.csv",
+                  f"{OUT}/table_5_4_authentic_calculated.csv",
+                  f"{OUT}/table_5_4_authentic.csv"],
+          outputs=[f"{OUT}/profit_rate_investigation.json",
+                   f"{OUT}/PROFIT_RATE_INVESTIGATION.md"],
+          kind="validation"),
+]
+
+
+def _execute_stage(root: str, script: str, env: Optional[Dict[str, str]] = None) -> Dict:
+    """Run one stage script from `root` (pool worker; returns a picklable result)."""
+    start = time.time()
+    result = subprocess.run([sys.executable, str(Path(root) / script)],
+                            capture_output=True, text=True, cwd=root, env=env)
+    return {"returncode": result.returncode, "stdout": result.stdout,
+            "stderr": result.stderr, "elapsed": time.time() - start}
+
+
+class PipelineDAG:
+    """
+    Content-hash incremental runner over a list of stages.
+    """
+
+    def __init__(self, stages: List[Stage] = None, root: Path = ROOT, state_path: Path = STATE_PATH):
+        self.root = Path(root)
+        self.state_path = Path(state_path)
+        self.stages: Dict[str, Stage] = {}
+        producers: Dict[str, str] = {}
+
+        for stage in (stages if stages is not None else STAGES):
+            for out in stage.outputs:
+                if out in producers:
+                    raise ValueError(f"{out} is produced by both {producers[out]} and {stage.name}")
+                producers[out] = stage.name
+            self.stages[stage.name] = stage
+
+        for stage in self.stages.values():
+            stage.deps = sorted({producers[i] for i in stage.inputs if i in producers})
+
+        self.order = self._topological_order()
+        self.state = self._load_state()
+
+    def _topological_order(self) -> List[str]:
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in pipeline at stage {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:  # declaration order breaks ties
+            visit(name)
+        return order
+
+    def _load_state(self) -> Dict:
+        if self.state_path.exists():
+            try:
+                return json.loads(self.state_path.read_text(encoding="utf-8"))
+            except ValueError:
+                pass
+        return {"files": {}, "imports": {}, "stages": {}}
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+
+    def file_hash(self, rel_path: str) -> Optional[str]:
+        """sha256 of a file (None if missing), reusing the cached hash while size/mtime match."""
+        path = self.root / rel_path
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        cached = self.state["files"].get(rel_path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha256"]
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        self.state["files"][rel_path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def _resolve_module(self, importer: str, name: str, level: int) -> Optional[str]:
+        """Root-relative path of a project module, or None for stdlib/third-party names."""
+        parts = name.split(".") if name else []
+        importer_dir = (self.root / importer).parent
+        if level:
+            bases = [importer_dir if level == 1 else importer_dir.parents[level - 2]]
+        else:
+            # Scripts put src/ on sys.path; extension scripts also import siblings
+            bases = [self.root / "src", importer_dir]
+        for base in bases:
+            candidate = base.joinpath(*parts)
+            for path in ([candidate.with_suffix(".py")] if parts else []) + [candidate / "__init__.py"]:
+                if path.is_file():
+                    return path.relative_to(self.root).as_posix()
+        return None
+
+    def direct_imports(self, rel_path: str) -> List[str]:
+        """Project modules a file imports itself, cached per file hash."""
+        digest = self.file_hash(rel_path)
+        if digest is None:
+            return []
+        imports = self.state.setdefault("imports", {})
+        cached = imports.get(rel_path)
+        if cached and cached["sha256"] == digest:
+            return cached["modules"]
+
+        names = []
+        try:
+            tree = ast.parse((self.root / rel_path).read_bytes())
+        except SyntaxError:
+            tree = None  # the stage itself will fail and report it
+        for node in ast.walk(tree) if tree is not None else []:
+            if isinstance(node, ast.Import):
+                names.extend((alias.name, 0) for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                names.append((base, node.level))
+                # `from package import module` names a module, not an attribute
+                names.extend((f"{base}.{alias.name}" if base else alias.name, node.level)
+                             for alias in node.names)
+        modules = sorted({m for m in (self._resolve_module(rel_path, n, level) for n, level in names)
+                          if m and m != rel_path})
+        imports[rel_path] = {"sha256": digest, "modules": modules}
+        return modules
+
+    def module_deps(self, rel_path: str) -> List[str]:
+        """Project modules a script imports, directly or through other project modules."""
+        seen, queue = set(), [rel_path]
+        while queue:
+            for module in self.direct_imports(queue.pop()):
+                if module not in seen and module != rel_path:
+                    seen.add(module)
+                    queue.append(module)
+        return sorted(seen)
+
+    def expand(self, inputs: List[str]) -> List[str]:
+        """Declared inputs with glob patterns replaced by their current matches."""
+        files = []
+        for rel in inputs:
+            if "*" in rel:
+                files.extend(sorted(p.relative_to(self.root).as_posix() for p in self.root.glob(rel) if p.is_file()))
+            else:
+                files.append(rel)
+        return files
+
+    def missing_inputs(self, stage: Stage) -> List[str]:
+        """Declared inputs that do not exist (globs without a match)."""
+        return [rel for rel in stage.inputs
+                if not (any(self.root.glob(rel)) if "*" in rel else (self.root / rel).exists())]
+
+    def signature(self, stage: Stage) -> str:
+        """Hash of the stage's declaration, script, imported modules and input contents."""
+        h = hashlib.sha256()
+        h.update(json.dumps([stage.script, stage.inputs, stage.outputs]).encode("utf-8"))
+        for rel in [stage.script] + self.module_deps(stage.script) + self.expand(stage.inputs):
+            h.update(rel.encode("utf-8"))
+            h.update((self.file_hash(rel) or "missing").encode("utf-8"))
+        return h.hexdigest()
+
+    def is_current(self, stage: Stage) -> bool:
+        """True if the last successful run used the same signature and outputs are untouched."""
+        record = self.state["stages"].get(stage.name)
+        if not record or record.get("signature") != self.signature(stage):
+            return False
+        return all(self.file_hash(out) == record["outputs"].get(out) for out in stage.outputs)
+
+    def select(self, names: Optional[List[str]] = None, kinds: Optional[List[str]] = None) -> List[str]:
+        """Stages to consider, in topological order."""
+        return [n for n in self.order
+                if (names is None or n in names) and (kinds is None or self.stages[n].kind in kinds)]
+
+    def plan(self, names: Optional[List[str]] = None, kinds: Optional[List[str]] = None) -> Dict[str, str]:
+        """Stage -> 'skip' or 'run', assuming re-run stages change their outputs."""
+        plan, dirty = {}, set()
+        for name in self.select(names, kinds):
+            stage = self.stages[name]
+            stale = any(dep in dirty for dep in stage.deps) or not self.is_current(stage)
+            plan[name] = "run" if stale else "skip"
+            if stale:
+                dirty.add(name)
+        return plan
+
+    def stage_env(self, stage: Stage) -> Optional[Dict[str, str]]:
+        """Environment for a stage; points Table 5.4 readers at a current Arrow snapshot."""
+        raw = f"{OUT}/table_5_4_authentic_raw_merged.csv"
+        if raw not in stage.inputs or not (self.root / raw).exists():
+            return None
+        st = (self.root / raw).stat()
+        # Readers validate the snapshot by size/mtime and loader hash
+        source = f"{st.st_size}:{st.st_mtime_ns}:{LOADER_DIGEST}"
+        if self.state.get("arrow_snapshot") != source or not ARROW_SNAPSHOT.exists():
+            if publish_arrow(ARROW_SNAPSHOT, self.root / raw) is None:
+                return None  # pyarrow not installed: stages parse the CSV themselves
+            self.state["arrow_snapshot"] = source
+        return {**os.environ, ARROW_ENV: str(ARROW_SNAPSHOT)}
+
+    def _finish_stage(self, stage: Stage, result: Dict) -> str:
+        """Record a finished stage; returns its status line followed by the script's output."""
+        if result["returncode"] != 0:
+            status = f"[FAILED] {stage.name} ({result['elapsed']:.1f}s)"
+        else:
+            self.state["stages"][stage.name] = {
+                "signature": self.signature(stage),
+                "outputs": {out: self.file_hash(out) for out in stage.outputs},
+                "completed": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self._save_state()
+            status = f"[RAN] {stage.name} ({result['elapsed']:.1f}s)"
+        # The script ran with captured output; hand it back for printing in pipeline order
+        output = [text.rstrip("\n") for text in (result["stdout"], result["stderr"]) if text.strip()]
+        return "\n".join([status, *output])
+
+    def run(self, names: Optional[List[str]] = None, kinds: Optional[List[str]] = None,
+            force: bool = False, jobs: int = 1) -> bool:
+        """
+        Run stages in dependency order, skipping current ones.
+
+        Args:
+            names: Restrict to these stages (default: all)
+            kinds: Restrict to these stage kinds ('replication', 'validation')
+            force: Re-run selected stages even if current
+            jobs: Number of stages allowed to run at once
+
+        Returns True if every selected stage is current or ran successfully.
+        """
+        selected = self.select(names, kinds)
+        pending = list(selected)
+        finished: Dict[str, str] = {}   # name -> 'ok' / 'failed'
+        messages: Dict[str, str] = {}
+        running = {}                    # future -> stage name
+        reported = 0
+        pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+
+        def flush():
+            # Report in pipeline order regardless of completion order
+            nonlocal reported
+            while reported < len(selected) and selected[reported] in messages:
+                print(messages[selected[reported]])
+                reported += 1
+
+        try:
+            while pending or running:
+                # Launch (or resolve) every stage whose selected upstream stages are done
+                for name in list(pending):
+                    stage = self.stages[name]
+                    upstream = [d for d in stage.deps if d in selected]
+                    if any(d not in finished for d in upstream):
+                        continue
+                    pending.remove(name)
+                    missing = self.missing_inputs(stage)
+                    if any(finished[d] == "failed" for d in upstream):
+                        finished[name], messages[name] = "failed", f"[BLOCKED] {name}: upstream stage failed"
+                    elif not force and self.is_current(stage):
+                        finished[name], messages[name] = "ok", f"[SKIP] {name}: inputs and code unchanged"
+                    elif missing:
+                        finished[name], messages[name] = "failed", f"[FAILED] {name}: missing inputs {missing}"
+                    elif pool is None:
+                        result = _execute_stage(str(self.root), stage.script, self.stage_env(stage))
+                        messages[name] = self._finish_stage(stage, result)
+                        finished[name] = "ok" if messages[name].startswith("[RAN]") else "failed"
+                    else:
+                        future = pool.submit(_execute_stage, str(self.root), stage.script, self.stage_env(stage))
+                        running[future] = name
+                flush()
+
+                if running:
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        messages[name] = self._finish_stage(self.stages[name], future.result())
+                        finished[name] = "ok" if messages[name].startswith("[RAN]") else "failed"
+                    flush()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        flush()
+        self._save_state()
+        return all(status == "ok" for status in finished.values())
+
+
+def main():
+    """Run the full pipeline incrementally."""
+    dag = PipelineDAG()
+    jobs = int(sys.argv[sys.argv.index("--jobs") + 1]) if "--jobs" in sys.argv else 1
+    ok = dag.run(force="--force" in sys.argv, jobs=jobs)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
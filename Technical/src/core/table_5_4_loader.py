@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Canonical Table 5.4 Loader
+==========================
+
+Single loader for `table_5_4_authentic_raw_merged.csv` (variables as rows,
+years as columns). It returns the canonical typed frame every stage was
+building on its own: transposed to years × variables, int year index named
+'year', and every column coerced to numeric (non-numeric cells -> NaN).
+
+Sharing:
+- Within a process the frame is parsed once and handed out by reference
+  (cache keyed by path, size and mtime). Treat it as read-only; call .copy()
+  before modifying it.
+- Across processes, the pipeline runner can publish the frame once as an
+  Arrow IPC file (`publish_arrow`) and point stages at it through the
+  ST_TABLE_5_4_ARROW environment variable; stages then memory-map it instead
+  of re-parsing the CSV. This needs pyarrow; without it, stages fall back to
+  parsing the CSV themselves. A snapshot records the hash of this module, so
+  one written before a change to canonicalize() or the snapshot layout is
+  ignored rather than served.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+RAW_PATH = REPO_ROOT / "src" / "analysis" / "replication" / "output" / "table_5_4_authentic_raw_merged.csv"
+ARROW_ENV = "ST_TABLE_5_4_ARROW"
+LOADER_DIGEST = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+_CACHE: Dict[Tuple[str, int, int], pd.DataFrame] = {}
+
+
+def _fingerprint(path: Path) -> Tuple[str, int, int]:
+    st = path.stat()
+    return (str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+
+def canonicalize(raw: pd.DataFrame) -> pd.DataFrame:
+    """Turn the variables-as-rows table into the typed, year-indexed frame."""
+    df = raw.T
+    df.index = df.index.astype(int)
+    df.index.name = "year"
+    df.columns.name = None
+    return df.apply(pd.to_numeric, errors="coerce")
+
+
+def load_table_5_4(path: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Load the canonical Table 5.4 frame (parsed at most once per process per file version).
+
+    Args:
+        path: Raw merged CSV (default: RAW_PATH)
+
+    Returns:
+        Years × variables DataFrame of floats, index 'year' (int). Shared; do not mutate.
+    """
+    path = Path(path) if path is not None else RAW_PATH
+    key = _fingerprint(path)
+    if key in _CACHE:
+        return _CACHE[key]
+
+    df = None
+    arrow_path = os.environ.get(ARROW_ENV)
+    if arrow_path and path.resolve() == RAW_PATH.resolve():
+        df = _read_arrow(Path(arrow_path), key)
+    if df is None:
+        df = canonicalize(pd.read_csv(path, index_col=0))
+
+    _CACHE.clear()  # only the current version of a file is worth keeping
+    _CACHE[key] = df
+    return df
+
+
+def clear_cache() -> None:
+    """Drop the in-process frame (e.g. after regenerating the raw CSV)."""
+    _CACHE.clear()
+
+
+def publish_arrow(dest: Path, path: Optional[Path] = None) -> Optional[Path]:
+    """
+    Write the canonical frame once as an uncompressed Arrow IPC file for other processes.
+
+    The source fingerprint and LOADER_DIGEST are stored in the schema metadata
+    so readers can reject a snapshot of an older CSV or an older loader. Returns None if pyarrow is unavailable.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+
+    path = Path(path) if path is not None else RAW_PATH
+    df = load_table_5_4(path)
+    _, size, mtime_ns = _fingerprint(path)
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"st_source_size": str(size).encode(),
+        b"st_source_mtime_ns": str(mtime_ns).encode(),
+        b"st_loader_sha256": LOADER_DIGEST.encode(),
+    })
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_suffix(dest.suffix + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, dest)
+    return dest
+
+
+def _read_arrow(arrow_path: Path, key: Tuple[str, int, int]) -> Optional[pd.DataFrame]:
+    """Memory-map a published snapshot; None if missing, stale or pyarrow is unavailable."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    if not arrow_path.exists():
+        return None
+    table = pa.ipc.open_file(pa.memory_map(str(arrow_path), "r")).read_all()
+    meta = table.schema.metadata or {}
+    if (meta.get(b"st_source_size"), meta.get(b"st_source_mtime_ns")) != (str(key[1]).encode(), str(key[2]).encode()):
+        return None
+    if meta.get(b"st_loader_sha256") != LOADER_DIGEST.encode():
+        return None
+    return table.to_pandas()
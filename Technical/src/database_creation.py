@@ -16,6 +16,10 @@ import json
 import logging
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from extraction.cell_normalization import clean_labels, parse_numeric
 
 class CorrectedDatabaseCreator:
     """Creates unified historical database with corrected data structure handling"""
@@ -53,54 +57,36 @@ class CorrectedDatabaseCreator:
             # Columns 1+: year data (may start from column 2, 3, etc.)
 
             if df.shape[1] > 10 and df.shape[0] > 2:  # Likely time series data
-                # First column contains variable names
-                variable_col = df.iloc[:, 0]
-
-                # Remaining columns are years - try to identify year columns
-                year_columns = []
+                # Remaining columns are years - column names that are small
+                # integers are year offsets. Assume base year (need to determine
+                # from context); many tables seem to start around 1960s-1970s
+                year_positions = []
                 year_values = []
-
                 for col_idx in range(1, df.shape[1]):
-                    col_name = df.columns[col_idx]
-
-                    # Check if column name could be a year offset
                     try:
-                        year_offset = int(col_name)
-                        # Assume base year (need to determine from context)
-                        # Many tables seem to start around 1960s-1970s
-                        if year_offset >= 0 and year_offset < 100:
-                            estimated_year = 1960 + year_offset  # Rough estimate
-                            year_columns.append(col_name)
-                            year_values.append(estimated_year)
-                    except:
-                        # Column name is not numeric, skip
+                        year_offset = int(df.columns[col_idx])
+                    except (TypeError, ValueError):
                         continue
-
-                if len(year_columns) > 5:  # If we found reasonable year structure
-                    # Reshape data
-                    reshaped_data = []
-
-                    for row_idx in range(df.shape[0]):
-                        variable_name = df.iloc[row_idx, 0]
-                        if pd.notna(variable_name) and str(variable_name).strip():
-                            for col_idx, year_col in enumerate(year_columns):
-                                value = df.iloc[row_idx, df.columns.get_loc(year_col)]
-                                estimated_year = year_values[col_idx]
-
-                                if pd.notna(value):
-                                    try:
-                                        numeric_value = float(value)
-                                        reshaped_data.append({
-                                            'variable': variable_name,
-                                            'year': estimated_year,
-                                            'value': numeric_value
-                                        })
-                                    except:
-                                        pass
-
-                    if reshaped_data:
-                        result_df = pd.DataFrame(reshaped_data)
-                        return result_df
+                    if 0 <= year_offset < 100:
+                        year_positions.append(col_idx)
+                        year_values.append(1960 + year_offset)  # Rough estimate
+
+                if len(year_positions) > 5:  # If we found reasonable year structure
+                    # First column contains variable names; parse the whole
+                    # year block at once and keep the cells that are numbers
+                    labels = clean_labels(df.iloc[:, 0])
+                    values, unparsed = parse_numeric(df.iloc[:, year_positions].to_numpy(dtype=object))
+                    values[labels == ""] = np.nan
+                    rows, cols = np.nonzero(~np.isnan(values))
+
+                    if len(rows):
+                        if unparsed.any():
+                            self.logger.debug(f"{file_path.name}: {int(unparsed.sum())} non-numeric cells skipped")
+                        return pd.DataFrame({
+                            'variable': labels[rows],
+                            'year': np.asarray(year_values)[cols],
+                            'value': values[rows, cols]
+                        })
 
             # If not in expected format, return as-is
             return df
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Cached HTTP client for the BEA data API
+=======================================
+
+Every BEA request goes through a persistent on-disk response cache, so a
+re-run of a collector costs no network round-trips when nothing changed.
+
+Cache layout (data/cache/bea_api, one file per request):
+- <key>.json   {params, fetched_at, validated_at, etag, last_modified, body}
+
+The key is a hash of the normalized request parameters: names lower-cased,
+values stripped and upper-cased (BEA treats both case-insensitively), comma
+lists sorted, and the UserID left out, so the same request under another API
+key or with reordered parameters hits the same entry.
+
+Policy:
+- fresh (validated less than `ttl` seconds ago, or ttl=None) -> served from
+  disk, no request
+- stale -> conditional GET (If-None-Match / If-Modified-Since when the entry
+  has validators); a 304 only refreshes validated_at
+- offline -> served from disk whatever its age; a miss raises OfflineCacheMiss
+- BEA error payloads (BEAAPI.Error or Results.Error) are never cached
+
+The BEA API takes one TableName per GetData call, so `get_tables` batches by
+deduplicating requests, answering cached ones from disk and fetching the
+misses concurrently over one keep-alive session. With return_exceptions=True a
+failed request is returned in its slot, so one bad table does not lose the
+rest of the batch.
+
+ReplayServer is a local stand-in for apps.bea.gov that answers from a cache
+directory (with ETags and 304s), so collectors can be exercised offline over
+real HTTP:
+
+    with ReplayServer(CACHE_DIR) as server:
+        client = BEAApiClient(api_key, base_url=server.url, ttl=0)
+
+Usage:
+    python bea_api_client.py list
+    python bea_api_client.py serve --port 8765
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://apps.bea.gov/api/data"
+CACHE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "bea_api"
+DEFAULT_TTL = 24 * 3600.0  # seconds; annual NIPA tables change a few times a year
+SECRET_PARAMS = {"userid"}
+
+
+class OfflineCacheMiss(requests.exceptions.ConnectionError):
+    """Raised in offline mode when a request has no cached response."""
+
+
+def normalize_params(params: Mapping) -> Dict[str, str]:
+    """Request parameters as the cache sees them (see module docstring)."""
+    normalized = {}
+    for name, value in params.items():
+        name = str(name).strip().lower()
+        if name in SECRET_PARAMS or value is None:
+            continue
+        items = [v.strip().upper() for v in str(value).split(",")]
+        normalized[name] = ",".join(sorted(items))
+    return dict(sorted(normalized.items()))
+
+
+def request_key(params: Mapping) -> str:
+    blob = json.dumps(normalize_params(params), sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:32]
+
+
+def api_error(body) -> Optional[str]:
+    """BEA error description of a response body, or None."""
+    if not isinstance(body, dict):
+        return None
+    root = body.get("BEAAPI", {})
+    error = root.get("Error") or root.get("Results", {}).get("Error")
+    if not error:
+        return None
+    if isinstance(error, dict):
+        return (error.get("APIErrorDescription")
+                or error.get("ErrorDetail", {}).get("Description")
+                or json.dumps(error))
+    return str(error)
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _etag(body) -> str:
+    return '"' + hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16] + '"'
+
+
+class ResponseCache:
+    """Directory of cached responses, one JSON file per request key."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self.path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def store(self, key: str, entry: Dict) -> None:
+        path = self.path(key)
+        tmp = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+    def record(self, params: Mapping, body, etag: Optional[str] = None) -> str:
+        """Store a response obtained elsewhere (e.g. a saved API dump) under its request key."""
+        key = request_key(params)
+        now = _now()
+        self.store(key, {
+            "params": normalize_params(params),
+            "fetched_at": now,
+            "validated_at": now,
+            "etag": etag or _etag(body),
+            "last_modified": None,
+            "body": body,
+        })
+        return key
+
+    def entries(self) -> Iterable[Dict]:
+        for path in sorted(self.cache_dir.glob("*.json")):
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            entry["key"] = path.stem
+            yield entry
+
+
+class BEAApiClient:
+    """
+    BEA API client with an on-disk cache, conditional revalidation and an offline mode.
+
+    Args:
+        api_key: BEA UserID (sent with every request, never part of the cache key)
+        base_url: API endpoint (a ReplayServer url for offline runs)
+        cache_dir: Response cache directory
+        ttl: Seconds a cached response is served without contacting the server
+             (None: never revalidate, 0: always revalidate)
+        offline: Never touch the network
+        timeout: Per-request timeout in seconds
+        workers: Concurrent requests in get_tables
+    """
+
+    def __init__(self, api_key: str = "", base_url: str = BASE_URL, cache_dir: Path = CACHE_DIR,
+                 ttl: Optional[float] = DEFAULT_TTL, offline: bool = False, timeout: float = 30,
+                 workers: int = 4, session: Optional[requests.Session] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache = ResponseCache(cache_dir)
+        self.ttl = ttl
+        self.offline = offline
+        self.timeout = timeout
+        self.workers = max(1, workers)
+        self.session = session or requests.Session()
+        self.stats = {"cached": 0, "revalidated": 0, "fetched": 0, "stale": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def _fresh(self, entry: Dict, ttl: Optional[float]) -> bool:
+        return ttl is None or _now() - entry.get("validated_at", 0) < ttl
+
+    def get(self, params: Mapping, ttl: Optional[float] = -1, refresh: bool = False):
+        """
+        Parsed JSON response of one GetData (or any other) request.
+
+        Args:
+            params: Query parameters; UserID is added from api_key if missing
+            ttl: Override of the client's ttl for this call
+            refresh: Skip the freshness check (still revalidates conditionally)
+        """
+        ttl = self.ttl if ttl == -1 else ttl
+        key = request_key(params)
+        entry = self.cache.load(key)
+
+        if entry is not None and not refresh and self._fresh(entry, ttl):
+            self._count("cached")
+            return entry["body"]
+        if self.offline:
+            if entry is None:
+                raise OfflineCacheMiss(f"No cached BEA response for {normalize_params(params)}")
+            self._count("stale")
+            return entry["body"]
+
+        query = dict(params)
+        if self.api_key and not any(str(k).lower() in SECRET_PARAMS for k in query):
+            query["UserID"] = self.api_key
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(self.base_url, params=query, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and entry is not None:
+            entry["validated_at"] = _now()
+            self.cache.store(key, entry)
+            self._count("revalidated")
+            return entry["body"]
+
+        response.raise_for_status()
+        body = response.json()
+        self._count("fetched")
+        error = api_error(body)
+        if error:
+            logger.warning(f"BEA API error (not cached): {error}")
+            return body
+
+        now = _now()
+        self.cache.store(key, {
+            "params": normalize_params(params),
+            "fetched_at": now,
+            "validated_at": now,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body": body,
+        })
+        return body
+
+    def get_many(self, param_sets: List[Mapping], return_exceptions: bool = False, **kwargs) -> List:
+        """
+        Responses for several requests, in order; duplicates are requested once.
+
+        With return_exceptions, a request that fails (network error, HTTP error,
+        offline cache miss) leaves its exception in its slot instead of failing
+        the whole batch.
+        """
+        keys = [request_key(p) for p in param_sets]
+        unique = {}
+        for key, params in zip(keys, param_sets):
+            unique.setdefault(key, params)
+
+        def fetch(params):
+            try:
+                return self.get(params, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        if self.workers == 1 or len(unique) == 1:
+            bodies = {key: fetch(params) for key, params in unique.items()}
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(unique))) as pool:
+                futures = {key: pool.submit(fetch, params) for key, params in unique.items()}
+                bodies = {key: future.result() for key, future in futures.items()}
+        return [bodies[key] for key in keys]
+
+    def get_tables(self, table_names: Iterable[str], return_exceptions: bool = False,
+                   **params) -> Dict[str, object]:
+        """GetData responses of several tables sharing the other parameters (e.g. NIPA, A, Year)."""
+        names = list(dict.fromkeys(table_names))
+        param_sets = [{"method": "GetData", **params, "TableName": name} for name in names]
+        return dict(zip(names, self.get_many(param_sets, return_exceptions=return_exceptions)))
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server: "_ReplayHTTPServer"
+
+    def do_GET(self):
+        params = dict(parse_qsl(urlsplit(self.path).query))
+        entry = self.server.cache.load(request_key(params))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if entry is None:
+            body = {"BEAAPI": {"Results": {"Error": {
+                "APIErrorCode": "404",
+                "APIErrorDescription": f"No recorded response for {normalize_params(params)}"}}}}
+            self._send(404, body)
+            return
+
+        etag = entry.get("etag") or _etag(entry["body"])
+        self.server.count()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self._send(200, entry["body"], etag)
+
+    def _send(self, status: int, body, etag: Optional[str] = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug("replay: " + format, *args)
+
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, cache: ResponseCache, latency: float):
+        super().__init__(address, _ReplayHandler)
+        self.cache = cache
+        self.latency = latency
+        self.requests_served = 0
+        self._lock = threading.Lock()
+
+    def count(self):
+        with self._lock:
+            self.requests_served += 1
+
+
+class ReplayServer:
+    """
+    Local stand-in for the BEA API that replays recorded (cached) responses.
+
+    Args:
+        cache_dir: Directory of recorded responses (a ResponseCache)
+        port: Port to bind on 127.0.0.1 (0 picks a free one)
+        latency: Seconds added to every response, to mimic a real round-trip
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, port: int = 0, latency: float = 0.0):
+        self.httpd = _ReplayHTTPServer(("127.0.0.1", port), ResponseCache(cache_dir), latency)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/data"
+
+    @property
+    def requests_served(self) -> int:
+        return self.httpd.requests_served
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    """List the cache or serve it as a stand-in BEA API."""
+    parser = argparse.ArgumentParser(description="BEA API response cache and replay server")
+    parser.add_argument("command", choices=["list", "serve"])
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each response")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for entry in ResponseCache(args.cache_dir).entries():
+            validated = datetime.fromtimestamp(entry["validated_at"], timezone.utc).isoformat(timespec="seconds")
+            params = " ".join(f"{k}={v}" for k, v in entry["params"].items())
+            print(f"{entry['key']}  validated {validated}  {params}")
+        return
+
+    server = ReplayServer(args.cache_dir, args.port, args.latency)
+    print(f"Replaying {args.cache_dir} at {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -4,8 +4,14 @@ Collects NIPA Table 6.16D - Corporate Profits by Industry (1990-2025)
 
 This script collects corporate profits data required for Surplus (SP) calculation
 in the Shaikh & Tonak extension to present day.
+
+Requests go through BEAApiClient (bea_api_client.py): responses are cached on
+disk under data/cache/bea_api and revalidated after the TTL, so a re-run costs
+no network round-trips when nothing changed. --offline serves only from the
+cache; --base-url points the collector at a ReplayServer.
 """
 
+import argparse
 import requests
 import pandas as pd
 import json
@@ -14,16 +20,28 @@ from pathlib import Path
 from datetime import datetime
 import logging
 
+from bea_api_client import BASE_URL, DEFAULT_TTL, BEAApiClient
+from vintage_store import record_vintage
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class BEACorporateProfitsCollector:
-    def __init__(self, api_key_file=".secrets/bea_api_key.txt"):
+    def __init__(self, api_key_file=".secrets/bea_api_key.txt", client=None, offline=False,
+                 ttl=DEFAULT_TTL, base_url=BASE_URL):
         """Initialize the BEA data collector."""
         self.base_dir = Path(__file__).parent.parent.parent
-        self.api_key = self._load_api_key(api_key_file)
-        self.base_url = "https://apps.bea.gov/api/data"
+        try:
+            self.api_key = self._load_api_key(api_key_file)
+        except Exception as e:
+            if not offline:
+                logger.error(f"Failed to load API key: {e}")
+                raise
+            logger.info(f"No BEA API key ({e}); offline mode serves cached responses only")
+            self.api_key = ""  # Cached responses do not need a key
+        self.base_url = base_url
+        self.client = client or BEAApiClient(self.api_key, base_url=base_url, ttl=ttl, offline=offline)
         self.output_dir = self.base_dir / "data" / "modern" / "bea_nipa"
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -39,69 +57,65 @@ class BEACorporateProfitsCollector:
 
     def _load_api_key(self, api_key_file):
         """Load BEA API key from file."""
-        try:
-            key_path = self.base_dir / api_key_file
-            with open(key_path, 'r') as f:
-                api_key = f.read().strip()
-            logger.info("BEA API key loaded successfully")
-            return api_key
-        except Exception as e:
-            logger.error(f"Failed to load API key: {e}")
-            raise
-
-    def get_table_data(self):
-        """Collect corporate profits data from BEA NIPA Table 6.16D."""
-        logger.info(f"Starting data collection for {self.table_name}")
-
-        # Build API request parameters
-        params = {
-            'UserID': self.api_key,
+        key_path = self.base_dir / api_key_file
+        with open(key_path, 'r') as f:
+            api_key = f.read().strip()
+        logger.info("BEA API key loaded successfully")
+        return api_key
+
+    def _request_params(self, table_name):
+        return {
             'method': 'GetData',
             'datasetname': self.dataset_name,
-            'TableName': self.table_name,
+            'TableName': table_name,
             'Frequency': self.frequency,
             'Year': f"{self.start_year},{self.end_year}",
             'ResultFormat': 'json'
         }
 
-        try:
-            logger.info("Sending request to BEA API...")
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-
-            data = response.json()
-            logger.info("Data received from BEA API")
-
-            # Check for API errors
-            if 'BEAAPI' in data and 'Error' in data['BEAAPI']:
-                error_msg = data['BEAAPI']['Error']['ErrorDetail']['Description']
-                logger.error(f"BEA API Error: {error_msg}")
-                return None
+    def _extract_results(self, data, table_name):
+        """Data rows of one GetData response, or None (API errors are logged)."""
+        # Check for API errors
+        if 'BEAAPI' in data and 'Error' in data['BEAAPI']:
+            error_msg = data['BEAAPI']['Error']['ErrorDetail']['Description']
+            logger.error(f"BEA API Error: {error_msg}")
+            return None
 
-            # Debug: Log the response structure
-            logger.info(f"API Response keys: {list(data.keys())}")
-            if 'BEAAPI' in data:
-                logger.info(f"BEAAPI keys: {list(data['BEAAPI'].keys())}")
-                if 'Results' in data['BEAAPI']:
-                    logger.info(f"Results keys: {list(data['BEAAPI']['Results'].keys())}")
-
-            # Extract data
-            if 'BEAAPI' in data and 'Results' in data['BEAAPI']:
-                if 'Data' in data['BEAAPI']['Results']:
-                    results = data['BEAAPI']['Results']['Data']
-                    logger.info(f"Successfully retrieved {len(results)} data points")
-                    return results
-                else:
-                    logger.error("No 'Data' key in Results")
-                    # Save the response for debugging
-                    debug_file = self.output_dir / "debug_response.json"
-                    with open(debug_file, 'w') as f:
-                        json.dump(data, f, indent=2)
-                    logger.info(f"Debug response saved to {debug_file}")
-                    return None
+        # Debug: Log the response structure
+        logger.info(f"API Response keys: {list(data.keys())}")
+        if 'BEAAPI' in data:
+            logger.info(f"BEAAPI keys: {list(data['BEAAPI'].keys())}")
+            if 'Results' in data['BEAAPI']:
+                logger.info(f"Results keys: {list(data['BEAAPI']['Results'].keys())}")
+
+        # Extract data
+        if 'BEAAPI' in data and 'Results' in data['BEAAPI']:
+            if 'Data' in data['BEAAPI']['Results']:
+                results = data['BEAAPI']['Results']['Data']
+                logger.info(f"Successfully retrieved {len(results)} data points for {table_name}")
+                return results
             else:
-                logger.error("Unexpected API response structure")
+                logger.error("No 'Data' key in Results")
+                # Save the response for debugging
+                debug_file = self.output_dir / "debug_response.json"
+                with open(debug_file, 'w') as f:
+                    json.dump(data, f, indent=2)
+                logger.info(f"Debug response saved to {debug_file}")
                 return None
+        else:
+            logger.error("Unexpected API response structure")
+            return None
+
+    def get_table_data(self, table_name=None):
+        """Collect corporate profits data from BEA NIPA Table 6.16D."""
+        table_name = table_name or self.table_name
+        logger.info(f"Starting data collection for {table_name}")
+
+        try:
+            logger.info("Sending request to BEA API...")
+            data = self.client.get(self._request_params(table_name))
+            logger.info("Data received from BEA API")
+            return self._extract_results(data, table_name)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed: {e}")
@@ -110,6 +124,22 @@ class BEACorporateProfitsCollector:
             logger.error(f"JSON decode error: {e}")
             return None
 
+    def get_tables_data(self, table_names):
+        """Collect several NIPA tables in one batch (cached tables cost no request); failed tables map to None."""
+        table_names = list(table_names)
+        logger.info(f"Starting batch collection for {', '.join(table_names)}")
+        responses = self.client.get_many([self._request_params(name) for name in table_names],
+                                         return_exceptions=True)
+        logger.info(f"BEA client: {self.client.stats}")
+        results = {}
+        for name, data in zip(table_names, responses):
+            if isinstance(data, Exception):
+                logger.error(f"Request failed for {name}: {data}")
+                results[name] = None
+            else:
+                results[name] = self._extract_results(data, name)
+        return results
+
     def process_and_save_data(self, raw_data):
         """Process and save the corporate profits data."""
         if not raw_data:
@@ -187,8 +217,19 @@ class BEACorporateProfitsCollector:
 
 def main():
     """Main execution function."""
-    collector = BEACorporateProfitsCollector()
+    parser = argparse.ArgumentParser(description="Collect BEA NIPA Table 6.16D")
+    parser.add_argument('--offline', action='store_true', help="Serve responses from the cache only")
+    parser.add_argument('--ttl-hours', type=float, default=DEFAULT_TTL / 3600,
+                        help="Hours a cached response is used without revalidation")
+    parser.add_argument('--base-url', default=BASE_URL, help="API endpoint (e.g. a local replay server)")
+    parser.add_argument('--no-snapshot', action='store_true', help="Do not record a vintage of data/modern")
+    args = parser.parse_args()
+
+    collector = BEACorporateProfitsCollector(offline=args.offline, ttl=args.ttl_hours * 3600,
+                                             base_url=args.base_url)
     success = collector.run_collection()
+    if success and not args.no_snapshot:
+        record_vintage("BEA NIPA T61600D collection")
 
     if success:
         print("\nSUCCESS: CORPORATE PROFITS DATA COLLECTION COMPLETE")
@@ -32,6 +32,9 @@ Output:
 
 Notes:
 - Uses archived BEA flat file: archive/.../bea-nipa/flatFiles/nipadataA.txt
+- The flat file is ingested once into an indexed store (data/cache/nipadataA,
+  see nipa_series_store.py); later runs read only the requested codes and
+  re-ingest automatically if the flat file changes.
 - If some years are missing for any input, those years are omitted (no fill).
 """
 
@@ -40,10 +43,12 @@ from __future__ import annotations
 import csv
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import pandas as pd
 
+from nipa_series_store import open_or_build
+
 
 @dataclass(frozen=True)
 class SeriesSpec:
@@ -51,11 +56,17 @@ class SeriesSpec:
     label: str
 
 
-def read_nipa_series(flat_file: Path, codes: Iterable[str]) -> pd.DataFrame:
+def read_nipa_series(flat_file: Path, codes: Iterable[str], store_dir: Optional[Path] = None) -> pd.DataFrame:
     """Read selected series (annual) from BEA nipadataA flat file into wide DF.
 
+    If `store_dir` is given, codes are fetched from the indexed series store
+    (built from `flat_file` on first use) instead of scanning the flat file.
+
     Returns DataFrame with columns: year (int), and one column per code (float).
     """
+    if store_dir is not None:
+        return open_or_build(flat_file, store_dir).read(codes)
+
     wanted = set(codes)
     rows: Dict[str, Dict[int, float]] = {c: {} for c in wanted}
     with flat_file.open('r', encoding='utf-8', newline='') as f:
@@ -128,7 +139,8 @@ def main() -> None:
     base = Path(__file__).resolve().parents[2]
     # Inputs
     flat = base / 'archive' / 'deprecated_code' / 'deprecated_databases' / 'Database_Leontief_original' / 'data' / 'raw' / 'bea-nipa' / 'flatFiles' / 'nipadataA.txt'
-    if not flat.exists():
+    store_dir = base / 'data' / 'cache' / 'nipadataA'
+    if not flat.exists() and not (store_dir / 'index.json').exists():
         raise FileNotFoundError(f"BEA flat file not found: {flat}")
 
     # Target output
@@ -142,7 +154,7 @@ def main() -> None:
     COMP_GOV_ENT = SeriesSpec('A4081C', 'Compensation of employees: Government enterprises (current $)')
 
     codes = [NDP_BUS.code, COMP_PRIV.code, COMP_GOV_ENT.code]
-    raw = read_nipa_series(flat, codes)
+    raw = read_nipa_series(flat, codes, store_dir=store_dir)
 
     # Build SP
     sp = build_sp(raw, NDP_BUS.code, COMP_PRIV.code, COMP_GOV_ENT.code)
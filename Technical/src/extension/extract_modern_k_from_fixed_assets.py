@@ -20,18 +20,33 @@ Output:
 - data/modern/processed/bea_fixed_assets/private_net_stock_current_cost.csv
   columns: year, modern_K_st_consistent
 
+Batch extraction (asset type / industry panels):
+- extract_series_panel() pulls any list of SeriesCodes and/or a regex pattern
+  over SeriesCodes in a single pass over FixedAssets.txt. The file is split
+  into byte ranges scanned in parallel worker processes, and the result is
+  joined with SeriesRegister.txt metadata (SeriesLabel, MetricName, TableId...).
+- build_panel() pivots that long frame into a year x series panel.
+- CLI: python extract_modern_k_from_fixed_assets.py --pattern '^k1n' --out panel.csv
+
 No interpolation or transformation beyond type cleaning.
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
 import pandas as pd
 
 BASE = Path(__file__).resolve().parents[2]
 RAW_FIXED_ASSETS = BASE / "archive" / "deprecated_databases" / "Database_Leontief_original" / "data" / "raw" / "bea-fixedAssets" / "FlatFiles"
 FIXED_ASSETS_FILE = RAW_FIXED_ASSETS / "FixedAssets.txt"
+SERIES_REGISTER_FILE = RAW_FIXED_ASSETS / "SeriesRegister.txt"
 OUTPUT_DIR = BASE / "data" / "modern" / "processed" / "bea_fixed_assets"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 OUT_FILE = OUTPUT_DIR / "private_net_stock_current_cost.csv"
@@ -48,8 +63,7 @@ def load_series(series_code: str) -> pd.DataFrame:
     # FixedAssets.txt is large; we iterate line-by-line
     with FIXED_ASSETS_FILE.open("r", encoding="utf-8") as f:
         reader = csv.reader(f)
-        header = next(reader)  # [%SeriesCode, Period, Value]
-        # Normalize the first column header (sometimes prefixed with %)
+        next(reader)  # header: [%SeriesCode, Period, Value] (first column sometimes prefixed with %)
         # We just parse positionally
         for scode, period, value in reader:
             if scode == series_code:
@@ -63,13 +77,127 @@ def load_series(series_code: str) -> pd.DataFrame:
     return df
 
 
+def _chunk_ranges(path: Path, n_chunks: int) -> List[Tuple[int, int]]:
+    """Split the file into roughly equal byte ranges [start, end)."""
+    size = path.stat().st_size
+    n_chunks = max(1, min(n_chunks, size // (1 << 20) + 1))  # no point in chunks under ~1 MB
+    step = size // n_chunks + 1
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def _scan_chunk(path: str, start: int, end: int, codes: Optional[frozenset], pattern: Optional[str]) -> List[Tuple[str, int, Optional[float]]]:
+    """Collect (code, year, value) for matching lines that *start* inside [start, end)."""
+    regex = re.compile(pattern) if pattern else None
+    matched: List[str] = []
+    with open(path, "rb") as f:
+        if start > 0:
+            # Land on the first line beginning at or after `start`
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            scode = line.split(b",", 1)[0].strip().strip(b'"').decode("utf-8")
+            if (codes is not None and scode in codes) or (regex is not None and regex.search(scode)):
+                matched.append(line.decode("utf-8"))
+
+    rows = []
+    for scode, period, value in csv.reader(matched):
+        try:
+            year = int(period)
+        except ValueError:
+            continue
+        v = None
+        if value is not None and value != "":
+            v = float(str(value).replace(",", ""))
+        rows.append((scode.strip().strip('"'), year, v))
+    return rows
+
+
+def load_series_register(register_file: Path = SERIES_REGISTER_FILE) -> pd.DataFrame:
+    """Load SeriesRegister.txt with the leading '%' stripped from column names."""
+    if not register_file.exists():
+        raise FileNotFoundError(f"Series register not found: {register_file}")
+    reg = pd.read_csv(register_file, dtype=str)
+    reg.columns = [c.lstrip("%").strip() for c in reg.columns]
+    return reg.drop_duplicates("SeriesCode")
+
+
+def extract_series_panel(codes: Optional[Iterable[str]] = None, pattern: Optional[str] = None,
+                         workers: Optional[int] = None, fixed_assets_file: Path = FIXED_ASSETS_FILE,
+                         register_file: Optional[Path] = SERIES_REGISTER_FILE) -> pd.DataFrame:
+    """Extract many series from FixedAssets.txt in one (parallel) pass.
+
+    Args:
+        codes: explicit SeriesCodes to keep
+        pattern: regex matched against SeriesCode (re.search); combined with `codes` as OR
+        workers: worker processes for the chunked scan (default: os.cpu_count(); 1 = in-process)
+        fixed_assets_file: path to FixedAssets.txt
+        register_file: SeriesRegister.txt to join metadata from (None to skip)
+
+    Returns:
+        Long DataFrame: SeriesCode, year, value (+ register metadata columns), sorted by code/year
+    """
+    if codes is None and pattern is None:
+        raise ValueError("Provide series codes and/or a SeriesCode pattern")
+    if not fixed_assets_file.exists():
+        raise FileNotFoundError(f"Fixed assets file not found: {fixed_assets_file}")
+
+    code_set = frozenset(codes) if codes is not None else None
+    workers = workers or os.cpu_count() or 1
+    ranges = _chunk_ranges(fixed_assets_file, workers)
+
+    if workers == 1 or len(ranges) == 1:
+        parts = [_scan_chunk(str(fixed_assets_file), s, e, code_set, pattern) for s, e in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_scan_chunk, str(fixed_assets_file), s, e, code_set, pattern) for s, e in ranges]
+            parts = [fut.result() for fut in futures]
+
+    rows = [r for part in parts for r in part]
+    df = pd.DataFrame(rows, columns=["SeriesCode", "year", "value"])
+    # Later lines win on duplicate (code, year), as in a sequential scan
+    df = df.drop_duplicates(["SeriesCode", "year"], keep="last").sort_values(["SeriesCode", "year"]).reset_index(drop=True)
+
+    if register_file is not None and register_file.exists():
+        df = df.merge(load_series_register(register_file), on="SeriesCode", how="left")
+    return df
+
+
+def build_panel(long_df: pd.DataFrame, columns: str = "SeriesLabel") -> pd.DataFrame:
+    """Pivot the long extract into a year x series panel (one column per asset type/series)."""
+    if columns not in long_df.columns:
+        raise KeyError(f"Column '{columns}' not in extract; use columns='SeriesCode'")
+    per_key = long_df.groupby(columns)["SeriesCode"].nunique()
+    if (per_key > 1).any():
+        raise ValueError(f"'{columns}' is not unique per SeriesCode ({list(per_key[per_key > 1].index)[:5]}); use columns='SeriesCode'")
+    return long_df.pivot(index="year", columns=columns, values="value").sort_index()
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract BEA Fixed Assets series")
+    parser.add_argument("--codes", nargs="*", help="SeriesCodes for a batch panel extract")
+    parser.add_argument("--pattern", help="Regex over SeriesCode for a batch panel extract")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel scan workers")
+    parser.add_argument("--columns", default="SeriesLabel", help="Panel column key (SeriesLabel or SeriesCode)")
+    parser.add_argument("--out", type=Path, default=OUTPUT_DIR / "fixed_assets_panel.csv")
+    args = parser.parse_args()
+
+    if args.codes or args.pattern:
+        long_df = extract_series_panel(args.codes or None, args.pattern, workers=args.workers)
+        panel = build_panel(long_df, columns=args.columns)
+        panel.to_csv(args.out)
+        print(f"Wrote fixed assets panel to: {args.out}")
+        print(f"Series: {panel.shape[1]}; years: {int(panel.index.min())}-{int(panel.index.max())}")
+        return
+
     df = load_series(TARGET_SERIES)
     # Keep modern period coverage but export full series for transparency
-  out = df.rename(columns={"value": "modern_K_st_consistent"})
-  # Add normalized placeholder identical to raw; enables explicit unit/scope alignment later
-  out["modern_K_st_consistent_norm"] = out["modern_K_st_consistent"]
-  out.to_csv(OUT_FILE, index=False)
+    out = df.rename(columns={"value": "modern_K_st_consistent"})
+    # Add normalized placeholder identical to raw; enables explicit unit/scope alignment later
+    out["modern_K_st_consistent_norm"] = out["modern_K_st_consistent"]
+    out.to_csv(OUT_FILE, index=False)
     print(f"Wrote modern K series to: {OUT_FILE}")
     print(f"Years: {int(out['year'].min())}-{int(out['year'].max())}; count={len(out)}")
 
@@ -4,8 +4,13 @@ Collects G.17 Industrial Production and Capacity Utilization (1990-2025)
 
 This script collects capacity utilization data required for the utilization rate (u)
 in the Shaikh & Tonak extension to present day.
+
+--concurrent fetches the series through AsyncFREDCollector
+(fred_async_collector.py) instead of one blocking request at a time;
+--all-g17 collects every capacity-utilization series of the G.17 release.
 """
 
+import argparse
 import requests
 import pandas as pd
 import json
@@ -14,6 +19,9 @@ from pathlib import Path
 from datetime import datetime
 import logging
 
+from frequency_conversion import convert, panel_from_observations
+from vintage_store import record_vintage
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -99,29 +107,37 @@ class FREDCapacityUtilizationCollector:
             logger.error(f"JSON decode error: {e}")
             return None
 
-    def process_monthly_to_annual(self, monthly_data):
+    def process_monthly_to_annual(self, monthly_data, series_id=None):
         """Convert monthly capacity utilization data to annual averages."""
         if not monthly_data:
             return None
 
         logger.info("Converting monthly data to annual averages...")
-
-        # Convert to DataFrame
-        df = pd.DataFrame(monthly_data)
-        df['date'] = pd.to_datetime(df['date'])
-        df['value'] = pd.to_numeric(df['value'], errors='coerce')
-        df['year'] = df['date'].dt.year
-
-        # Filter out missing values
-        df = df.dropna(subset=['value'])
-
-        # Calculate annual averages
-        annual_data = df.groupby('year')['value'].mean().reset_index()
-        annual_data['value'] = annual_data['value'].round(3)
+        annual_data = self.process_panel_to_annual({series_id or self.primary_series: monthly_data})
+        annual_data = next(iter(annual_data.values()), pd.DataFrame(columns=['year', 'value']))
 
         logger.info(f"Converted to {len(annual_data)} annual observations")
         return annual_data
 
+    def process_panel_to_annual(self, monthly_by_series, how='mean', min_obs=1):
+        """
+        Convert many monthly series to annual values in one vectorized pass.
+
+        Args:
+            monthly_by_series: {series_id: FRED observations}
+            how: 'mean', 'sum', 'last', 'first' or 'weighted' (see frequency_conversion)
+            min_obs: Months required for a year to be kept ('all': complete years only)
+
+        Returns:
+            {series_id: DataFrame(year, value)}, values rounded to 3 decimals
+        """
+        annual = convert(panel_from_observations(monthly_by_series), to='A', how=how, min_obs=min_obs)
+        annual['value'] = annual['value'].round(3)
+        return {
+            str(series_id): group[['year', 'value']].reset_index(drop=True)
+            for series_id, group in annual.groupby('series_id', sort=False, observed=True)
+        }
+
     def save_data(self, series_id, monthly_data, annual_data):
         """Save both monthly and annual data."""
         # Save monthly data
@@ -175,7 +191,7 @@ class FREDCapacityUtilizationCollector:
 
                 if monthly_data:
                     # Convert to annual
-                    annual_data = self.process_monthly_to_annual(monthly_data)
+                    annual_data = self.process_monthly_to_annual(monthly_data, series_id)
 
                     if annual_data is not None:
                         # Save data
@@ -204,10 +220,83 @@ class FREDCapacityUtilizationCollector:
             logger.error(f"Collection failed with error: {e}")
             return False
 
+    def run_collection_concurrent(self, all_g17=False, concurrency=8, rate=2.0, base_url=None):
+        """
+        Run the collection with concurrent, rate-limited requests.
+
+        Args:
+            all_g17: Collect every capacity-utilization series of the G.17
+                     release instead of series_list
+            concurrency: Requests in flight at once
+            rate: Requests per second (FRED allows 120 per minute)
+            base_url: API root override (e.g. a MockFREDServer)
+        """
+        from fred_async_collector import AsyncFREDCollector
+
+        logger.info("="*60)
+        logger.info("STARTING CONCURRENT CAPACITY UTILIZATION COLLECTION")
+        logger.info("="*60)
+
+        collector = AsyncFREDCollector(
+            api_key=self.api_key,
+            base_url=base_url or self.base_url.rsplit('/series/', 1)[0],
+            concurrency=concurrency,
+            rate=rate,
+            start_date=self.start_date,
+            end_date=self.end_date,
+        )
+
+        try:
+            if all_g17:
+                for series in collector.release_series_sync():
+                    self.series_list.setdefault(series['id'], series.get('title', ''))
+                logger.info(f"G.17 release: {len(self.series_list)} capacity utilization series")
+
+            started = time.time()
+            results = collector.collect_sync(self.series_list)
+            logger.info(f"Fetched {len(results)} series in {time.time() - started:.1f}s ({collector.stats})")
+
+            annual = self.process_panel_to_annual({s: obs for s, obs in results.items() if obs})
+
+            success_count = 0
+            for series_id, monthly_data in results.items():
+                if not monthly_data:
+                    logger.error(f"❌ Failed to collect data for {series_id}")
+                    continue
+                self.save_raw_data(series_id, {'series_id': series_id, 'observations': monthly_data})
+                annual_data = annual.get(series_id)
+                if annual_data is not None and self.save_data(series_id, monthly_data, annual_data):
+                    success_count += 1
+                else:
+                    logger.error(f"❌ Failed to process {series_id}")
+
+            logger.info("="*60)
+            logger.info(f"Success: {success_count}/{len(results)} series collected")
+            logger.info("="*60)
+            return success_count > 0
+
+        except Exception as e:
+            logger.error(f"Collection failed with error: {e}")
+            return False
+
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Collect FRED capacity utilization series")
+    parser.add_argument('--concurrent', action='store_true', help="Fetch series concurrently (asyncio)")
+    parser.add_argument('--all-g17', action='store_true', help="All G.17 capacity utilization series")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=2.0, help="Requests per second")
+    parser.add_argument('--base-url', help="FRED API root (e.g. a local mock server)")
+    parser.add_argument('--no-snapshot', action='store_true', help="Do not record a vintage of data/modern")
+    args = parser.parse_args()
+
     collector = FREDCapacityUtilizationCollector()
-    success = collector.run_collection()
+    if args.concurrent or args.all_g17:
+        success = collector.run_collection_concurrent(args.all_g17, args.concurrency, args.rate, args.base_url)
+    else:
+        success = collector.run_collection()
+    if success and not args.no_snapshot:
+        record_vintage("FRED capacity utilization collection")
 
     if success:
         print(f"\nSUCCESS: CAPACITY UTILIZATION DATA COLLECTION COMPLETE")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Frequency conversion for panels of series
+=========================================
+
+Converts many monthly (or quarterly) series to quarterly or annual values in
+one vectorized pass, instead of a DataFrame build and groupby per series.
+
+Input is a long panel with one row per observation:
+
+    series_id | date | value [| weight]
+
+panel_from_observations() builds it from FRED-style observation lists
+({series_id: [{'date': ..., 'value': ...}, ...]}); FRED's '.' for a missing
+value becomes NaN.
+
+convert() maps every row to a (series, target period) cell with integer
+codes and aggregates all cells at once with np.bincount / sorted reductions:
+
+- 'mean'      average of the available observations
+- 'sum'       total (flows)
+- 'last'      end-of-period value (latest available observation)
+- 'first'     start-of-period value
+- 'weighted'  sum(weight * value) / sum(weight) over the available rows
+
+Completeness: each output row carries n_obs and `complete` (all expected
+months/quarters present). min_obs drops periods with fewer observations:
+1 keeps any partial period (the behaviour of the old annual mean), 'all'
+keeps complete periods only.
+
+    panel = panel_from_observations(results)
+    annual = convert(panel, to='A', how='mean', min_obs='all')
+    quarterly = convert(panel, to='Q', how='last')
+    annual_from_q = convert(quarterly, to='A', source='Q', how='sum')
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+PERIODS_PER_YEAR = {"M": 12, "Q": 4, "A": 1}
+METHODS = ("mean", "sum", "last", "first", "weighted")
+
+
+def panel_from_observations(observations: Mapping[str, Iterable[Dict]]) -> pd.DataFrame:
+    """Long panel (series_id, date, value) from FRED-style observation lists."""
+    ids: List[str] = []
+    dates: List[str] = []
+    values: List[str] = []
+    for series_id, rows in observations.items():
+        if not rows:
+            continue
+        rows = list(rows)
+        ids.extend([series_id] * len(rows))
+        dates.extend(r["date"] for r in rows)
+        values.extend(r["value"] for r in rows)
+    return pd.DataFrame({
+        "series_id": pd.Categorical(ids),
+        "date": pd.to_datetime(pd.Series(dates, dtype=object), format="%Y-%m-%d"),
+        "value": pd.to_numeric(pd.Series(values, dtype=object), errors="coerce"),
+    })
+
+
+def _period_index(panel: pd.DataFrame, source: str, date_col: str):
+    """Year and within-year period (month 0-11 or quarter 0-3) of each row."""
+    if date_col in panel:
+        dates = pd.DatetimeIndex(panel[date_col])
+        year = dates.year.to_numpy()
+        sub = dates.month.to_numpy() - 1 if source == "M" else dates.quarter.to_numpy() - 1
+    else:
+        # Output of a previous convert(): year (+ quarter) columns
+        year = panel["year"].to_numpy()
+        sub = panel["quarter"].to_numpy() - 1 if source == "Q" else np.zeros(len(panel), dtype=int)
+    return year.astype(np.int64), sub.astype(np.int64)
+
+
+def convert(panel: pd.DataFrame, to: str = "A", how: str = "mean", source: str = "M",
+            min_obs: Union[int, str] = 1, series_col: str = "series_id", date_col: str = "date",
+            value_col: str = "value", weight_col: str = "weight") -> pd.DataFrame:
+    """
+    Aggregate every series of a long panel to a lower frequency in one pass.
+
+    Args:
+        panel: Long panel (series_col, date_col or year/quarter, value_col[, weight_col])
+        to: Target frequency, 'Q' or 'A'
+        how: One of METHODS
+        source: Frequency of the panel, 'M' or 'Q'
+        min_obs: Minimum observations per output period, or 'all' for
+                 complete periods only
+        weight_col: Weights for how='weighted'
+
+    Returns:
+        Long frame: series_id, year, [quarter,] value, n_obs, complete
+    """
+    if how not in METHODS:
+        raise ValueError(f"Unknown aggregation {how!r}; expected one of {METHODS}")
+    if PERIODS_PER_YEAR.get(source, 0) <= PERIODS_PER_YEAR.get(to, 0) or to not in ("Q", "A"):
+        raise ValueError(f"Cannot convert {source} to {to}")
+    if how == "weighted" and weight_col not in panel:
+        raise ValueError(f"how='weighted' needs a {weight_col!r} column")
+
+    per_target = PERIODS_PER_YEAR[source] // PERIODS_PER_YEAR[to]
+    required = per_target if min_obs == "all" else int(min_obs)
+
+    values = panel[value_col].to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    if how == "weighted":
+        weights = panel[weight_col].to_numpy(dtype=float)
+        valid &= ~np.isnan(weights)
+
+    codes, names = pd.factorize(panel[series_col], sort=True)
+    year, sub = _period_index(panel, source, date_col)
+    if not valid.any():
+        return _empty(to)
+
+    # One integer cell id per (series, target period)
+    first_year = year[valid].min()
+    n_years = year[valid].max() - first_year + 1
+    per_year = PERIODS_PER_YEAR[to]
+    period = (year - first_year) * per_year + sub // per_target
+    n_cells = len(names) * n_years * per_year
+    cell = codes.astype(np.int64) * n_years * per_year + period
+
+    cell, values, sub = cell[valid], values[valid], sub[valid]
+    n_obs = np.bincount(cell, minlength=n_cells)
+    if how in ("mean", "sum"):
+        totals = np.bincount(cell, weights=values, minlength=n_cells)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = totals / n_obs if how == "mean" else totals
+    elif how == "weighted":
+        w = weights[valid]
+        num = np.bincount(cell, weights=w * values, minlength=n_cells)
+        den = np.bincount(cell, weights=w, minlength=n_cells)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = num / den
+    else:
+        # Sort by cell then position within the period; take the edge of each run
+        order = np.lexsort((sub, cell))
+        sorted_cells = cell[order]
+        edges = np.flatnonzero(np.diff(sorted_cells)) + 1
+        starts = np.concatenate(([0], edges))
+        ends = np.concatenate((edges, [len(sorted_cells)])) - 1
+        pick = order[ends] if how == "last" else order[starts]
+        result = np.full(n_cells, np.nan)
+        result[sorted_cells[starts]] = values[pick]
+
+    keep = np.flatnonzero(n_obs >= max(required, 1))
+    series_code, period = np.divmod(keep, n_years * per_year)
+    out = pd.DataFrame({
+        "series_id": names[series_code],
+        "year": first_year + period // per_year,
+    })
+    if to == "Q":
+        out["quarter"] = period % per_year + 1
+    out["value"] = result[keep]
+    out["n_obs"] = n_obs[keep]
+    out["complete"] = n_obs[keep] >= per_target
+    return out
+
+
+def _empty(to: str) -> pd.DataFrame:
+    columns = ["series_id", "year"] + (["quarter"] if to == "Q" else []) + ["value", "n_obs", "complete"]
+    return pd.DataFrame(columns=columns)
+
+
+def annualize(observations: Mapping[str, Iterable[Dict]], how: str = "mean",
+              min_obs: Union[int, str] = 1) -> pd.DataFrame:
+    """Annual values of monthly FRED-style observation lists, all series in one call."""
+    return convert(panel_from_observations(observations), to="A", how=how, min_obs=min_obs)
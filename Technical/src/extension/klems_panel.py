@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Dense KLEMS panel
+=================
+
+The BEA-BLS KLEMS CSVs are long files (Industry Description, Year, Value,
+Workbook, Sheet) with the same strings on every row. This module ingests
+them once into a dense variable x industry x year array, so later steps
+slice NumPy views instead of re-reading, concatenating and grouping frames.
+
+Panel layout (one directory):
+- panel.bin   float64 array, shape (variables, industries, years), C order,
+              NaN where a file has no row for the cell
+- order.bin   int32 cell numbers (industry * n_years + year) of every
+              variable's rows in source-file order: which cells a file has
+              rows for (kept apart from NaN values) and the original row order
+- index.json  industries (categorical coding, first-appearance order),
+              years, and per variable its source file, column order,
+              constant columns (Workbook, Sheet) and row-order offsets, plus
+              a fingerprint (size, mtime) of every source file
+
+Each variable is one source file (one workbook sheet).
+
+Usage:
+    python klems_panel.py <klems_dir> <panel_dir>
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATA_FILE = 'panel.bin'
+ORDER_FILE = 'order.bin'
+INDEX_FILE = 'index.json'
+PANEL_VERSION = 1
+
+INDUSTRY = 'Industry Description'
+YEAR = 'Year'
+VALUE = 'Value'
+
+
+def _source_fingerprint(path: Path) -> Dict[str, int]:
+    st = path.stat()
+    return {'size': int(st.st_size), 'mtime_ns': int(st.st_mtime_ns)}
+
+
+def _fingerprints(sources: Dict[str, Path]) -> Dict[str, Dict[str, int]]:
+    return {str(Path(p)): _source_fingerprint(Path(p)) for p in sources.values() if Path(p).exists()}
+
+
+def build_panel(sources: Dict[str, Path], panel_dir: Path) -> Path:
+    """
+    Ingest KLEMS CSVs into a panel (one pass over each file).
+
+    Args:
+        sources: Variable name -> source CSV; files that do not exist are skipped
+        panel_dir: Output directory
+
+    Returns the panel directory.
+    """
+    frames: Dict[str, pd.DataFrame] = {}
+    meta_vars: Dict[str, Dict] = {}
+    for variable, path in sources.items():
+        path = Path(path)
+        if not path.exists():
+            logger.warning(f"KLEMS file not found: {path.name}")
+            continue
+        df = pd.read_csv(path)
+        if not {INDUSTRY, YEAR, VALUE} <= set(df.columns):
+            logger.warning(f"{path.name}: missing {INDUSTRY}/{YEAR}/{VALUE} columns, skipped")
+            continue
+        constants = {}
+        for column in df.columns:
+            if column in (INDUSTRY, YEAR, VALUE):
+                continue
+            values = df[column].dropna().unique()
+            if len(values) > 1:
+                logger.warning(f"{path.name}: column {column!r} is not constant, keeping {values[0]!r}")
+            # Text columns of a KLEMS sheet (Workbook, Sheet) are one value per file
+            constant = values[0] if len(values) else None
+            constants[column] = constant.item() if hasattr(constant, 'item') else constant
+        frames[variable] = df
+        meta_vars[variable] = {'file': path.name, 'columns': list(df.columns), 'constants': constants}
+
+    if not frames:
+        raise FileNotFoundError("No KLEMS source files found")
+
+    # Categorical coding shared by every variable, in first-appearance order
+    industries = pd.unique(pd.concat([df[INDUSTRY] for df in frames.values()], ignore_index=True))
+    years = np.unique(np.concatenate([df[YEAR].to_numpy(dtype=np.int64) for df in frames.values()]))
+    industry_code = {name: i for i, name in enumerate(industries)}
+    n_ind, n_years = len(industries), len(years)
+
+    data = np.full((len(frames), n_ind, n_years), np.nan)
+    orders = []
+    offset = 0
+    for v, (variable, df) in enumerate(frames.items()):
+        cells = (df[INDUSTRY].map(industry_code).to_numpy(dtype=np.int64) * n_years
+                 + np.searchsorted(years, df[YEAR].to_numpy(dtype=np.int64)))
+        data[v].reshape(-1)[cells] = df[VALUE].to_numpy(dtype=float)
+        meta_vars[variable]['order'] = [offset, len(cells)]
+        orders.append(cells.astype(np.int32))
+        offset += len(cells)
+
+    panel_dir = Path(panel_dir)
+    panel_dir.mkdir(parents=True, exist_ok=True)
+    # Write to temp names and swap in, so a crashed ingest never leaves a half panel
+    tmp_data = panel_dir / (DATA_FILE + '.tmp')
+    tmp_order = panel_dir / (ORDER_FILE + '.tmp')
+    tmp_index = panel_dir / (INDEX_FILE + '.tmp')
+    data.tofile(tmp_data)
+    np.concatenate(orders).tofile(tmp_order)
+    meta = {
+        'version': PANEL_VERSION,
+        'shape': list(data.shape),
+        'industries': [str(i) for i in industries],
+        'years': [int(y) for y in years],
+        'variables': meta_vars,
+        'fingerprint': _fingerprints(sources),
+    }
+    tmp_index.write_text(json.dumps(meta), encoding='utf-8')
+    os.replace(tmp_data, panel_dir / DATA_FILE)
+    os.replace(tmp_order, panel_dir / ORDER_FILE)
+    os.replace(tmp_index, panel_dir / INDEX_FILE)
+    return panel_dir
+
+
+class KLEMSPanel:
+    """Read-only view over a built panel; the array is memory-mapped, not loaded."""
+
+    def __init__(self, panel_dir: Path):
+        self.panel_dir = Path(panel_dir)
+        meta = json.loads((self.panel_dir / INDEX_FILE).read_text(encoding='utf-8'))
+        if meta.get('version') != PANEL_VERSION:
+            raise RuntimeError(f"Unsupported KLEMS panel version in {self.panel_dir}: {meta.get('version')}")
+        self.meta = meta
+        self.industries = np.asarray(meta['industries'], dtype=object)
+        self.years = np.asarray(meta['years'], dtype=np.int64)
+        self.variables: List[str] = list(meta['variables'])
+        self.data = np.memmap(self.panel_dir / DATA_FILE, dtype=np.float64, mode='r', shape=tuple(meta['shape']))
+        self._order = np.memmap(self.panel_dir / ORDER_FILE, dtype=np.int32, mode='r')
+
+    def is_current(self, sources: Dict[str, Path]) -> bool:
+        """True if the panel was built from exactly these files as they are on disk now."""
+        wanted = {v for v, p in sources.items() if Path(p).exists()}
+        return _fingerprints(sources) == self.meta.get('fingerprint') and wanted == set(self.variables)
+
+    def __contains__(self, variable: str) -> bool:
+        return variable in self.meta['variables']
+
+    def get(self, variable: str) -> np.ndarray:
+        """Industry x year slice of one variable (a read-only view)."""
+        return self.data[self.variables.index(variable)]
+
+    def row_order(self, variable: str) -> np.ndarray:
+        offset, count = self.meta['variables'][variable]['order']
+        return np.asarray(self._order[offset:offset + count])
+
+    def present(self, variable: str) -> np.ndarray:
+        """Industry x year mask of the cells the source file has a row for."""
+        mask = np.zeros(self.data.shape[1:], dtype=bool)
+        mask.reshape(-1)[self.row_order(variable)] = True
+        return mask
+
+    def constants(self, variable: str) -> Dict[str, Optional[str]]:
+        """Constant columns of the variable's source file (Workbook, Sheet)."""
+        return self.meta['variables'][variable]['constants']
+
+    def frame(self, variable: Optional[str] = None, values: Optional[np.ndarray] = None,
+              mask: Optional[np.ndarray] = None, order: str = 'source',
+              columns: Optional[Sequence[str]] = None,
+              extra: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+        """
+        Long frame (Industry Description, Year, Value) of a variable or of any
+        industry x year array.
+
+        Args:
+            variable: Stored variable (supplies row order and, unless `extra`
+                      is given, its constant columns and column order)
+            values: Array to emit as Value instead of the stored slice
+            mask: Cells to emit (default: the variable's source rows, or the
+                  non-NaN cells of `values`)
+            order: 'source' (the variable's file order) or 'sorted' (industry name, year)
+            columns: Column order of the result
+            extra: Further industry x year arrays to emit as named columns
+        """
+        if mask is None:
+            mask = self.present(variable) if variable is not None else ~np.isnan(values)
+        values = self.get(variable) if values is None else values
+        n_years = len(self.years)
+        if order == 'source' and variable is not None:
+            cells = self.row_order(variable)
+            cells = cells[mask.reshape(-1)[cells]]
+        else:
+            cells = np.flatnonzero(mask)
+            if order == 'sorted':
+                rank = np.empty(len(self.industries), dtype=np.int64)
+                rank[np.argsort(self.industries.astype(str), kind='stable')] = np.arange(len(self.industries))
+                cells = cells[np.lexsort((cells % n_years, rank[cells // n_years]))]
+        ind, yr = np.divmod(cells, n_years)
+        frame = pd.DataFrame({
+            INDUSTRY: self.industries[ind],
+            YEAR: self.years[yr],
+            VALUE: np.asarray(values).reshape(-1)[cells],
+        })
+        for column, array in (extra or {}).items():
+            frame[column] = np.asarray(array).reshape(-1)[cells]
+        if variable is not None and not extra:
+            for column, constant in self.constants(variable).items():
+                frame[column] = constant
+            if columns is None:
+                columns = self.meta['variables'][variable]['columns']
+        return frame[list(columns)] if columns is not None else frame
+
+
+def open_or_build(sources: Dict[str, Path], panel_dir: Path) -> KLEMSPanel:
+    """Open the panel at `panel_dir`, (re)ingesting the sources if missing or stale."""
+    if (Path(panel_dir) / INDEX_FILE).exists():
+        panel = KLEMSPanel(panel_dir)
+        if panel.is_current(sources):
+            return panel
+    build_panel(sources, panel_dir)
+    return KLEMSPanel(panel_dir)
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    klems_dir, out = Path(sys.argv[1]), Path(sys.argv[2])
+    sources = {p.stem.split('__')[-1]: p for p in sorted(klems_dir.glob('*.csv'))}
+    build_panel(sources, out)
+    panel = KLEMSPanel(out)
+    v, i, y = panel.data.shape
+    print(f"Built KLEMS panel at {out}: {v} variables x {i} industries x {y} years")
+
+
+if __name__ == '__main__':
+    main()
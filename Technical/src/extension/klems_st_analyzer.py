@@ -16,6 +16,9 @@ from pathlib import Path
 from datetime import datetime
 import logging
 
+from klems_panel import INDUSTRY, VALUE, YEAR, open_or_build
+from vintage_store import record_vintage
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -27,6 +30,8 @@ class KLEMSSTAnalyzer:
         self.klems_dir = self.base_dir / "archive" / "deprecated_code" / "deprecated_databases" / "Database_Leontief_original" / "data" / "processed" / "klems"
         self.output_dir = self.base_dir / "data" / "modern" / "klems_processed"
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.panel_dir = self.base_dir / "data" / "cache" / "klems_panel"
+        self.panel = None
 
         # Key S&T variables we need to extract from KLEMS
         self.st_variables = {
@@ -95,73 +100,85 @@ class KLEMSSTAnalyzer:
             logger.error("Failed to load NAICS mapping")
             return None
 
+    @staticmethod
+    def _sheet(filename):
+        """Panel variable name of a KLEMS file: its workbook sheet, e.g. 'Capital_Art_Quantity'."""
+        return filename.split('__')[1].rsplit('.', 1)[0]
+
+    def load_panel(self):
+        """Open the dense KLEMS panel, ingesting the source CSVs on first use or when they change."""
+        if self.panel is None:
+            sources = {self._sheet(f): self.klems_dir / f
+                       for spec in self.st_variables.values() for f in spec['klems_sources']}
+            try:
+                self.panel = open_or_build(sources, self.panel_dir)
+            except FileNotFoundError as e:
+                logger.error(f"Failed to load KLEMS panel: {e}")
+                return None
+            n_vars, n_ind, n_years = self.panel.data.shape
+            logger.info(f"KLEMS panel: {n_vars} variables x {n_ind} industries x {n_years} years")
+        return self.panel
+
     def process_capital_stock(self):
         """Process KLEMS capital data to derive S&T capital stock (K)."""
         logger.info("Processing capital stock data...")
 
-        capital_files = self.st_variables['K']['klems_sources']
-        capital_dfs = []
-
-        for filename in capital_files:
-            df = self.load_klems_file(filename)
-            if df is not None:
-                # Add source identifier
-                df['capital_type'] = filename.split('__')[1].split('_')[1]  # Extract type (Art, IT, Other)
-                capital_dfs.append(df)
-
-        if not capital_dfs:
+        panel = self.load_panel()
+        sheets = [self._sheet(f) for f in self.st_variables['K']['klems_sources']]
+        sheets = [s for s in sheets if panel is not None and s in panel]
+        if not sheets:
             logger.error("No capital data files found")
             return None
 
-        # Combine all capital types
-        combined_capital = pd.concat(capital_dfs, ignore_index=True)
-
-        # Aggregate by industry and year (sum across capital types)
-        if 'Industry Description' in combined_capital.columns and 'Year' in combined_capital.columns:
-            capital_aggregated = combined_capital.groupby(['Industry Description', 'Year']).agg({
-                'Value': 'sum',  # Sum across capital types
-                'Workbook': 'first',  # Take the first workbook name
-                'Sheet': 'first'  # Take the first sheet name
-            }).reset_index()
-
-            logger.info(f"Capital stock processed: {len(capital_aggregated)} industry-year observations")
-            return capital_aggregated
-        else:
-            logger.error("Required columns (Industry Description, Year) not found in capital data")
-            logger.error(f"Available columns: {list(combined_capital.columns)}")
-            return None
+        # Sum across capital types (Art, IT, Other) wherever any type has a row;
+        # Workbook/Sheet come from the first type present, as groupby 'first' did
+        present = np.stack([panel.present(s) for s in sheets])
+        capital = np.zeros(present.shape[1:])
+        compensation = np.zeros_like(capital)
+        for sheet, rows in zip(sheets, present):
+            # Compensated summation in file order, step for step as pandas'
+            # groupby sum: NaN and absent cells are skipped (adding a zero
+            # would still move the compensation term), and a NaN compensation
+            # (inf values) is reset
+            values = panel.get(sheet)
+            take = rows & ~np.isnan(values)
+            y = values - compensation
+            t = capital + y
+            c = (t - capital) - y
+            c[np.isnan(c)] = 0.0
+            capital = np.where(take, t, capital)
+            compensation = np.where(take, c, compensation)
+        first = present.argmax(axis=0)
+        workbooks = np.array([panel.constants(s).get('Workbook') for s in sheets], dtype=object)
+        sheet_names = np.array([panel.constants(s).get('Sheet') for s in sheets], dtype=object)
+
+        capital_aggregated = panel.frame(values=capital, mask=present.any(axis=0), order='sorted',
+                                         extra={'Workbook': workbooks[first], 'Sheet': sheet_names[first]})
+
+        logger.info(f"Capital stock processed: {len(capital_aggregated)} industry-year observations")
+        return capital_aggregated
 
     def process_labor_data(self):
         """Process KLEMS labor data to derive S&T labor variables."""
         logger.info("Processing labor data...")
 
-        labor_files = self.st_variables['Labor']['klems_sources']
-        labor_data = {}
-
-        for filename in labor_files:
-            df = self.load_klems_file(filename)
-            if df is not None:
-                # Identify data type from filename
-                if 'Hours' in filename:
-                    labor_data['hours'] = df
-                elif 'NoCol_Compensation' in filename:
-                    labor_data['compensation_nocol'] = df
-                elif 'Col_Compensation' in filename:
-                    labor_data['compensation_col'] = df
-
-        if not labor_data:
+        panel = self.load_panel()
+        labor_sheets = {}
+        for filename in self.st_variables['Labor']['klems_sources']:
+            # Identify data type from filename
+            if 'Hours' in filename:
+                labor_sheets['hours'] = self._sheet(filename)
+            elif 'NoCol_Compensation' in filename:
+                labor_sheets['compensation_nocol'] = self._sheet(filename)
+            elif 'Col_Compensation' in filename:
+                labor_sheets['compensation_col'] = self._sheet(filename)
+
+        processed_labor = {data_type: panel.frame(sheet, columns=[INDUSTRY, YEAR, VALUE])
+                           for data_type, sheet in labor_sheets.items() if panel is not None and sheet in panel}
+        if not processed_labor:
             logger.error("No labor data files found")
             return None
 
-        # Process each component
-        processed_labor = {}
-        for data_type, df in labor_data.items():
-            if 'Industry Description' in df.columns and 'Year' in df.columns:
-                processed_labor[data_type] = df[['Industry Description', 'Year', 'Value']].copy()
-            else:
-                logger.warning(f"Required columns not found in {data_type}")
-                logger.warning(f"Available columns: {list(df.columns)}")
-
         logger.info(f"Labor data processed: {len(processed_labor)} components")
         return processed_labor
 
@@ -169,23 +186,23 @@ class KLEMSSTAnalyzer:
         """Process KLEMS output data (Gross Output and Value Added)."""
         logger.info("Processing output data...")
 
+        panel = self.load_panel()
         output_data = {}
-
-        # Process Gross Output
-        go_df = self.load_klems_file(self.st_variables['GO']['klems_sources'][0])
-        if go_df is not None:
-            output_data['gross_output'] = go_df
-
-        # Process Value Added
-        va_df = self.load_klems_file(self.st_variables['VA']['klems_sources'][0])
-        if va_df is not None:
-            output_data['value_added'] = va_df
+        for name, var in (('gross_output', 'GO'), ('value_added', 'VA')):
+            sheet = self._sheet(self.st_variables[var]['klems_sources'][0])
+            if panel is not None and sheet in panel:
+                output_data[name] = panel.frame(sheet)
 
         logger.info(f"Output data processed: {len(output_data)} series")
         return output_data
 
     def calculate_st_surplus(self, output_data, labor_data):
-        """Calculate surplus variables for S&T analysis."""
+        """
+        Calculate surplus variables for S&T analysis.
+
+        Computed on the panel's industry x year slices; output_data and
+        labor_data say which components were loaded.
+        """
         logger.info("Calculating S&T surplus variables...")
 
         if 'gross_output' not in output_data or 'value_added' not in output_data:
@@ -196,36 +213,26 @@ class KLEMSSTAnalyzer:
             logger.error("Required labor compensation data not available")
             return None
 
-        # Get the data
-        go_df = output_data['gross_output'].copy()
-        va_df = output_data['value_added'].copy()
-        comp_nocol = labor_data['compensation_nocol'].copy()
-        comp_col = labor_data['compensation_col'].copy()
-
-        # Merge labor compensation
-        total_compensation = pd.merge(
-            comp_nocol[['Industry Description', 'Year', 'Value']],
-            comp_col[['Industry Description', 'Year', 'Value']],
-            on=['Industry Description', 'Year'],
-            suffixes=('_nocol', '_col'),
-            how='outer'
-        )
-        total_compensation['total_labor_comp'] = (
-            total_compensation['Value_nocol'].fillna(0) +
-            total_compensation['Value_col'].fillna(0)
-        )
-
-        # Merge with Value Added to calculate surplus
-        surplus_data = pd.merge(
-            va_df[['Industry Description', 'Year', 'Value']],
-            total_compensation[['Industry Description', 'Year', 'total_labor_comp']],
-            on=['Industry Description', 'Year'],
-            how='inner'
-        )
-
-        # Calculate surplus as Value Added - Total Labor Compensation
-        surplus_data['surplus'] = surplus_data['Value'] - surplus_data['total_labor_comp']
-        surplus_data['surplus_rate'] = surplus_data['surplus'] / surplus_data['Value']
+        panel = self.load_panel()
+        va_sheet = self._sheet(self.st_variables['VA']['klems_sources'][0])
+        nocol_sheet, col_sheet = [self._sheet(f) for f in self.st_variables['Labor']['klems_sources']
+                                  if 'Col_Compensation' in f]
+
+        # Total labor compensation wherever either component has a row (missing counts as 0)
+        total_labor_comp = np.nan_to_num(panel.get(nocol_sheet)) + np.nan_to_num(panel.get(col_sheet))
+        has_comp = panel.present(nocol_sheet) | panel.present(col_sheet)
+
+        # Surplus as Value Added - Total Labor Compensation, where both exist
+        value_added = panel.get(va_sheet)
+        surplus = value_added - total_labor_comp
+        with np.errstate(divide='ignore', invalid='ignore'):
+            surplus_rate = surplus / value_added
+
+        surplus_data = panel.frame(va_sheet, mask=panel.present(va_sheet) & has_comp, extra={
+            'total_labor_comp': total_labor_comp,
+            'surplus': surplus,
+            'surplus_rate': surplus_rate,
+        })
 
         logger.info(f"Surplus calculated for {len(surplus_data)} industry-year observations")
         return surplus_data
@@ -347,6 +354,8 @@ def main():
     """Main execution function."""
     analyzer = KLEMSSTAnalyzer()
     success = analyzer.run_analysis()
+    if success:
+        record_vintage("KLEMS S&T analysis")
 
     if success:
         print("\nSUCCESS: KLEMS S&T ANALYSIS COMPLETE")
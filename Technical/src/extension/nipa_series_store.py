@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Indexed series store for the BEA nipadataA flat file
+====================================================
+
+`nipadataA.txt` is a long (SeriesCode, Period, Value) CSV with every annual
+NIPA series in it. Pulling a handful of codes from it means a full csv.reader
+pass each time. This module ingests the flat file once into a binary store
+partitioned by series code, so later reads seek straight to the codes needed.
+
+Store layout (one directory):
+- series.bin   fixed-width records (year int32, value float64), grouped by
+               series code and sorted by year within each code
+- index.json   {code: [record_offset, record_count]} plus a fingerprint
+               (size, mtime) of the source flat file
+
+Value cleaning matches `build_modern_sp_from_nipa.read_nipa_series`: commas
+and quotes are stripped, and '', '.', 'NA' or unparseable values are dropped.
+No interpolation or fill is applied.
+
+Usage:
+    python nipa_series_store.py <nipadataA.txt> <store_dir>
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+RECORD_DTYPE = np.dtype([('year', '<i4'), ('value', '<f8')])
+DATA_FILE = 'series.bin'
+INDEX_FILE = 'index.json'
+STORE_VERSION = 1
+
+
+def _source_fingerprint(flat_file: Path) -> Dict[str, int]:
+    st = flat_file.stat()
+    return {'size': int(st.st_size), 'mtime_ns': int(st.st_mtime_ns)}
+
+
+def _parse_value(val_str: str) -> Optional[float]:
+    s = val_str.strip().replace(',', '').replace('"', '')
+    if s in ('', '.', 'NA'):
+        return None
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def build_store(flat_file: Path, store_dir: Path) -> Path:
+    """Ingest the whole flat file into `store_dir` (one full pass, done once).
+
+    Returns the store directory.
+    """
+    rows: Dict[str, Dict[int, float]] = {}
+    with flat_file.open('r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        for code, year_str, val_str in reader:
+            try:
+                y = int(year_str)
+            except ValueError:
+                continue  # header or malformed period
+            v = _parse_value(val_str)
+            if v is None:
+                continue
+            rows.setdefault(code, {})[y] = v
+
+    codes = sorted(rows)
+    total = sum(len(rows[c]) for c in codes)
+    records = np.empty(total, dtype=RECORD_DTYPE)
+    index: Dict[str, list] = {}
+    pos = 0
+    for code in codes:
+        series = rows[code]
+        n = len(series)
+        years = np.fromiter(sorted(series), dtype=np.int32, count=n)
+        records['year'][pos:pos + n] = years
+        records['value'][pos:pos + n] = [series[int(y)] for y in years]
+        index[code] = [pos, n]
+        pos += n
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    # Write to temp names and swap in, so a crashed ingest never leaves a half store
+    tmp_data = store_dir / (DATA_FILE + '.tmp')
+    tmp_index = store_dir / (INDEX_FILE + '.tmp')
+    records.tofile(tmp_data)
+    meta = {
+        'version': STORE_VERSION,
+        'source': str(flat_file),
+        'fingerprint': _source_fingerprint(flat_file),
+        'n_series': len(codes),
+        'n_records': int(total),
+        'series': index,
+    }
+    tmp_index.write_text(json.dumps(meta), encoding='utf-8')
+    os.replace(tmp_data, store_dir / DATA_FILE)
+    os.replace(tmp_index, store_dir / INDEX_FILE)
+    return store_dir
+
+
+class NipaSeriesStore:
+    """Read-only view over a built store; data is memory-mapped, not loaded."""
+
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+        meta = json.loads((self.store_dir / INDEX_FILE).read_text(encoding='utf-8'))
+        if meta.get('version') != STORE_VERSION:
+            raise RuntimeError(f"Unsupported NIPA store version in {self.store_dir}: {meta.get('version')}")
+        self.meta = meta
+        self.index: Dict[str, list] = meta['series']
+        data_path = self.store_dir / DATA_FILE
+        if meta['n_records']:
+            self._records = np.memmap(data_path, dtype=RECORD_DTYPE, mode='r', shape=(meta['n_records'],))
+        else:
+            self._records = np.empty(0, dtype=RECORD_DTYPE)
+
+    def is_current(self, flat_file: Path) -> bool:
+        """True if the store was built from `flat_file` as it is on disk now."""
+        return flat_file.exists() and self.meta.get('fingerprint') == _source_fingerprint(flat_file)
+
+    def codes(self) -> list:
+        return list(self.index)
+
+    def get(self, code: str) -> pd.Series:
+        """One series as a year-indexed float Series (empty if code is unknown)."""
+        if code not in self.index:
+            return pd.Series(dtype=float, name=code)
+        offset, count = self.index[code]
+        block = self._records[offset:offset + count]
+        return pd.Series(np.asarray(block['value']), index=np.asarray(block['year']).astype(int), name=code)
+
+    def read(self, codes: Iterable[str]) -> pd.DataFrame:
+        """Same wide format as `read_nipa_series`: year column plus one float column per code."""
+        wanted = set(codes)
+        series = {c: self.get(c) for c in wanted}
+        years = sorted(set().union(*[set(s.index) for s in series.values()])) if series else []
+        df = pd.DataFrame({'year': years})
+        for c in wanted:
+            df[c] = df['year'].map(series[c]).astype(float)
+        return df
+
+
+def open_or_build(flat_file: Path, store_dir: Path) -> NipaSeriesStore:
+    """Open the store at `store_dir`, (re)ingesting `flat_file` if missing or stale."""
+    if (store_dir / INDEX_FILE).exists():
+        store = NipaSeriesStore(store_dir)
+        if store.is_current(flat_file) or not flat_file.exists():
+            return store
+    if not flat_file.exists():
+        raise FileNotFoundError(f"BEA flat file not found: {flat_file}")
+    build_store(flat_file, store_dir)
+    return NipaSeriesStore(store_dir)
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    flat, out = Path(sys.argv[1]), Path(sys.argv[2])
+    build_store(flat, out)
+    store = NipaSeriesStore(out)
+    print(f"Built NIPA store at {out}: {store.meta['n_series']} series, {store.meta['n_records']} records")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Vintage store for the modern data
+=================================
+
+Collections overwrite data/modern in place. This store records each
+collection as an immutable, numbered vintage in one SQLite file
+(data/vintages/modern_vintages.sqlite), so earlier states can be queried and
+compared without keeping CSV copies around.
+
+What a snapshot stores:
+- every file under data/modern, content-addressed (zlib blobs keyed by
+  sha256): an unchanged file costs one row in `files`, no new blob
+- every numeric column of every CSV with a year column, as a series:
+
+      <dir>/<file stem without year range>:<column>[<dims>]
+
+  e.g. 'final_results/shaikh_tonak_extended_FINAL:profit_rate' or
+  'klems_processed/st_surplus:surplus[Industry Description=Farms]'
+  (text columns become dimensions when a file has several rows per year).
+  Files whose stems differ only in the year range (x_1958_1989.csv,
+  x_1958_2025.csv) keep the range once a single vintage has held both, so
+  they never merge into one series; a file whose range rolls over
+  (x_1990_2024.csv replaced by x_1990_2025.csv) stays the same series
+- per series, a content hash in `series_versions`; observations go to
+  `revisions` only as deltas against the series' previous state (new or
+  changed years, and deletions), so an unchanged series adds one hash row
+
+Vintages are insert-only: triggers reject UPDATE and DELETE on every
+snapshot table.
+
+Queries are indexed lookups rather than CSV diffs:
+
+    store = VintageStore()
+    store.value('final_results/*:profit_rate', 1995, as_of='2025-09-28')
+    store.revisions('*modern_sp*', since='2025-09-01')
+    store.diff('2025-09-28', 'latest')
+
+Usage:
+    python vintage_store.py snapshot --note "after BEA refresh"
+    python vintage_store.py list
+    python vintage_store.py value 'final_results/*:profit_rate' 1995 --as-of 3
+    python vintage_store.py revisions '*SP*' --since 2025-09-01
+    python vintage_store.py diff 1 latest
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import re
+import sqlite3
+import zlib
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+MODERN_DIR = BASE_DIR / "data" / "modern"
+DB_PATH = BASE_DIR / "data" / "vintages" / "modern_vintages.sqlite"
+
+YEAR_RANGE = re.compile(r"_(\d{4})_(\d{4})(?=_|$)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vintages (
+    vintage_id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    note TEXT
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    vintage_id INTEGER NOT NULL REFERENCES vintages(vintage_id),
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL REFERENCES blobs(content_hash),
+    PRIMARY KEY (vintage_id, path)
+);
+CREATE TABLE IF NOT EXISTS series (
+    series_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    dims TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS series_versions (
+    series_id INTEGER NOT NULL REFERENCES series(series_id),
+    vintage_id INTEGER NOT NULL REFERENCES vintages(vintage_id),
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (series_id, vintage_id)
+);
+CREATE TABLE IF NOT EXISTS revisions (
+    series_id INTEGER NOT NULL REFERENCES series(series_id),
+    year INTEGER NOT NULL,
+    vintage_id INTEGER NOT NULL REFERENCES vintages(vintage_id),
+    value REAL,
+    PRIMARY KEY (series_id, year, vintage_id)
+);
+CREATE INDEX IF NOT EXISTS idx_versions_vintage ON series_versions(vintage_id, series_id);
+CREATE INDEX IF NOT EXISTS idx_revisions_vintage ON revisions(vintage_id);
+CREATE INDEX IF NOT EXISTS idx_files_hash ON files(content_hash);
+"""
+
+IMMUTABLE_TABLES = ("vintages", "blobs", "files", "series", "series_versions", "revisions")
+
+
+def _immutability_triggers() -> str:
+    sql = []
+    for table in IMMUTABLE_TABLES:
+        for action in ("UPDATE", "DELETE"):
+            sql.append(f"CREATE TRIGGER IF NOT EXISTS {table}_no_{action.lower()} BEFORE {action} ON {table} "
+                       f"BEGIN SELECT RAISE(ABORT, '{table} is immutable'); END;")
+    return "\n".join(sql)
+
+
+def series_base(rel_path: str) -> str:
+    """Series name prefix of a data file: relative path, no suffix, no year range."""
+    path = Path(rel_path)
+    return (path.parent / YEAR_RANGE.sub("", path.stem)).as_posix()
+
+
+def clashing_bases(path_sets) -> set:
+    """Series name prefixes shared by two different files within one set of paths."""
+    clashes = set()
+    for paths in path_sets:
+        seen: Dict[str, str] = {}
+        for rel in set(paths):
+            base = series_base(rel)
+            if seen.setdefault(base, rel) != rel:
+                clashes.add(base)
+    return clashes
+
+
+def series_bases(rel_paths, clashes=frozenset()) -> Dict[str, str]:
+    """
+    Series name prefix of each data file; files whose prefix is in `clashes`
+    keep their year range (relative path without suffix).
+    """
+    return {rel: Path(rel).with_suffix("").as_posix() if series_base(rel) in clashes else series_base(rel)
+            for rel in set(rel_paths)}
+
+
+def table_series(rel_path: str, data: bytes, base: Optional[str] = None) -> Dict[Tuple[str, str, str], pd.Series]:
+    """
+    Numeric series of one CSV, keyed by (name, column, dims).
+
+    Args:
+        rel_path: Path of the file under the data directory
+        data: File contents
+        base: Series name prefix (default: series_base(rel_path))
+
+    Returns an empty dict for files without a year column.
+    """
+    try:
+        df = pd.read_csv(BytesIO(data))
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+        return {}
+    year_col = next((c for c in df.columns if str(c).strip().lower() == "year"), None)
+    if year_col is None:
+        return {}
+    df[year_col] = pd.to_numeric(df[year_col], errors="coerce")
+    df = df.dropna(subset=[year_col])
+    if df.empty:
+        return {}
+    df[year_col] = df[year_col].astype(int)
+
+    value_cols = [c for c in df.columns if c != year_col and pd.api.types.is_numeric_dtype(df[c])]
+    text_cols = [c for c in df.columns if c != year_col and c not in value_cols]
+    dim_cols = text_cols if df[year_col].duplicated().any() else []
+
+    base = base or series_base(rel_path)
+    groups = df.groupby(dim_cols, sort=True, dropna=False) if dim_cols else [((), df)]
+    out = {}
+    for key, group in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        dims = ",".join(f"{c}={v}" for c, v in zip(dim_cols, key))
+        for column in value_cols:
+            values = group.groupby(year_col)[column].last().dropna().astype(float)
+            name = f"{base}:{column}" + (f"[{dims}]" if dims else "")
+            out[(name, str(column), dims)] = values
+    return out
+
+
+def series_hash(values: pd.Series) -> str:
+    years = values.index.to_numpy(dtype=np.int64)
+    return hashlib.sha256(years.tobytes() + values.to_numpy(dtype=np.float64).tobytes()).hexdigest()
+
+
+class VintageStore:
+    """
+    Immutable vintages of a data directory in one SQLite file.
+
+    Args:
+        db_path: Store file
+        data_dir: Directory snapshotted (data/modern)
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, data_dir: Path = MODERN_DIR):
+        self.db_path = Path(db_path)
+        self.data_dir = Path(data_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA + _immutability_triggers())
+
+    # -- writing ---------------------------------------------------------
+
+    def _series_ids(self, keys) -> Dict[str, int]:
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO series (name, path, column_name, dims) VALUES (?, ?, ?, ?)",
+            [(name, path, column, dims) for name, path, column, dims in keys])
+        return {row["name"]: row["series_id"] for row in self.conn.execute("SELECT series_id, name FROM series")}
+
+    def _latest_state(self) -> Dict[int, Dict[int, float]]:
+        """Current value of every (series, year), replaying all deltas."""
+        state: Dict[int, Dict[int, float]] = {}
+        rows = self.conn.execute(
+            "SELECT series_id, year, value FROM revisions ORDER BY series_id, year, vintage_id")
+        for row in rows:
+            years = state.setdefault(row["series_id"], {})
+            if row["value"] is None:
+                years.pop(row["year"], None)
+            else:
+                years[row["year"]] = row["value"]
+        return state
+
+    def snapshot(self, label: Optional[str] = None, note: str = "") -> Dict[str, int]:
+        """
+        Record the data directory as a new vintage.
+
+        Args:
+            label: Unique vintage label (default: 'v<id>')
+            note: Free-text description (e.g. which collector ran)
+
+        Returns:
+            vintage_id and counts of files, new blobs, series, new or changed
+            series and revision rows written
+        """
+        created = datetime.now().isoformat(timespec="seconds")
+        files = sorted(p for p in self.data_dir.rglob("*") if p.is_file())
+
+        with self.conn:
+            if label is None:
+                label = f"v{self.conn.execute('SELECT COALESCE(MAX(vintage_id), 0) + 1 FROM vintages').fetchone()[0]}"
+            cursor = self.conn.execute("INSERT INTO vintages (label, created_at, note) VALUES (?, ?, ?)",
+                                       (label, created, note))
+            vintage_id = cursor.lastrowid
+            known_blobs = {row[0] for row in self.conn.execute("SELECT content_hash FROM blobs")}
+            counts = {"vintage_id": vintage_id, "files": len(files), "new_blobs": 0,
+                      "series": 0, "changed_series": 0, "revisions": 0}
+
+            # Names clash only between files held by the same vintage (this one or
+            # any earlier one), so a clash once seen keeps its names, while a file
+            # replaced by its successor with a later year range stays one series
+            csv_paths = {path.relative_to(self.data_dir).as_posix() for path in files if path.suffix.lower() == ".csv"}
+            past: Dict[int, List[str]] = {}
+            for row in self.conn.execute("SELECT vintage_id, path FROM files"):
+                if row["path"].lower().endswith(".csv"):
+                    past.setdefault(row["vintage_id"], []).append(row["path"])
+            bases = series_bases(csv_paths, clashing_bases([csv_paths, *past.values()]))
+
+            tables = {}
+            for path in files:
+                rel = path.relative_to(self.data_dir).as_posix()
+                data = path.read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                if digest not in known_blobs:
+                    self.conn.execute("INSERT INTO blobs VALUES (?, ?, ?)", (digest, len(data), zlib.compress(data, 6)))
+                    known_blobs.add(digest)
+                    counts["new_blobs"] += 1
+                self.conn.execute("INSERT INTO files VALUES (?, ?, ?)", (vintage_id, rel, digest))
+                if path.suffix.lower() == ".csv":
+                    for (name, column, dims), values in table_series(rel, data, bases[rel]).items():
+                        if name in tables and tables[name][0] != rel:
+                            raise ValueError(f"Series {name!r} would merge {tables[name][0]} and {rel}")
+                        tables[name] = (rel, column, dims, values)
+
+            ids = self._series_ids([(name, rel, column, dims) for name, (rel, column, dims, _) in tables.items()])
+            previous = {row["series_id"]: row["content_hash"] for row in self.conn.execute(
+                "SELECT series_id, content_hash FROM series_versions WHERE vintage_id = "
+                "(SELECT MAX(vintage_id) FROM series_versions WHERE vintage_id < ?)", (vintage_id,))}
+            state = None
+
+            versions, revisions = [], []
+            for name, (_, _, _, values) in tables.items():
+                series_id = ids[name]
+                digest = series_hash(values)
+                versions.append((series_id, vintage_id, digest))
+                if previous.get(series_id) == digest:
+                    continue
+                if state is None:
+                    state = self._latest_state()
+                old = state.get(series_id, {})
+                new = dict(zip(values.index.tolist(), values.tolist()))
+                changed = [(series_id, year, vintage_id, value) for year, value in new.items()
+                           if old.get(year) != value]
+                deleted = [(series_id, year, vintage_id, None) for year in old if year not in new]
+                if changed or deleted:
+                    counts["changed_series"] += 1
+                revisions.extend(changed + deleted)
+
+            self.conn.executemany("INSERT INTO series_versions VALUES (?, ?, ?)", versions)
+            self.conn.executemany("INSERT INTO revisions VALUES (?, ?, ?, ?)", revisions)
+            counts["series"] = len(versions)
+            counts["revisions"] = len(revisions)
+        return counts
+
+    # -- reading ---------------------------------------------------------
+
+    def vintages(self) -> pd.DataFrame:
+        return pd.read_sql_query("SELECT * FROM vintages ORDER BY vintage_id", self.conn)
+
+    def resolve(self, vintage: Union[int, str, None]) -> int:
+        """
+        Vintage id of an id, a label, 'latest', or an ISO date/time (the last
+        vintage created at or before it).
+        """
+        if vintage is None or vintage == "latest":
+            row = self.conn.execute("SELECT MAX(vintage_id) FROM vintages").fetchone()
+        elif isinstance(vintage, int) or str(vintage).isdigit():
+            row = self.conn.execute("SELECT vintage_id FROM vintages WHERE vintage_id = ?", (int(vintage),)).fetchone()
+        else:
+            row = self.conn.execute("SELECT vintage_id FROM vintages WHERE label = ?", (vintage,)).fetchone()
+            if row is None:
+                # A bare date means the whole day
+                bound = vintage + "T99" if re.fullmatch(r"\d{4}-\d{2}-\d{2}", vintage) else vintage
+                row = self.conn.execute("SELECT MAX(vintage_id) FROM vintages WHERE created_at <= ?",
+                                        (bound,)).fetchone()
+        if row is None or row[0] is None:
+            raise KeyError(f"No vintage {vintage!r}")
+        return row[0]
+
+    def series_names(self, pattern: str = "*") -> List[str]:
+        """Series names matching a glob pattern."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT name FROM series WHERE name GLOB ? ORDER BY name", (pattern,))]
+
+    def _one_series(self, pattern: str) -> int:
+        rows = self.conn.execute("SELECT series_id, name FROM series WHERE name GLOB ?", (pattern,)).fetchall()
+        if len(rows) != 1:
+            names = ", ".join(r["name"] for r in rows[:5])
+            raise KeyError(f"{pattern!r} matches {len(rows)} series" + (f": {names}" if rows else ""))
+        return rows[0]["series_id"]
+
+    def value(self, pattern: str, year: int, as_of: Union[int, str, None] = None) -> Optional[float]:
+        """
+        Value of one series for one year as of a vintage (None if the series or
+        year was absent then).
+        """
+        series_id = self._one_series(pattern)
+        vintage_id = self.resolve(as_of)
+        present = self.conn.execute(
+            "SELECT 1 FROM series_versions WHERE series_id = ? AND vintage_id = ?", (series_id, vintage_id)).fetchone()
+        if present is None:
+            return None
+        row = self.conn.execute(
+            "SELECT value FROM revisions WHERE series_id = ? AND year = ? AND vintage_id <= ? "
+            "ORDER BY vintage_id DESC LIMIT 1", (series_id, year, vintage_id)).fetchone()
+        return None if row is None else row["value"]
+
+    def series(self, pattern: str, as_of: Union[int, str, None] = None) -> pd.Series:
+        """Whole series (indexed by year) as of a vintage."""
+        series_id = self._one_series(pattern)
+        vintage_id = self.resolve(as_of)
+        frame = pd.read_sql_query(
+            "SELECT r.year, r.value FROM revisions r "
+            "JOIN (SELECT year, MAX(vintage_id) AS v FROM revisions "
+            "      WHERE series_id = ? AND vintage_id <= ? GROUP BY year) last "
+            "  ON r.year = last.year AND r.vintage_id = last.v "
+            "WHERE r.series_id = ? ORDER BY r.year", self.conn, params=(series_id, vintage_id, series_id))
+        present = self.conn.execute(
+            "SELECT 1 FROM series_versions WHERE series_id = ? AND vintage_id = ?", (series_id, vintage_id)).fetchone()
+        if present is None:
+            frame = frame.iloc[0:0]
+        return frame.dropna().set_index("year")["value"]
+
+    def revisions(self, pattern: str = "*", since: Union[int, str, None] = None) -> pd.DataFrame:
+        """
+        Every revision of the matching series after their first vintage.
+
+        Args:
+            pattern: Glob over series names
+            since: Only revisions in vintages created at or after this date
+                   (or vintage id/label)
+
+        Returns:
+            series, year, vintage, created_at, old value, new value (NaN new
+            value: the year was dropped)
+        """
+        frame = pd.read_sql_query(
+            "SELECT s.name AS series, r.year, r.vintage_id, v.label, v.created_at, "
+            "  LAG(r.value) OVER (PARTITION BY r.series_id, r.year ORDER BY r.vintage_id) AS old_value, "
+            "  r.value AS new_value, "
+            "  r.vintage_id = MIN(r.vintage_id) OVER (PARTITION BY r.series_id) AS initial "
+            "FROM revisions r JOIN series s ON s.series_id = r.series_id "
+            "JOIN vintages v ON v.vintage_id = r.vintage_id "
+            "WHERE s.name GLOB ? ORDER BY s.name, r.year, r.vintage_id", self.conn, params=(pattern,))
+        frame = frame[frame.pop("initial") == 0]
+        if since is not None:
+            if isinstance(since, int) or str(since).isdigit():
+                frame = frame[frame["vintage_id"] >= int(since)]
+            else:
+                start = self.conn.execute("SELECT vintage_id FROM vintages WHERE label = ?", (since,)).fetchone()
+                frame = frame[frame["vintage_id"] >= start[0]] if start else frame[frame["created_at"] >= since]
+        return frame.reset_index(drop=True)
+
+    def diff(self, a: Union[int, str], b: Union[int, str] = "latest") -> pd.DataFrame:
+        """
+        Series that differ between two vintages: added, removed or changed,
+        with the number of revised years for changed ones.
+        """
+        va, vb = self.resolve(a), self.resolve(b)
+        lo, hi = min(va, vb), max(va, vb)
+        frame = pd.read_sql_query(
+            "SELECT s.name AS series, x.content_hash AS hash_a, y.content_hash AS hash_b FROM series s "
+            "LEFT JOIN series_versions x ON x.series_id = s.series_id AND x.vintage_id = ? "
+            "LEFT JOIN series_versions y ON y.series_id = s.series_id AND y.vintage_id = ? "
+            "WHERE (x.content_hash IS NOT y.content_hash) ORDER BY s.name", self.conn, params=(va, vb))
+        changes = pd.read_sql_query(
+            "SELECT s.name AS series, COUNT(DISTINCT r.year) AS revised_years FROM revisions r "
+            "JOIN series s ON s.series_id = r.series_id WHERE r.vintage_id > ? AND r.vintage_id <= ? "
+            "GROUP BY s.name", self.conn, params=(lo, hi))
+        frame["change"] = np.select([frame["hash_a"].isna(), frame["hash_b"].isna()],
+                                    ["added", "removed"], "changed")
+        frame = frame.merge(changes, on="series", how="left")
+        frame["revised_years"] = frame["revised_years"].fillna(0).astype(int)
+        return frame.drop(columns=["hash_a", "hash_b"])
+
+    def restore(self, vintage: Union[int, str], dest: Path) -> int:
+        """Write a vintage's files under dest; returns the number of files."""
+        vintage_id = self.resolve(vintage)
+        count = 0
+        for row in self.conn.execute(
+                "SELECT f.path, b.data FROM files f JOIN blobs b ON b.content_hash = f.content_hash "
+                "WHERE f.vintage_id = ?", (vintage_id,)):
+            out = Path(dest) / row["path"]
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.write_bytes(zlib.decompress(row["data"]))
+            count += 1
+        return count
+
+    def close(self):
+        self.conn.close()
+
+
+def record_vintage(note: str) -> Optional[int]:
+    """
+    Snapshot data/modern after a collection; failures are logged, not raised,
+    so a collector's result never depends on the vintage store.
+    """
+    try:
+        store = VintageStore()
+        try:
+            counts = store.snapshot(note=note)
+        finally:
+            store.close()
+    except (sqlite3.Error, OSError, ValueError) as e:
+        logger.warning(f"Vintage snapshot failed: {e}")
+        return None
+    logger.info(f"Vintage {counts['vintage_id']} recorded: {counts['changed_series']} series new or changed, "
+                f"{counts['revisions']} revisions")
+    return counts["vintage_id"]
+
+
+def main():
+    """Snapshot data/modern or query its vintages."""
+    parser = argparse.ArgumentParser(description="Immutable vintages of data/modern")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--data-dir", type=Path, default=MODERN_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    snap = sub.add_parser("snapshot", help="Record data/modern as a new vintage")
+    snap.add_argument("--label")
+    snap.add_argument("--note", default="")
+    sub.add_parser("list", help="List vintages")
+    val = sub.add_parser("value", help="One value as of a vintage")
+    val.add_argument("series", help="Series name or glob, e.g. 'final_results/*:profit_rate'")
+    val.add_argument("year", type=int)
+    val.add_argument("--as-of", default="latest")
+    rev = sub.add_parser("revisions", help="Revisions of matching series")
+    rev.add_argument("series", nargs="?", default="*")
+    rev.add_argument("--since")
+    dif = sub.add_parser("diff", help="Series that differ between two vintages")
+    dif.add_argument("a")
+    dif.add_argument("b", nargs="?", default="latest")
+    res = sub.add_parser("restore", help="Write a vintage's files to a directory")
+    res.add_argument("vintage")
+    res.add_argument("dest", type=Path)
+    args = parser.parse_args()
+
+    store = VintageStore(args.db, args.data_dir)
+    if args.command == "snapshot":
+        counts = store.snapshot(args.label, args.note)
+        print(f"Vintage {counts['vintage_id']}: {counts['files']} files ({counts['new_blobs']} new), "
+              f"{counts['series']} series ({counts['changed_series']} new or changed, "
+              f"{counts['revisions']} revisions)")
+    elif args.command == "list":
+        print(store.vintages().to_string(index=False))
+    elif args.command == "value":
+        print(store.value(args.series, args.year, args.as_of))
+    elif args.command == "revisions":
+        print(store.revisions(args.series, args.since).to_string(index=False))
+    elif args.command == "diff":
+        print(store.diff(args.a, args.b).to_string(index=False))
+    else:
+        print(f"Restored {store.restore(args.vintage, args.dest)} files to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
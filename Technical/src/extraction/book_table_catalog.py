@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Book Table Catalog
+==================
+
+Indexed SQLite catalog over data/extracted_tables/book_tables, so scripts can
+locate extracted tables by content instead of hard-coded filenames or
+directory globs:
+
+    catalog = BookTableCatalog.open()
+    catalog.find(pages=(30, 50), labels=["SP", "u"])
+
+Contents:
+- tables: one row per CSV. Page extractions (table_p<page>_<method>_<n>)
+  carry page, method and index; canonical tables (table_5_4, ...) have
+  kind 'canonical'. manifest.json supplies confidence, heading and notes
+  where it lists the table. Each file is fingerprinted: shape, numeric
+  density (share of filled data cells that parse as numbers), year-like
+  column headers (count, first, last).
+- row_labels: the first-column labels of every table, with the same
+  normalized key the consensus merger aligns on (whitespace removed, OCR
+  variants such as "s'«u" -> "s'u"), indexed for label lookups.
+
+Building is incremental: a file is re-read only when its size or mtime
+changed (everything when manifest.json changed), and entries for deleted
+files are dropped. The database lives in data/cache (derived, rebuilt on
+demand).
+
+Usage:
+    python src/extraction/book_table_catalog.py build
+    python src/extraction/book_table_catalog.py find --pages 30-50 --labels SP u
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from extraction.table_consensus import YEAR, label_key, to_numbers
+
+ROOT = Path(__file__).resolve().parents[2]
+BOOK_TABLES = ROOT / "data" / "extracted_tables" / "book_tables"
+DB_PATH = ROOT / "data" / "cache" / "book_tables.sqlite"
+
+PAGE_TABLE = re.compile(r"^table_p(\d+)_(.+)_(\d+)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tables (
+    table_id TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    page INTEGER,
+    method TEXT,
+    table_index INTEGER,
+    n_rows INTEGER,
+    n_cols INTEGER,
+    confidence REAL,
+    heading TEXT,
+    notes TEXT,
+    numeric_density REAL,
+    year_headers INTEGER,
+    first_year INTEGER,
+    last_year INTEGER,
+    file_size INTEGER,
+    mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS row_labels (
+    table_id TEXT NOT NULL REFERENCES tables(table_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    label_key TEXT NOT NULL,
+    PRIMARY KEY (table_id, position)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tables_page ON tables(page);
+CREATE INDEX IF NOT EXISTS idx_tables_kind_page ON tables(kind, page);
+CREATE INDEX IF NOT EXISTS idx_row_labels_key ON row_labels(label_key, table_id);
+"""
+
+
+def fingerprint(path: Path) -> Tuple[Dict, List[str]]:
+    """Shape, numeric density and year-header summary of one table, plus its row labels."""
+    grid = pd.read_csv(path, header=None, dtype=str, keep_default_na=False)
+    headers = grid.iloc[0, 1:].str.strip() if len(grid) else pd.Series(dtype=str)
+    cells = grid.iloc[1:, 1:].to_numpy(dtype=object)
+    filled = (cells != "") & (cells != "nan") if cells.size else np.zeros((0, 0), dtype=bool)
+    numeric = ~np.isnan(to_numbers(cells)) if cells.size else filled
+
+    years = [int(m.group(1)) for m in map(YEAR.match, headers) if m]
+    labels = [str(v).strip() for v in grid.iloc[1:, 0]] if grid.shape[1] else []
+    return {
+        "n_rows": max(len(grid) - 1, 0),
+        "n_cols": grid.shape[1],
+        "numeric_density": float(numeric.sum() / filled.sum()) if filled.sum() else 0.0,
+        "year_headers": len(years),
+        "first_year": min(years) if years else None,
+        "last_year": max(years) if years else None,
+    }, labels
+
+
+class BookTableCatalog:
+    """
+    SQLite-backed index of the extracted book tables.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, book_dir: Path = BOOK_TABLES):
+        self.db_path = Path(db_path)
+        self.book_dir = Path(book_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def open(cls, db_path: Path = DB_PATH, book_dir: Path = BOOK_TABLES, refresh: bool = True) -> "BookTableCatalog":
+        """Open the catalog, bringing it up to date with the directory first."""
+        catalog = cls(db_path, book_dir)
+        if refresh:
+            catalog.build()
+        return catalog
+
+    def _manifest(self) -> Dict[str, Dict]:
+        path = self.book_dir / "manifest.json"
+        if not path.exists():
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return {t["table_id"]: t for t in json.load(f).get("tables", [])}
+
+    def build(self) -> Dict[str, int]:
+        """
+        Index new and changed CSVs, drop vanished ones.
+
+        Returns:
+            Counts of indexed, unchanged and removed tables
+        """
+        manifest = self._manifest()
+        manifest_path = self.book_dir / "manifest.json"
+        manifest_sig = ""
+        if manifest_path.exists():
+            st = manifest_path.stat()
+            manifest_sig = f"{st.st_size}:{st.st_mtime_ns}"
+        stored = self.conn.execute("SELECT value FROM meta WHERE key = 'manifest'").fetchone()
+        known = {row["table_id"]: (row["file_size"], row["mtime_ns"])
+                 for row in self.conn.execute("SELECT table_id, file_size, mtime_ns FROM tables")}
+        # A changed manifest can alter any table's metadata: re-index everything
+        stale = stored is None or stored["value"] != manifest_sig
+        files = {p.stem: p for p in self.book_dir.glob("table_*.csv")}
+        counts = {"indexed": 0, "unchanged": 0, "removed": 0}
+
+        with self.conn:
+            for table_id in set(known) - set(files):
+                self.conn.execute("DELETE FROM tables WHERE table_id = ?", (table_id,))
+                counts["removed"] += 1
+
+            for table_id, path in sorted(files.items()):
+                st = path.stat()
+                entry = manifest.get(table_id, {})
+                if not stale and known.get(table_id) == (st.st_size, st.st_mtime_ns):
+                    counts["unchanged"] += 1
+                    continue
+                stats, labels = fingerprint(path)
+                match = PAGE_TABLE.match(table_id)
+                self.conn.execute("DELETE FROM tables WHERE table_id = ?", (table_id,))
+                self.conn.execute(
+                    "INSERT INTO tables VALUES (:table_id, :file, :kind, :page, :method, :table_index, :n_rows, "
+                    ":n_cols, :confidence, :heading, :notes, :numeric_density, :year_headers, :first_year, "
+                    ":last_year, :file_size, :mtime_ns)",
+                    {
+                        "table_id": table_id,
+                        "file": path.name,
+                        "kind": "page" if match else "canonical",
+                        "page": int(match.group(1)) if match else None,
+                        "method": match.group(2) if match else None,
+                        "table_index": int(match.group(3)) if match else None,
+                        **stats,
+                        "confidence": entry.get("confidence"),
+                        "heading": entry.get("heading"),
+                        "notes": entry.get("notes"),
+                        "file_size": st.st_size,
+                        "mtime_ns": st.st_mtime_ns,
+                    })
+                self.conn.executemany(
+                    "INSERT INTO row_labels VALUES (?, ?, ?, ?)",
+                    [(table_id, i, label, label_key(label)) for i, label in enumerate(labels) if label_key(label)])
+                counts["indexed"] += 1
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('manifest', ?)", (manifest_sig,))
+        return counts
+
+    def find(self, pages: Optional[Tuple[int, int]] = None, labels: Sequence[str] = (),
+             method: Optional[str] = None, kind: Optional[str] = None,
+             min_numeric_density: Optional[float] = None,
+             years: Optional[Tuple[int, int]] = None) -> List[Dict]:
+        """
+        Tables matching every given criterion.
+
+        Args:
+            pages: Inclusive page range
+            labels: Row labels that must all appear in the first column
+                    (compared on the normalized label key)
+            method: Extraction method, e.g. 'camelot[page]'
+            kind: 'page' or 'canonical'
+            min_numeric_density: Lower bound on the numeric share of filled cells
+            years: Year range the year-like headers must overlap
+
+        Returns:
+            Table records ordered by page, method and index
+        """
+        clauses, params = [], []
+        if pages is not None:
+            clauses.append("t.page BETWEEN ? AND ?")
+            params += list(pages)
+        if method is not None:
+            clauses.append("t.method = ?")
+            params.append(method)
+        if kind is not None:
+            clauses.append("t.kind = ?")
+            params.append(kind)
+        if min_numeric_density is not None:
+            clauses.append("t.numeric_density >= ?")
+            params.append(min_numeric_density)
+        if years is not None:
+            clauses.append("t.first_year <= ? AND t.last_year >= ?")
+            params += [years[1], years[0]]
+        for label in labels:
+            clauses.append("EXISTS (SELECT 1 FROM row_labels r WHERE r.table_id = t.table_id AND r.label_key = ?)")
+            params.append(label_key(label))
+
+        sql = "SELECT t.* FROM tables t"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY t.page, t.method, t.table_index, t.table_id"
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def labels(self, table_id: str) -> List[str]:
+        """First-column labels of a table, in order."""
+        return [row["label"] for row in self.conn.execute(
+            "SELECT label FROM row_labels WHERE table_id = ? ORDER BY position", (table_id,))]
+
+    def path(self, table_id: str) -> Path:
+        row = self.conn.execute("SELECT file FROM tables WHERE table_id = ?", (table_id,)).fetchone()
+        if row is None:
+            raise KeyError(table_id)
+        return self.book_dir / row["file"]
+
+    def close(self):
+        self.conn.close()
+
+
+def _page_range(spec: str) -> Tuple[int, int]:
+    first, _, last = spec.partition("-")
+    return int(first), int(last or first)
+
+
+def main():
+    """Build or query the book table catalog."""
+    parser = argparse.ArgumentParser(description="SQLite catalog of extracted book tables")
+    parser.add_argument("command", choices=["build", "find"])
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--book-dir", type=Path, default=BOOK_TABLES)
+    parser.add_argument("--pages", type=_page_range, help="Page range, e.g. 30-50")
+    parser.add_argument("--labels", nargs="+", default=[], help="Row labels that must all be present")
+    parser.add_argument("--method")
+    parser.add_argument("--min-numeric", type=float, help="Minimum numeric density")
+    args = parser.parse_args()
+
+    catalog = BookTableCatalog.open(args.db, args.book_dir)
+    if args.command == "build":
+        count = catalog.conn.execute("SELECT COUNT(*) FROM tables").fetchone()[0]
+        print(f"Catalog {args.db}: {count} tables")
+        return
+
+    for row in catalog.find(args.pages, args.labels, args.method, min_numeric_density=args.min_numeric):
+        print(f"{row['table_id']:<40} page={row['page']} rows={row['n_rows']} cols={row['n_cols']} "
+              f"numeric={row['numeric_density']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
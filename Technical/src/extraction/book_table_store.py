@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Columnar Book Table Store
+=========================
+
+Packs every extracted book table CSV into one Arrow dataset, partitioned by
+collection (data/extracted_tables/book_tables -> 'extracted',
+data/historical/book_tables -> 'historical'):
+
+    data/cache/book_table_store/collection=<name>/tables.arrow
+
+Each partition is a long table sorted by table_id with one record per cell:
+
+    table_id (dictionary) | row (int32) | col (int32) | text (string) | value (float64)
+
+text is the cell exactly as in the CSV (row 0 is the CSV's first line, col 0
+its first column); value is the parsed number (NaN where the cell is not
+numeric). The partition's schema metadata maps every table_id to its record
+offset, length and shape, and records the source fingerprint (file count,
+total size, newest mtime) so stale stores are detected.
+
+Files are uncompressed Arrow IPC, read through memory maps: loading one table
+slices its records without touching the others, and a full-corpus scan (e.g.
+every table whose first column contains 'SP') is one pass over one mapped
+file per collection instead of 800 opens and parses.
+
+Usage:
+    python src/extraction/book_table_store.py pack
+    python src/extraction/book_table_store.py find-label SP
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from extraction.table_consensus import label_key, to_numbers
+
+ROOT = Path(__file__).resolve().parents[2]
+COLLECTIONS = {
+    "extracted": ROOT / "data" / "extracted_tables" / "book_tables",
+    "historical": ROOT / "data" / "historical" / "book_tables",
+}
+STORE_DIR = ROOT / "data" / "cache" / "book_table_store"
+PARTITION_FILE = "tables.arrow"
+
+
+def source_fingerprint(book_dir: Path) -> Dict:
+    """File count, total size and newest mtime of a collection's table CSVs."""
+    stats = [p.stat() for p in Path(book_dir).glob("table_*.csv")]
+    return {
+        "files": len(stats),
+        "bytes": sum(s.st_size for s in stats),
+        "mtime_ns": max((s.st_mtime_ns for s in stats), default=0),
+    }
+
+
+def _read_cells(path: Path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    n_cols = max((len(r) for r in rows), default=0)
+    rr, cc, text = [], [], []
+    for i, row in enumerate(rows):
+        rr.extend([i] * len(row))
+        cc.extend(range(len(row)))
+        text.extend(row)
+    return rr, cc, text, len(rows), n_cols
+
+
+def pack(collections: Optional[Dict[str, Path]] = None, dest: Path = STORE_DIR) -> Dict[str, Path]:
+    """
+    Write one Arrow partition per collection.
+
+    Returns:
+        Collection name -> partition file
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Packing the book table store needs pyarrow")
+
+    written = {}
+    for name, book_dir in (collections or COLLECTIONS).items():
+        book_dir = Path(book_dir)
+        if not book_dir.exists():
+            continue
+        ids, rows, cols, texts, index = [], [], [], [], {}
+        for path in sorted(book_dir.glob("table_*.csv")):
+            rr, cc, text, n_rows, n_cols = _read_cells(path)
+            index[path.stem] = [len(texts), len(text), n_rows, n_cols]
+            ids.extend([path.stem] * len(text))
+            rows.extend(rr)
+            cols.extend(cc)
+            texts.extend(text)
+
+        text_arr = np.array(texts, dtype=object)
+        table = pa.table({
+            "table_id": pa.array(ids, pa.string()).dictionary_encode(),
+            "row": pa.array(rows, pa.int32()),
+            "col": pa.array(cols, pa.int32()),
+            "text": pa.array(texts, pa.string()),
+            "value": pa.array(to_numbers(text_arr) if len(texts) else [], pa.float64()),
+        })
+        table = table.replace_schema_metadata({
+            b"st_index": json.dumps(index).encode(),
+            b"st_source": json.dumps(source_fingerprint(book_dir)).encode(),
+        })
+
+        out = Path(dest) / f"collection={name}" / PARTITION_FILE
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_suffix(".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, out)
+        written[name] = out
+    return written
+
+
+class BookTableStore:
+    """
+    Memory-mapped reader over the packed partitions.
+    """
+
+    def __init__(self, store_dir: Path = STORE_DIR, collections: Optional[Dict[str, Path]] = None):
+        import pyarrow as pa
+        self._pa = pa
+        self.store_dir = Path(store_dir)
+        self.sources = collections or COLLECTIONS
+        self._tables = {}
+        self.index: Dict[str, Dict[str, List[int]]] = {}
+        self.fingerprints: Dict[str, Dict] = {}
+        for path in sorted(self.store_dir.glob(f"collection=*/{PARTITION_FILE}")):
+            name = path.parent.name.split("=", 1)[1]
+            table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+            metadata = table.schema.metadata or {}
+            self._tables[name] = table
+            self.index[name] = json.loads(metadata[b"st_index"])
+            self.fingerprints[name] = json.loads(metadata[b"st_source"])
+
+    @classmethod
+    def open(cls, store_dir: Path = STORE_DIR, collections: Optional[Dict[str, Path]] = None) -> "BookTableStore":
+        """Open the store, packing first if it is missing or stale."""
+        collections = collections or COLLECTIONS
+        store = cls(store_dir, collections) if Path(store_dir).exists() else None
+        if store is None or store.stale():
+            pack(collections, store_dir)
+            store = cls(store_dir, collections)
+        return store
+
+    def stale(self) -> List[str]:
+        """Collections whose CSVs changed since packing (or were never packed)."""
+        return [name for name, book_dir in self.sources.items()
+                if Path(book_dir).exists() and self.fingerprints.get(name) != source_fingerprint(book_dir)]
+
+    @property
+    def collections(self) -> List[str]:
+        return list(self._tables)
+
+    def table_ids(self, collection: str = "extracted") -> List[str]:
+        return list(self.index[collection])
+
+    def cells(self, table_id: str, collection: str = "extracted") -> pd.DataFrame:
+        """Long records (row, col, text, value) of one table."""
+        offset, length, _, _ = self.index[collection][table_id]
+        part = self._tables[collection].slice(offset, length).select(["row", "col", "text", "value"])
+        return part.to_pandas()
+
+    def read(self, table_id: str, collection: str = "extracted", numeric: bool = False) -> pd.DataFrame:
+        """
+        One table as a grid, like pd.read_csv(path, header=None, dtype=str, keep_default_na=False).
+
+        With numeric=True the grid holds the parsed values instead (NaN where not numeric).
+        """
+        _, _, n_rows, n_cols = self.index[collection][table_id]
+        cells = self.cells(table_id, collection)
+        column = "value" if numeric else "text"
+        grid = np.full((n_rows, n_cols), np.nan if numeric else "", dtype=float if numeric else object)
+        grid[cells["row"].to_numpy(), cells["col"].to_numpy()] = cells[column].to_numpy()
+        return pd.DataFrame(grid)
+
+    def scan(self, collections: Optional[List[str]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """All cells of the given collections as one long frame (one pass per partition)."""
+        frames = []
+        for name in collections or self.collections:
+            table = self._tables[name]
+            if columns is not None:
+                table = table.select(columns)
+            frame = table.to_pandas()
+            frame.insert(0, "collection", name)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def find_label(self, label: str, collections: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Every table row whose first-column label matches (normalized key).
+
+        Returns:
+            collection, table_id, row and the row label for each hit
+        """
+        import pyarrow.compute as pc
+        key = label_key(label)
+        frames = []
+        for name in collections or self.collections:
+            table = self._tables[name]
+            labels = table.filter(pc.equal(table["col"], 0)).select(["table_id", "row", "text"])
+            # Normalize only the distinct label strings, then map back
+            distinct = pc.unique(labels["text"]).to_pylist()
+            hits = [t for t in distinct if label_key(t) == key]
+            found = labels.filter(pc.is_in(labels["text"], value_set=self._pa.array(hits, self._pa.string())))
+            frame = found.to_pandas().rename(columns={"text": "label"})
+            frame["table_id"] = frame["table_id"].astype(str)
+            frame.insert(0, "collection", name)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def main():
+    """Pack the store or search it."""
+    parser = argparse.ArgumentParser(description="Columnar store of extracted book tables")
+    parser.add_argument("command", choices=["pack", "find-label"])
+    parser.add_argument("label", nargs="?")
+    parser.add_argument("--store", type=Path, default=STORE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        for name, path in pack(dest=args.store).items():
+            print(f"{name}: {path} ({path.stat().st_size / 1024:.0f} KB)")
+        return
+
+    if not args.label:
+        parser.error("find-label needs a label")
+    hits = BookTableStore.open(args.store).find_label(args.label)
+    for _, hit in hits.iterrows():
+        print(f"{hit['collection']:<10} {hit['table_id']:<40} row {hit['row']}: {hit['label']}")
+    print(f"{len(hits)} rows labelled {args.label!r}")
+
+
+if __name__ == "__main__":
+    main()
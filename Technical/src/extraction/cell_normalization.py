@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Numeric Cell Normalization
+==========================
+
+Shared kernel for turning extracted table cells into numbers. Whole columns
+(or whole tables, flattened) are parsed at once with vectorized string
+operations; blocks of up to SCALAR_MAX_CELLS cells (a single book table) go
+through the same rules cell by cell, which avoids the pandas per-call
+overhead. clean_label is the per-label counterpart of clean_labels.
+
+Numbers:
+- thousands separators (comma or space before a group of three digits):
+  '1,234.5', '1 234.5' -> 1234.5
+- parenthesized negatives: '(12.3)' -> -12.3; Unicode minus/dashes before a
+  number: '−12', '–12' -> -12
+- one footnote marker after a number: '123.4*', '123.4†', '123.4a',
+  '123.4(p)', '123.4¹' -> 123.4
+- currency/percent signs: '$4', '12%' -> 4, 12
+- placeholders ('', 'nan', 'n.a.', '...', '-', '—') -> NaN, not counted as
+  unparsed
+Anything else that does not parse is NaN and flagged in the unparsed mask.
+
+Labels:
+- OCR artifacts of the book scans are dropped ('s'«u' -> "s'u", 'I!' -> 'I')
+  and whitespace is collapsed.
+"""
+
+import re
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+DASHES = "-‐‑‒–—―−"
+MISSING_TOKENS = {"", "nan", "none", "na", "n.a.", "n/a", "...", "…", "."}
+OCR_ARTIFACTS = "«»!¡"
+
+_DASH_ONLY = re.compile(f"^[{DASHES}]+$")
+_FOOTNOTE = re.compile(r"(?<=[\d)])\s*(?:\*+|[†‡§¶#]+|\([a-z]\)|[a-z]|[¹²³⁰-⁹]+)$")
+_LEADING_DASH = re.compile(f"^[{DASHES}]\\s*(?=[\\d.])")
+_PARENS = re.compile(r"^\(\s*(.*?)\s*\)$")
+# Only separators between a digit and a full group of three count as thousands
+# separators; '2 44' or ',1' are OCR damage and stay unparsed
+_THOUSANDS = re.compile(r"(?<=\d)[, \u00a0\u2009\u202f](?=\d{3}(?!\d))")
+_UNITS = re.compile(r"^\$\s*|\s*%$")
+_ARTIFACTS = re.compile(f"[{re.escape(OCR_ARTIFACTS)}]")
+_SPACES = re.compile(r"\s+")
+# Below this many cells the per-cell path beats the pandas string-method overhead
+SCALAR_MAX_CELLS = 2048
+
+
+def _parse_cell(cell) -> Tuple[float, bool]:
+    """parse_numeric for one cell: (number or NaN, unparsed flag)."""
+    if cell is None or (not isinstance(cell, str) and pd.isna(cell)):
+        return np.nan, False
+    text = str(cell).strip()
+    if text.lower() in MISSING_TOKENS or _DASH_ONLY.match(text):
+        return np.nan, False
+    for pattern, repl in ((_FOOTNOTE, ""), (_PARENS, r"-\1"), (_LEADING_DASH, "-"), (_THOUSANDS, ""), (_UNITS, "")):
+        text = pattern.sub(repl, text)
+    # float() also takes '1_000' and non-ASCII digits, which pd.to_numeric rejects
+    if text.isascii() and "_" not in text:
+        try:
+            number = float(text)
+        except ValueError:
+            pass
+        else:
+            return number, bool(np.isnan(number))
+    return np.nan, True
+
+
+def parse_numeric(values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse printed numbers.
+
+    Args:
+        values: Array-like of cells (any shape; strings, numbers or NaN)
+
+    Returns:
+        (float array, unparsed mask) with the input's shape; placeholders are
+        NaN and not flagged
+    """
+    arr = np.asarray(values, dtype=object)
+    if arr.size <= SCALAR_MAX_CELLS:
+        parsed = [_parse_cell(cell) for cell in arr.ravel()]
+        numbers = np.array([number for number, _ in parsed], dtype=float)
+        unparsed = np.array([flag for _, flag in parsed], dtype=bool)
+        return numbers.reshape(arr.shape), unparsed.reshape(arr.shape)
+
+    text = pd.Series(arr.ravel(), dtype=object)
+    text = text.where(text.notna(), "").astype(str).str.strip()
+
+    missing = text.str.lower().isin(MISSING_TOKENS) | text.str.match(_DASH_ONLY)
+    cleaned = text.str.replace(_FOOTNOTE, "", regex=True)
+    cleaned = cleaned.str.replace(_PARENS, r"-\1", regex=True)
+    cleaned = cleaned.str.replace(_LEADING_DASH, "-", regex=True)
+    cleaned = cleaned.str.replace(_THOUSANDS, "", regex=True)
+    cleaned = cleaned.str.replace(_UNITS, "", regex=True)
+
+    numbers = pd.to_numeric(cleaned.where(~missing), errors="coerce").to_numpy(dtype=float, copy=True)
+    unparsed = np.isnan(numbers) & ~missing.to_numpy()
+    return numbers.reshape(arr.shape), unparsed.reshape(arr.shape)
+
+
+def clean_labels(labels: Iterable) -> np.ndarray:
+    """Row labels with OCR artifacts removed and whitespace collapsed ('' for missing)."""
+    text = pd.Series(list(labels), dtype=object)
+    text = text.where(text.notna(), "").astype(str)
+    text = text.str.replace(_ARTIFACTS, "", regex=True).str.replace(_SPACES, " ", regex=True).str.strip()
+    return text.to_numpy(dtype=object)
+
+
+def clean_label(label) -> str:
+    """Scalar clean_labels for one label (per-label lookups; use clean_labels for columns)."""
+    if label is None or (not isinstance(label, str) and pd.isna(label)):
+        return ""
+    return _SPACES.sub(" ", _ARTIFACTS.sub("", str(label))).strip()
+
+
+def normalize_table(df: pd.DataFrame, label_col: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Labels and numbers of a table with one label column.
+
+    Returns:
+        (cleaned labels, values (rows × data columns), unparsed mask)
+    """
+    labels = clean_labels(df.iloc[:, label_col])
+    data = df.drop(columns=df.columns[label_col]).to_numpy(dtype=object)
+    values, unparsed = parse_numeric(data)
+    return labels, values, unparsed
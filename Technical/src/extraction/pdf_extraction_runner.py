@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Page-Cached Comparative PDF Extraction
+======================================
+
+Runs the comparative extraction engines over a source PDF page by page and
+writes the familiar <pdf>_comparative layout:
+
+    A_enhanced/tables/page_NNN_table_NN_<method>.csv
+    A_enhanced/images/page_NNN_image_NN.png
+    B_ultra/<library>_extraction.json
+    C_basic/basic_summary.json
+    D_deep/tables/page_NNN_table_NN_d_engine.csv
+    combined_integrity_report.json
+
+Engines (ENGINES):
+- A: pdfplumber table strategies + PyMuPDF text-column analysis, images listed
+- B: raw page text from pdfplumber and PyMuPDF
+- C: PyMuPDF text/image counts (no tables)
+- D: camelot stream tables
+Z_definitive is a selection over the A tables and is built from them, not
+re-extracted here.
+
+Method:
+- Work is the set of (page, engine) pairs. Each engine's pending pages are
+  cut into chunks and fanned out over a process pool; a worker opens the PDF
+  once per chunk and each page runs independently (a failing page is
+  recorded, not fatal).
+- Every successful page result is cached as JSON (plus its images as PNG)
+  keyed by (PDF sha256, page, engine, engine version), where the version is
+  the engine revision plus the installed versions of the libraries it uses.
+  A re-run only extracts pages and engines without a cache entry, so
+  extending a page range, adding an engine or upgrading a library redoes
+  exactly the affected pages.
+- Output is streamed: results come back in page order with a bounded number
+  of tasks in flight, and each page's tables, images and text are written to
+  disk as it arrives; only per-page metadata is held until the report.
+- Streaming mode (--stream) narrows this to one page per task and one task
+  per worker, and recycles a worker's PDF handles whenever its RSS exceeds
+  --memory-limit MB, which keeps multi-hundred-page volumes within a small
+  machine's memory.
+- Per-page processing time, peak Python memory (tracemalloc) and RSS after
+  the page are listed under pages_info in the report and summed/maxed per
+  engine.
+
+Optional dependencies (pdfplumber, PyMuPDF, camelot) are imported inside the
+engines; an engine whose libraries are missing is reported and skipped.
+
+Usage:
+    python src/extraction/pdf_extraction_runner.py <pdf> [--engines A C]
+        [--pages 1-20,45] [--workers 4] [--stream --memory-limit 512] [--plan]
+"""
+
+import argparse
+import csv
+import gc
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CACHE_DIR = Path("data/cache/pdf_extraction")
+DEFAULT_PAGES_PER_TASK = 8
+DEFAULT_MEMORY_LIMIT = 1024.0
+REPORT_NAME = "combined_integrity_report.json"
+
+# Distribution names, for the versions that enter the cache key
+DISTRIBUTIONS = {"pdfplumber": "pdfplumber", "fitz": "PyMuPDF", "camelot": "camelot-py"}
+
+PDFPLUMBER_STRATEGIES = [
+    ({"vertical_strategy": "lines", "horizontal_strategy": "lines"}, 0.8),
+    ({"vertical_strategy": "text", "horizontal_strategy": "text"}, 0.5),
+]
+TEXT_COLUMN_SPLIT = re.compile(r"\t+|\s{2,}")
+MIN_TEXT_COLUMNS = 3
+MIN_TABLE_ROWS = 2
+
+
+class _OpenDocuments:
+    """PDF handles opened on first use, one per library, within a worker."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._open = {}
+
+    def get(self, library: str):
+        if library not in self._open:
+            if library == "pdfplumber":
+                import pdfplumber
+                self._open[library] = pdfplumber.open(self.path)
+            elif library == "fitz":
+                import fitz
+                self._open[library] = fitz.open(self.path)
+            elif library == "camelot":
+                import camelot
+                self._open[library] = camelot
+            else:
+                raise ValueError(f"Unknown PDF library: {library}")
+        return self._open[library]
+
+    def page_count(self) -> int:
+        for library in ("fitz", "pdfplumber"):
+            try:
+                doc = self.get(library)
+            except ImportError:
+                continue
+            return len(doc) if library == "fitz" else len(doc.pages)
+        raise ImportError("Counting pages needs PyMuPDF or pdfplumber")
+
+    def close(self):
+        for library, doc in self._open.items():
+            if library != "camelot":
+                doc.close()
+        self._open.clear()
+
+
+def _clean_rows(rows) -> List[List[str]]:
+    return [["" if cell is None else str(cell).strip() for cell in row] for row in rows]
+
+
+def _is_table(rows: List[List[str]]) -> bool:
+    filled = [row for row in rows if any(row)]
+    return len(filled) >= MIN_TABLE_ROWS and max((len(r) for r in filled), default=0) >= 2
+
+
+def _pdfplumber_tables(docs: _OpenDocuments, page: int) -> List[Dict]:
+    pg = docs.get("pdfplumber").pages[page - 1]
+    tables = []
+    for i, (settings, confidence) in enumerate(PDFPLUMBER_STRATEGIES, 1):
+        for data in pg.extract_tables(settings):
+            rows = _clean_rows(data)
+            if _is_table(rows):
+                tables.append({"method": f"pdfplumber_strategy_{i}", "strategy": settings,
+                               "data": rows, "confidence": confidence})
+    if hasattr(pg, "close"):
+        pg.close()
+    return tables
+
+
+def _text_column_tables(docs: _OpenDocuments, page: int) -> List[Dict]:
+    """Runs of consecutive text lines that split into MIN_TEXT_COLUMNS+ columns."""
+    text = docs.get("fitz")[page - 1].get_text("text")
+    tables, run = [], []
+    for line in text.splitlines() + [""]:
+        cells = [c.strip() for c in TEXT_COLUMN_SPLIT.split(line.strip()) if c.strip()]
+        if len(cells) >= MIN_TEXT_COLUMNS:
+            run.append(cells)
+            continue
+        if len(run) >= MIN_TABLE_ROWS:
+            width = max(len(r) for r in run)
+            tables.append({"method": "pymupdf_text_analysis",
+                           "data": [r + [""] * (width - len(r)) for r in run], "confidence": 0.7})
+        run = []
+    return tables
+
+
+def _page_images(docs: _OpenDocuments, page: int) -> List[Dict]:
+    doc = docs.get("fitz")
+    images = []
+    for index, info in enumerate(doc[page - 1].get_images(full=True)):
+        xref, _, width, height, _, color_space = info[:6]
+        images.append({"index": index, "xref": xref, "dimensions": [width, height],
+                       "color_space": color_space})
+    return images
+
+
+def _engine_a(docs: _OpenDocuments, page: int) -> Dict:
+    return {"tables": _pdfplumber_tables(docs, page) + _text_column_tables(docs, page),
+            "images": _page_images(docs, page)}
+
+
+def _engine_b(docs: _OpenDocuments, page: int) -> Dict:
+    return {"text": {
+        "pdfplumber": docs.get("pdfplumber").pages[page - 1].extract_text() or "",
+        "pymupdf": docs.get("fitz")[page - 1].get_text("text"),
+    }}
+
+
+def _engine_c(docs: _OpenDocuments, page: int) -> Dict:
+    pg = docs.get("fitz")[page - 1]
+    return {"text_chars": len(pg.get_text("text")), "images": _page_images(docs, page), "tables": []}
+
+
+def _engine_d(docs: _OpenDocuments, page: int) -> Dict:
+    found = docs.get("camelot").read_pdf(docs.path, pages=str(page), flavor="stream")
+    tables = []
+    for table in found:
+        rows = _clean_rows(table.df.values.tolist())
+        if _is_table(rows):
+            accuracy = table.parsing_report.get("accuracy", 0.0)
+            tables.append({"method": "d_engine", "data": rows, "confidence": round(accuracy / 100.0, 4)})
+    return {"tables": tables}
+
+
+@dataclass(frozen=True)
+class Engine:
+    """One comparative engine: output folder, code revision, libraries, page function."""
+    key: str
+    directory: str
+    revision: int
+    libraries: Tuple[str, ...]
+    extract: Callable[[_OpenDocuments, int], Dict]
+    save_images: bool = False
+
+
+ENGINES: Dict[str, Engine] = {
+    "A": Engine("A", "A_enhanced", 1, ("pdfplumber", "fitz"), _engine_a, save_images=True),
+    "B": Engine("B", "B_ultra", 1, ("pdfplumber", "fitz"), _engine_b),
+    "C": Engine("C", "C_basic", 1, ("fitz",), _engine_c),
+    "D": Engine("D", "D_deep", 1, ("camelot",), _engine_d),
+}
+
+
+def engine_version(engine: Engine) -> str:
+    """Revision plus installed library versions, e.g. 'r1+pdfplumber-0.11.4+fitz-1.24.9'."""
+    parts = [f"r{engine.revision}"]
+    for library in engine.libraries:
+        parts.append(f"{library}-{metadata.version(DISTRIBUTIONS.get(library, library))}")
+    return "+".join(parts)
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_pages(spec: Optional[str]) -> Optional[List[int]]:
+    """'1-5,9' -> [1, 2, 3, 4, 5, 9] (1-based); None -> all pages."""
+    if not spec:
+        return None
+    pages = set()
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        pages.update(range(int(first), int(last or first) + 1))
+    return sorted(pages)
+
+
+def _rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (psutil, else /proc; None if unknown)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _save_images(docs: _OpenDocuments, page: int, images: List[Dict], entry_dir: Path):
+    """Write each image of the page as PNG next to its cache entry, one at a time."""
+    import fitz
+    doc = docs.get("fitz")
+    for image in images:
+        filename = f"page_{page:04d}_image_{image['index']:02d}.png"
+        pix = fitz.Pixmap(doc, image["xref"])
+        if pix.n - pix.alpha >= 4:
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        pix.save(str(entry_dir / filename))
+        pix = None
+        image["cache_file"] = filename
+        image["size"] = (entry_dir / filename).stat().st_size
+
+
+def _store(path: Path, result: Dict):
+    """Write atomically so an interrupted run never leaves a partial entry."""
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _extract_pages(pdf_path: str, engine_key: str, pages: Sequence[int], entry_dir: str,
+                   memory_limit: Optional[float] = None) -> List[Dict]:
+    """
+    Worker: one engine over a chunk of pages, serving cached pages from entry_dir.
+
+    Each extracted page is timed, measured (tracemalloc peak and RSS after the
+    page) and, if successful, cached together with its images. When RSS exceeds
+    memory_limit (MB) the open PDF handles are dropped before the next page,
+    releasing the libraries' page and font caches.
+    """
+    engine = ENGINES[engine_key]
+    entry_dir = Path(entry_dir)
+    entry_dir.mkdir(parents=True, exist_ok=True)
+    docs = _OpenDocuments(pdf_path)
+    results = []
+    tracemalloc.start()
+    try:
+        for page in pages:
+            cached = entry_dir / f"page_{page:04d}.json"
+            if cached.exists():
+                with open(cached, encoding="utf-8") as f:
+                    result = json.load(f)
+                result["from_cache"] = True
+                results.append(result)
+                continue
+
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            try:
+                result = engine.extract(docs, page)
+                if engine.save_images:
+                    _save_images(docs, page, result.get("images", []), entry_dir)
+                result["success"] = True
+            except Exception as e:
+                result = {"success": False, "error": f"{type(e).__name__}: {e}"}
+            rss = _rss_mb()
+            result.update({
+                "page": page,
+                "engine": engine_key,
+                "processing_time": time.perf_counter() - start,
+                "memory_peak": tracemalloc.get_traced_memory()[1] / 2 ** 20,
+                "rss_mb": rss,
+            })
+            if result["success"]:
+                _store(cached, result)
+            if memory_limit is not None and rss is not None and rss > memory_limit:
+                docs.close()
+                gc.collect()
+                result["handles_recycled"] = True
+            result["from_cache"] = False
+            results.append(result)
+    finally:
+        tracemalloc.stop()
+        docs.close()
+    return results
+
+
+class _EngineWriter:
+    """
+    Writes one engine's outputs page by page; only per-page metadata is kept.
+    """
+
+    TEXT_LIBRARIES = ("pdfplumber", "pymupdf")
+
+    def __init__(self, engine: Engine, out_dir: Path, entry_dir: Path, version: str):
+        self.engine = engine
+        self.out_dir = out_dir
+        self.entry_dir = entry_dir
+        self.version = version
+        self.tables_info: List[Dict] = []
+        self.images_info: List[Dict] = []
+        self.pages_info: List[Dict] = []
+        self.failed_pages: List[Dict] = []
+        self._text_files = {}
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if engine.key == "B":
+            for library in self.TEXT_LIBRARIES:
+                f = open(out_dir / f"{library}_extraction.json", "w", encoding="utf-8")
+                f.write('{"pages": [')
+                self._text_files[library] = [f, 0]
+
+    def add(self, result: Dict):
+        page = result["page"]
+        from_cache = result.get("from_cache", False)
+        # A cached page cost nothing this run; its stored figures are from the original extraction
+        info = {
+            "page": page,
+            "success": result["success"],
+            "from_cache": from_cache,
+            "processing_time": 0.0 if from_cache else result["processing_time"],
+            "memory_peak": None if from_cache else result["memory_peak"],
+            "rss_mb": None if from_cache else result.get("rss_mb"),
+        }
+        if not result["success"]:
+            self.failed_pages.append({"page": page, "error": result["error"]})
+            self.pages_info.append(info)
+            return
+
+        for library, handle in self._text_files.items():
+            f, count = handle
+            f.write(("," if count else "") + "\n  " +
+                    json.dumps({"page": page, "text": result["text"][library]}, ensure_ascii=False))
+            handle[1] += 1
+
+        counters: Dict[str, int] = {}
+        for table in result.get("tables", []):
+            method = table["method"]
+            counters[method] = counters.get(method, 0) + 1
+            filename = f"page_{page:03d}_table_{counters[method]:02d}_{method}.csv"
+            (self.out_dir / "tables").mkdir(exist_ok=True)
+            with open(self.out_dir / "tables" / filename, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(table["data"])
+            self.tables_info.append({
+                "page": page,
+                "table_index": counters[method],
+                "method": method,
+                **({"strategy": table["strategy"]} if "strategy" in table else {}),
+                "rows": len(table["data"]),
+                "cols": max((len(r) for r in table["data"]), default=0),
+                "confidence": table.get("confidence"),
+                "filename": filename,
+            })
+
+        for image in result.get("images", []):
+            image = {"page": page, **image}
+            if "cache_file" in image:
+                filename = f"page_{page:03d}_image_{image['index'] + 1:02d}.png"
+                (self.out_dir / "images").mkdir(exist_ok=True)
+                shutil.copyfile(self.entry_dir / image.pop("cache_file"), self.out_dir / "images" / filename)
+                image["filename"] = filename
+            self.images_info.append(image)
+
+        info["tables"] = sum(counters.values())
+        info["images"] = len(result.get("images", []))
+        self.pages_info.append(info)
+
+    def close(self) -> Dict:
+        """Finish streamed files and return the engine's report entry."""
+        for f, _ in self._text_files.values():
+            f.write("\n]}\n")
+            f.close()
+        ok = [p for p in self.pages_info if p["success"]]
+        entry = {
+            "success": bool(ok) or not self.pages_info,
+            "output_dir": str(self.out_dir),
+            "engine_version": self.version,
+            "pages_processed": len(ok),
+            "pages_from_cache": sum(p["from_cache"] for p in self.pages_info),
+            "pages_extracted": sum(not p["from_cache"] for p in ok),
+            "failed_pages": self.failed_pages,
+            "processing_time": sum(p["processing_time"] for p in self.pages_info),
+            "memory_peak": max((p["memory_peak"] for p in self.pages_info if p["memory_peak"] is not None),
+                               default=None),
+            "rss_peak_mb": max((p["rss_mb"] for p in self.pages_info if p["rss_mb"] is not None), default=None),
+        }
+        if self.engine.key != "B":
+            entry["tables_extracted"] = len(self.tables_info)
+            entry["images_found"] = len(self.images_info)
+            entry["tables_info"] = self.tables_info
+            entry["images_info"] = self.images_info
+        if self.engine.key == "C":
+            with open(self.out_dir / "basic_summary.json", "w", encoding="utf-8") as f:
+                json.dump({k: entry[k] for k in ("success", "pages_processed", "images_found",
+                                                 "tables_extracted", "output_dir")}, f, indent=2)
+        entry["pages_info"] = self.pages_info
+        return entry
+
+
+class PageCachedExtractionRunner:
+    """
+    Fans (page, engine) work over a process pool with a page-level result cache.
+    """
+
+    def __init__(self, engines: Iterable[str] = tuple(ENGINES), cache_dir: Path = CACHE_DIR,
+                 workers: int = 1, pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+                 memory_limit: Optional[float] = None):
+        self.engines = [ENGINES[key] for key in engines]
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.memory_limit = memory_limit
+        self.versions: Dict[str, str] = {}
+        self.unavailable: Dict[str, str] = {}
+        for engine in self.engines:
+            try:
+                self.versions[engine.key] = engine_version(engine)
+            except metadata.PackageNotFoundError as e:
+                self.unavailable[engine.key] = f"missing dependency: {e}"
+
+    @classmethod
+    def streaming(cls, engines: Iterable[str] = tuple(ENGINES), cache_dir: Path = CACHE_DIR,
+                  workers: int = 1, memory_limit: float = DEFAULT_MEMORY_LIMIT):
+        """One page per task, one task in flight per worker, handles recycled above memory_limit MB."""
+        return cls(engines, cache_dir, workers, pages_per_task=1, memory_limit=memory_limit)
+
+    def entry_dir(self, pdf_hash: str, engine_key: str) -> Path:
+        return self.cache_dir / pdf_hash / f"{engine_key}@{self.versions[engine_key]}"
+
+    def cache_path(self, pdf_hash: str, engine_key: str, page: int) -> Path:
+        return self.entry_dir(pdf_hash, engine_key) / f"page_{page:04d}.json"
+
+    def _resolve_pages(self, pdf: Path, pages: Optional[Sequence[int]]) -> List[int]:
+        if pages is not None:
+            return sorted(set(pages))
+        docs = _OpenDocuments(str(pdf))
+        try:
+            return list(range(1, docs.page_count() + 1))
+        finally:
+            docs.close()
+
+    def plan(self, pdf: Path, pages: Optional[Sequence[int]] = None,
+             pdf_hash: Optional[str] = None) -> Dict[str, List[int]]:
+        """Pages without a cache entry, per available engine."""
+        pdf_hash = pdf_hash or file_sha256(pdf)
+        pages = self._resolve_pages(pdf, pages)
+        return {key: [p for p in pages if not self.cache_path(pdf_hash, key, p).exists()]
+                for key in self.versions}
+
+    def _run_tasks(self, tasks):
+        """
+        Results in task order, with at most lookahead tasks in flight, so
+        finished-but-unconsumed chunks never pile up in memory.
+        """
+        if self.workers > 1 and len(tasks) > 1:
+            lookahead = self.workers if self.pages_per_task == 1 else 2 * self.workers
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                window = deque()
+                for task in tasks:
+                    window.append(pool.submit(_extract_pages, *task))
+                    if len(window) >= lookahead:
+                        yield window.popleft().result()
+                while window:
+                    yield window.popleft().result()
+        else:
+            for task in tasks:
+                yield _extract_pages(*task)
+
+    def run(self, pdf: Path, pages: Optional[Sequence[int]] = None,
+            output_root: Optional[Path] = None) -> Dict:
+        """
+        Extract (cache-aware) and write the comparative layout next to the PDF.
+
+        Pages flow from the workers to the engine writers in page order and are
+        written to disk as they arrive; the combined report is merged at the end.
+        """
+        start = time.perf_counter()
+        pdf = Path(pdf)
+        output_root = Path(output_root) if output_root else pdf.with_name(f"{pdf.stem}_comparative")
+        pdf_hash = file_sha256(pdf)
+        pages = self._resolve_pages(pdf, pages)
+
+        writers = {key: _EngineWriter(ENGINES[key], output_root / ENGINES[key].directory,
+                                      self.entry_dir(pdf_hash, key), self.versions[key])
+                   for key in self.versions}
+        tasks = [(str(pdf), key, pages[i:i + self.pages_per_task], str(self.entry_dir(pdf_hash, key)),
+                  self.memory_limit)
+                 for key in self.versions for i in range(0, len(pages), self.pages_per_task)]
+        for chunk in self._run_tasks(tasks):
+            for result in chunk:
+                writers[result["engine"]].add(result)
+
+        report_path = output_root / REPORT_NAME
+        report = {}
+        if report_path.exists():
+            with open(report_path, encoding="utf-8") as f:
+                report = json.load(f)
+        report.update({
+            "pdf": str(pdf),
+            "pdf_sha256": pdf_hash,
+            "output_root": str(output_root),
+            "last_run": datetime.now().isoformat(timespec="seconds"),
+            "run_time": time.perf_counter() - start,
+            "pages_per_task": self.pages_per_task,
+            "memory_limit_mb": self.memory_limit,
+        })
+        engines = report.setdefault("engines", {})
+        for key, reason in self.unavailable.items():
+            engines[key] = {"success": False, "error": reason}
+        for key, writer in writers.items():
+            engines[key] = writer.close()
+
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return report
+
+
+def main():
+    """Run the page-cached extraction for one PDF."""
+    parser = argparse.ArgumentParser(description="Page-cached comparative PDF extraction")
+    parser.add_argument("pdf", type=Path)
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--pages", help="1-based page ranges, e.g. 1-20,45 (default: all)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pages-per-task", type=int, default=DEFAULT_PAGES_PER_TASK)
+    parser.add_argument("--stream", action="store_true",
+                        help="Bounded-memory mode: one page per task, handles recycled above --memory-limit")
+    parser.add_argument("--memory-limit", type=float, help="Worker RSS limit in MB "
+                        f"(default with --stream: {DEFAULT_MEMORY_LIMIT:.0f})")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--out", type=Path, help="Output root (default: <pdf>_comparative)")
+    parser.add_argument("--plan", action="store_true", help="Only list pages that would be extracted")
+    args = parser.parse_args()
+
+    if args.stream:
+        runner = PageCachedExtractionRunner.streaming(args.engines, args.cache_dir, args.workers,
+                                                      args.memory_limit or DEFAULT_MEMORY_LIMIT)
+    else:
+        runner = PageCachedExtractionRunner(args.engines, args.cache_dir, args.workers,
+                                            args.pages_per_task, args.memory_limit)
+    for key, reason in runner.unavailable.items():
+        print(f"Engine {key} skipped ({reason})")
+    pages = parse_pages(args.pages)
+
+    if args.plan:
+        for key, todo in runner.plan(args.pdf, pages).items():
+            print(f"Engine {key} [{runner.versions[key]}]: {len(todo)} pages to extract")
+        return
+
+    report = runner.run(args.pdf, pages, args.out)
+    for key in runner.versions:
+        entry = report["engines"][key]
+        rss = "n/a" if entry["rss_peak_mb"] is None else f"{entry['rss_peak_mb']:.0f} MB"
+        print(f"Engine {key}: {entry['pages_processed']} pages "
+              f"({entry['pages_from_cache']} cached, {entry['pages_extracted']} extracted, "
+              f"{len(entry['failed_pages'])} failed), {entry['processing_time']:.1f}s, "
+              f"peak RSS {rss}")
+    print(f"Report: {Path(report['output_root']) / REPORT_NAME}")
+
+
+if __name__ == "__main__":
+    main()
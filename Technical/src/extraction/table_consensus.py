@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Cell-Level Table Consensus
+==========================
+
+Merges the candidate extractions of one table (different engines, methods or
+strategies) into a single definitive table by voting cell by cell, instead of
+picking one whole candidate per page.
+
+Method:
+- Each candidate is a raw grid: first row = column headers, first column =
+  row labels. Labels are aligned on a normalized key (OCR artifacts and
+  whitespace removed, e.g. "s'«u" -> "s'u", "I!" -> "I", then LABEL_ALIASES);
+  year-like headers align as years, other headers as normalized text, blank
+  headers by position. Display labels/headers come from the highest-weight
+  candidate that has the row/column.
+- An unlabelled row takes the label of a labelled row in another candidate
+  whose values it matches numerically (>= min_label_match of the shared
+  cells); otherwise it aligns by position.
+- Two cells agree when both parse as numbers with
+  |a - b| <= atol + rtol * max(|a|, |b|), or both are the same normalized text.
+  Each candidate's support is the summed weight of the candidates agreeing
+  with it; the cell takes the best-supported value (ties: higher weight).
+- A blank printed cell read as 0.0 is dropped (counted as missing and
+  listed in suspect_zeros) when:
+  - two or more candidates have a value there, the row's other numbers are
+    all non-zero, and no other candidate confirms the zero; or
+  - candidates that have the row and the column but read the cell blank
+    outweigh the candidates reading 0.0.
+  With a single candidate nothing can confirm or refute the zero, so it is
+  kept.
+- All tables of a PDF are padded into one (tables × candidates × rows ×
+  columns) array and voted in a single pass.
+
+Per cell the result records the agreement score (winning support / weight of
+candidates with a value), the number of candidates present and agreeing, and
+the winning candidate.
+
+Engine tables of a comparative folder are grouped per page by overlapping row
+labels (headers when a table has no labels), not by table index: each
+method numbers its tables on its own, so "table 01" of two methods can be
+different physical tables.
+
+Usage:
+    python src/extraction/table_consensus.py <pdf>_comparative
+"""
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from extraction.cell_normalization import clean_label, parse_numeric
+
+# Normalized label -> canonical label (synonyms left after OCR cleanup)
+LABEL_ALIASES: Dict[str, str] = {}
+
+# Candidate weights per extraction method (as the engines' confidence)
+METHOD_WEIGHTS = {
+    "pdfplumber_strategy_1": 0.8,
+    "pdfplumber_strategy_2": 0.5,
+    "pymupdf_text_analysis": 0.7,
+    "d_engine": 0.6,
+}
+ENGINE_DIRS = ("A_enhanced", "C_basic", "D_deep")
+TABLE_FILE = re.compile(r"page_(\d+)_table_(\d+)_(.+)\.csv$")
+BOOK_TABLE_FILE = re.compile(r"^table_p(\d+)_(.+)_(\d+)$")
+YEAR = re.compile(r"^(1[89]\d\d|20\d\d)(\.0)?$")
+MIN_SUSPECT_ROW = 3
+MIN_GROUP_OVERLAP = 0.5
+
+
+@dataclass
+class Candidate:
+    """One extraction of a table: raw cells with header row and label column."""
+    name: str
+    table: pd.DataFrame
+    weight: float = 1.0
+    columns: Optional[Sequence] = None
+    labels: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ConsensusTable:
+    """Voted table with per-cell agreement diagnostics."""
+    values: pd.DataFrame
+    agreement: pd.DataFrame
+    n_present: pd.DataFrame
+    n_agree: pd.DataFrame
+    source: pd.DataFrame
+    suspect_zeros: List[Dict]
+    candidates: List[str]
+
+    def cells(self) -> pd.DataFrame:
+        """Tidy per-cell frame (cells with at least one candidate value)."""
+        r, k = np.nonzero(self.n_present.to_numpy() > 0)
+        return pd.DataFrame({
+            "row": self.values.index[r],
+            "column": self.values.columns[k],
+            "value": self.values.to_numpy(dtype=object)[r, k],
+            "agreement": self.agreement.to_numpy()[r, k],
+            "n_present": self.n_present.to_numpy()[r, k],
+            "n_agree": self.n_agree.to_numpy()[r, k],
+            "source": self.source.to_numpy()[r, k],
+        })
+
+
+def label_key(label) -> Optional[str]:
+    text = clean_label(label).replace(" ", "")
+    if not text or text.lower() == "nan":
+        return None
+    return LABEL_ALIASES.get(text, text)
+
+
+def header_key(header, position: int):
+    text = "" if header is None or pd.isna(header) else str(header).strip()
+    match = YEAR.match(text)
+    if match:
+        return int(match.group(1))
+    text = re.sub(r"\s+", " ", text).lower()
+    return text if text and text != "nan" else f"#{position}"
+
+
+def to_numbers(cells: np.ndarray) -> np.ndarray:
+    """Parsed numbers of a cell array (NaN where not numeric); see cell_normalization."""
+    return parse_numeric(cells)[0]
+
+
+def _dedupe(keys: List) -> List:
+    seen: Dict = {}
+    out = []
+    for key in keys:
+        if key is None:
+            out.append(None)
+            continue
+        seen[key] = seen.get(key, 0) + 1
+        out.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+    return out
+
+
+class TableConsensus:
+    """
+    Aligns candidate tables and votes cell by cell, vectorized over all tables.
+    """
+
+    def __init__(self, atol: float = 1e-9, rtol: float = 1e-6, min_label_match: float = 0.8,
+                 suspect_zeros: bool = True):
+        self.atol = atol
+        self.rtol = rtol
+        self.min_label_match = min_label_match
+        self.suspect_zeros = suspect_zeros
+
+    # ------------------------------------------------------------------ alignment
+    @staticmethod
+    def _parse(candidate: Candidate):
+        grid = candidate.table.astype(object).where(candidate.table.notna(), "").map(lambda v: str(v).strip())
+        headers = list(grid.iloc[0, 1:]) if candidate.columns is None else [str(c) for c in candidate.columns]
+        cells = grid.iloc[1:, 1:].to_numpy(dtype=object)
+        if len(headers) != cells.shape[1]:
+            raise ValueError(f"{candidate.name}: {len(headers)} headers for {cells.shape[1]} columns")
+        labels = [candidate.labels.get(label, label) for label in grid.iloc[1:, 0]]
+        return grid.iat[0, 0], labels, headers, cells
+
+    def _close(self, a, b):
+        with np.errstate(invalid="ignore"):
+            return np.abs(a - b) <= self.atol + self.rtol * np.maximum(np.abs(a), np.abs(b))
+
+    def align(self, candidates: Sequence[Candidate]):
+        """
+        Align candidates on a common (row, column) grid.
+
+        Returns:
+            dict with corner, row/column keys and display names, raw text
+            (candidates × rows × columns, '' missing), which rows and columns
+            each candidate has, and weights, candidates ordered by weight
+            (highest first)
+        """
+        candidates = sorted(candidates, key=lambda c: -c.weight)
+        parsed = [self._parse(c) for c in candidates]
+
+        col_keys = [_dedupe([header_key(h, j) for j, h in enumerate(headers)]) for _, _, headers, _ in parsed]
+        row_keys = [_dedupe([label_key(label) for label in labels]) for _, labels, _, _ in parsed]
+        numbers = [to_numbers(cells) for *_, cells in parsed]
+
+        # Unlabelled rows: borrow a numerically matching label, else align by position
+        for c, keys in enumerate(row_keys):
+            for i, key in enumerate(keys):
+                if key is not None:
+                    continue
+                keys[i] = self._match_label(c, i, row_keys, col_keys, numbers) or f"#{i}"
+
+        rows, cols, row_names, col_names = [], [], {}, {}
+        for (corner, labels, headers, _), r_keys, c_keys in zip(parsed, row_keys, col_keys):
+            for key, label in zip(r_keys, labels):
+                if key not in row_names:
+                    rows.append(key)
+                    row_names[key] = label if label or key.startswith("#") else key
+            for key, header in zip(c_keys, headers):
+                if key not in col_names:
+                    cols.append(key)
+                    col_names[key] = header
+
+        r_index = {k: i for i, k in enumerate(rows)}
+        c_index = {k: j for j, k in enumerate(cols)}
+        text = np.full((len(candidates), len(rows), len(cols)), "", dtype=object)
+        has_row = np.zeros((len(candidates), len(rows)), dtype=bool)
+        has_col = np.zeros((len(candidates), len(cols)), dtype=bool)
+        for c, (_, _, _, cells) in enumerate(parsed):
+            ri = np.array([r_index[k] for k in row_keys[c]], dtype=int)
+            ci = np.array([c_index[k] for k in col_keys[c]], dtype=int)
+            text[c][np.ix_(ri, ci)] = cells
+            has_row[c, ri] = True
+            has_col[c, ci] = True
+
+        return {
+            "corner": parsed[0][0] if parsed else "",
+            "rows": [row_names[k] for k in rows],
+            "columns": [col_names[k] for k in cols],
+            "text": text,
+            "has_row": has_row,
+            "has_col": has_col,
+            "weights": np.array([c.weight for c in candidates], dtype=float),
+            "names": [c.name for c in candidates],
+        }
+
+    def _match_label(self, c, i, row_keys, col_keys, numbers) -> Optional[str]:
+        best, best_score = None, self.min_label_match
+        values = dict(zip(col_keys[c], numbers[c][i]))
+        for o, keys in enumerate(row_keys):
+            if o == c:
+                continue
+            shared = [j for j, k in enumerate(col_keys[o]) if k in values]
+            if len(shared) < 2:
+                continue
+            mine = np.array([values[col_keys[o][j]] for j in shared])
+            for r, key in enumerate(keys):
+                if key is None or key.startswith("#") or key in row_keys[c]:
+                    continue
+                theirs = numbers[o][r, shared]
+                valid = ~np.isnan(mine) & ~np.isnan(theirs)
+                if valid.sum() >= 2:
+                    score = self._close(mine[valid], theirs[valid]).mean()
+                    if score >= best_score:
+                        best, best_score = key, score
+        return best
+
+    # ------------------------------------------------------------------ voting
+    def merge_groups(self, groups: Mapping[str, Sequence[Candidate]]) -> Dict[str, ConsensusTable]:
+        """Vote every table of a document in one padded array pass."""
+        aligned = {name: self.align(cands) for name, cands in groups.items() if cands}
+        if not aligned:
+            return {}
+        G = len(aligned)
+        C = max(a["text"].shape[0] for a in aligned.values())
+        R = max(a["text"].shape[1] for a in aligned.values())
+        K = max(a["text"].shape[2] for a in aligned.values())
+
+        text = np.full((G, C, R, K), "", dtype=object)
+        covered = np.zeros((G, C, R, K), dtype=bool)
+        weights = np.zeros((G, C))
+        for g, a in enumerate(aligned.values()):
+            c, r, k = a["text"].shape
+            text[g, :c, :r, :k] = a["text"]
+            covered[g, :c, :r, :k] = a["has_row"][:, :, None] & a["has_col"][:, None, :]
+            weights[g, :c] = a["weights"]
+
+        num = to_numbers(text)
+        norm = pd.Series(text.ravel(), dtype=object).str.lower().str.replace(r"\s+", " ", regex=True)
+        norm = norm.to_numpy(dtype=object).reshape(text.shape)
+        present = text != ""
+
+        # Pairwise agreement (G, C, C, R, K)
+        a_num, b_num = num[:, :, None], num[:, None, :]
+        a_is, b_is = ~np.isnan(a_num), ~np.isnan(b_num)
+        same = np.where(a_is & b_is, self._close(a_num, b_num),
+                        ~a_is & ~b_is & (norm[:, :, None] == norm[:, None, :]))
+
+        def agreement(mask):
+            return same & mask[:, :, None] & mask[:, None, :]
+
+        agree = agreement(present)
+        suspect = np.zeros(present.shape, dtype=bool)
+        if self.suspect_zeros:
+            nonzero = ~np.isnan(num) & (num != 0)
+            suspect = (num == 0) & (nonzero.sum(axis=-1, keepdims=True) >= MIN_SUSPECT_ROW)
+            # Only a cell with another candidate can have its zero outvoted
+            suspect &= present.sum(axis=1, keepdims=True) >= 2
+            confirmed = agree.sum(axis=2) > 1
+            suspect &= ~confirmed
+            # A candidate that has the row and the column but reads the cell
+            # blank votes against a zero there
+            blank = covered & ~present
+            blank_weight = (blank * weights[:, :, None, None]).sum(axis=1, keepdims=True)
+            zero_weight = (agree * weights[:, None, :, None, None]).sum(axis=2)
+            suspect |= (num == 0) & present & (blank_weight > zero_weight)
+            present = present & ~suspect
+            agree = agreement(present)
+
+        support = np.where(present, (agree * weights[:, None, :, None, None]).sum(axis=2), -np.inf)
+        winner = support.argmax(axis=1)
+        take = lambda arr: np.take_along_axis(arr, winner[:, None], axis=1)[:, 0]
+        total = (present * weights[:, :, None, None]).sum(axis=1)
+        n_present = present.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            score = np.where(n_present > 0, take(support) / total, np.nan)
+        n_agree = np.where(n_present > 0, take(agree.sum(axis=2)), 0)
+        win_text, win_num = take(text), take(num)
+
+        results = {}
+        for g, (name, a) in enumerate(aligned.items()):
+            c, r, k = a["text"].shape
+            has = n_present[g, :r, :k] > 0
+            index = pd.Index(a["rows"], name=a["corner"])
+            values = pd.DataFrame(np.where(has, win_text[g, :r, :k], np.nan), index=index, columns=a["columns"])
+            numeric = pd.DataFrame(np.where(has, win_num[g, :r, :k], np.nan), index=index, columns=a["columns"])
+            for j, col in enumerate(a["columns"]):
+                if (~np.isnan(win_num[g, :r, j]) | ~has[:, j]).all():
+                    values.isetitem(j, numeric.iloc[:, j])
+            names = np.array(a["names"] + [""] * (C - c), dtype=object)
+            results[name] = ConsensusTable(
+                values=values,
+                agreement=pd.DataFrame(score[g, :r, :k], index=index, columns=a["columns"]),
+                n_present=pd.DataFrame(n_present[g, :r, :k], index=index, columns=a["columns"]),
+                n_agree=pd.DataFrame(n_agree[g, :r, :k], index=index, columns=a["columns"]),
+                source=pd.DataFrame(np.where(has, names[winner[g, :r, :k]], ""), index=index, columns=a["columns"]),
+                suspect_zeros=[{"candidate": a["names"][ci], "row": a["rows"][ri], "column": a["columns"][ki]}
+                               for ci, ri, ki in zip(*np.nonzero(suspect[g, :c, :r, :k]))],
+                candidates=a["names"],
+            )
+        return results
+
+    def merge(self, candidates: Sequence[Candidate]) -> ConsensusTable:
+        """Vote a single table."""
+        return self.merge_groups({"table": candidates})["table"]
+
+
+def read_candidate(path: Path, weight: float = 1.0, **kwargs) -> Candidate:
+    table = pd.read_csv(path, header=None, dtype=str, keep_default_na=False)
+    return Candidate(Path(path).stem, table, weight, **kwargs)
+
+
+def has_numeric_column(candidate: Candidate, min_share: float = 0.5) -> bool:
+    """True if some data column is mostly numbers (filters out text-only 'tables')."""
+    cells = candidate.table.iloc[1:, 1:].to_numpy(dtype=object)
+    if cells.size == 0:
+        return False
+    filled = np.vectorize(lambda v: str(v).strip() not in ("", "nan"))(cells)
+    numeric = ~np.isnan(to_numbers(cells))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = numeric.sum(axis=0) / filled.sum(axis=0)
+    return bool(np.nanmax(np.where(filled.sum(axis=0) > 0, share, 0.0)) >= min_share)
+
+
+def _table_keys(candidate: Candidate):
+    """Normalized row labels and (non-positional) column headers of a candidate."""
+    grid = candidate.table
+    if grid.empty:
+        return set(), set()
+    rows = {label_key(v) for v in grid.iloc[1:, 0]} - {None}
+    headers = {header_key(h, j) for j, h in enumerate(grid.iloc[0, 1:])}
+    return rows, {h for h in headers if not (isinstance(h, str) and h.startswith("#"))}
+
+
+def _overlap(a: set, b: set) -> float:
+    return len(a & b) / min(len(a), len(b)) if a and b else 0.0
+
+
+def group_by_overlap(candidates: Sequence[Candidate], sources: Optional[Sequence[str]] = None,
+                     min_overlap: float = MIN_GROUP_OVERLAP) -> List[List[Candidate]]:
+    """
+    Cluster candidates of one page into physical tables.
+
+    A candidate joins the group whose row labels it overlaps most (share of
+    the smaller label set), or, when either side has no labels, whose headers
+    it overlaps most; below min_overlap it starts a new group. A group never
+    takes two candidates of the same source (engine and method), which are
+    different tables by construction. Candidates are taken by weight, so each
+    group is seeded by its best extraction.
+    """
+    sources = list(sources) if sources is not None else [c.name for c in candidates]
+    groups: List[List[Candidate]] = []
+    keys: List[tuple] = []
+    for candidate, source in sorted(zip(candidates, sources), key=lambda cs: -cs[0].weight):
+        rows, headers = _table_keys(candidate)
+        best, best_score = None, min_overlap
+        for g, (g_rows, g_headers, g_sources) in enumerate(keys):
+            if source in g_sources:
+                continue
+            score = _overlap(rows, g_rows) if rows and g_rows else _overlap(headers, g_headers)
+            if score >= best_score:
+                best, best_score = g, score
+        if best is None:
+            groups.append([candidate])
+            keys.append((set(rows), set(headers), {source}))
+        else:
+            groups[best].append(candidate)
+            keys[best][0].update(rows)
+            keys[best][1].update(headers)
+            keys[best][2].add(source)
+    return groups
+
+
+def comparative_candidates(comparative_dir: Path) -> Dict[str, List[Candidate]]:
+    """Group engine tables of a <pdf>_comparative folder by page and overlapping labels."""
+    by_page: Dict[int, List[Candidate]] = {}
+    sources: Dict[int, List[str]] = {}
+    for engine_dir in ENGINE_DIRS:
+        for path in sorted((Path(comparative_dir) / engine_dir / "tables").glob("page_*_table_*.csv")):
+            match = TABLE_FILE.search(path.name)
+            if not match:
+                continue
+            page, _, method = match.groups()
+            candidate = read_candidate(path, METHOD_WEIGHTS.get(method, 0.5))
+            candidate.name = f"{engine_dir}/{path.stem}"
+            by_page.setdefault(int(page), []).append(candidate)
+            sources.setdefault(int(page), []).append(f"{engine_dir}/{method}")
+
+    groups: Dict[str, List[Candidate]] = {}
+    for page in sorted(by_page):
+        for n, group in enumerate(group_by_overlap(by_page[page], sources[page]), start=1):
+            groups[f"page_{page:03d}_table_{n:02d}"] = group
+    return groups
+
+
+def book_table_candidates(book_dir: Path, page: int, **kwargs) -> List[Candidate]:
+    """
+    Numeric candidates for a book page (table_p<page>_<method>_<n>.csv).
+
+    Weights are the manifest confidence where the table is listed, else 1.0.
+    """
+    book_dir = Path(book_dir)
+    confidence = {}
+    if (book_dir / "manifest.json").exists():
+        with open(book_dir / "manifest.json", encoding="utf-8") as f:
+            confidence = {t["table_id"]: t.get("confidence") for t in json.load(f).get("tables", [])}
+    candidates = []
+    for path in sorted(book_dir.glob(f"table_p{page}_*.csv")):
+        if not BOOK_TABLE_FILE.match(path.stem):
+            continue
+        candidate = read_candidate(path, float(confidence.get(path.stem) or 1.0), **kwargs)
+        if has_numeric_column(candidate):
+            candidates.append(candidate)
+    return candidates
+
+
+def write_consensus(results: Mapping[str, ConsensusTable], out_dir: Path) -> Dict:
+    """consensus tables, per-cell agreement CSV and an integrity summary."""
+    out_dir = Path(out_dir)
+    (out_dir / "consensus_tables").mkdir(parents=True, exist_ok=True)
+    cells, summary = [], {}
+    for name, result in results.items():
+        result.values.to_csv(out_dir / "consensus_tables" / f"{name}.csv")
+        tidy = result.cells()
+        tidy.insert(0, "table", name)
+        cells.append(tidy)
+        summary[name] = {
+            "candidates": result.candidates,
+            "cells": int(len(tidy)),
+            "mean_agreement": float(tidy["agreement"].mean()) if len(tidy) else None,
+            "contested_cells": int((tidy["agreement"] < 1).sum()),
+            "single_source_cells": int((tidy["n_present"] == 1).sum()),
+            "suspect_zeros": result.suspect_zeros,
+        }
+    if cells:
+        pd.concat(cells, ignore_index=True).to_csv(out_dir / "table_consensus_cells.csv", index=False)
+    with open(out_dir / "table_consensus_integrity.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+    return summary
+
+
+def main():
+    """Vote the engine tables of one comparative folder into Z_definitive/consensus_tables."""
+    parser = argparse.ArgumentParser(description="Cell-level consensus over comparative engine tables")
+    parser.add_argument("comparative_dir", type=Path)
+    parser.add_argument("--out", type=Path, help="Output directory (default: <comparative_dir>/Z_definitive)")
+    parser.add_argument("--atol", type=float, default=1e-9)
+    parser.add_argument("--rtol", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    groups = comparative_candidates(args.comparative_dir)
+    results = TableConsensus(args.atol, args.rtol).merge_groups(groups)
+    summary = write_consensus(results, args.out or args.comparative_dir / "Z_definitive")
+    contested = sum(s["contested_cells"] for s in summary.values())
+    print(f"{len(results)} tables voted from {sum(len(g) for g in groups.values())} candidates; "
+          f"{contested} contested cells")
+
+
+if __name__ == "__main__":
+    main()
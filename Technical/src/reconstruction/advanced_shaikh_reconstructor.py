@@ -11,6 +11,11 @@ CRITICAL IMPROVEMENTS:
 2. Implements proper sector filtering (productive vs unproductive)
 3. Calculates S*, C*, V* using exact book definitions
 4. Produces profit rates comparable to historical 39% levels
+
+PERFORMANCE:
+Robin tables are indexed once per run by (table id, year) on first lookup, and
+per-year S*, C*, V* results are memoized, so a multi-year reconstruction does a
+single pass over the data instead of rescanning every dataset per year and call.
 """
 
 import pandas as pd
@@ -46,6 +51,11 @@ class AdvancedShaikhReconstructor:
         self.productive_sectors = self._get_productive_sectors()
         self.unproductive_sectors = self._get_unproductive_sectors()
 
+        # Per-run lookup index and memoized per-year components (built lazily)
+        self._table_index: Optional[Dict[Tuple[str, int], pd.DataFrame]] = None
+        self._capital_by_year: Dict[int, float] = {}
+        self._component_cache: Dict[Tuple[str, int], Optional[float]] = {}
+
         self.logger.info("Advanced Shaikh Reconstructor initialized")
 
     def _setup_logging(self) -> logging.Logger:
@@ -102,6 +112,67 @@ class AdvancedShaikhReconstructor:
             'Government'
         ]
 
+    def build_lookup_index(self) -> Dict[Tuple[str, int], pd.DataFrame]:
+        """
+        Index the Robin tables by (table id, year) in one pass over the data
+
+        Keys are ('T20100', year) for the annual BEA value added table and
+        ('bls_compensation', year) for BLS compensation/wage series. As in the
+        original per-call search, the first dataset (in load order) with rows
+        for a year wins.
+
+        Returns:
+            Dictionary mapping (table id, year) to the matching rows
+        """
+        index: Dict[Tuple[str, int], pd.DataFrame] = {}
+
+        bea_robin, bls_robin = self.all_data['bea_robin'], self.all_data['bls_robin']
+        # Filter by name first so only matching datasets are parsed; `in` is
+        # False for a file that fails to parse, which load_all_data skipped
+        for dataset_name in list(bea_robin):
+            # Annual value added table
+            if 'T20100' in dataset_name and 'A_' in dataset_name and dataset_name in bea_robin:
+                df = bea_robin[dataset_name]
+                if 'year' in df.columns:
+                    for year, year_data in df.groupby('year', sort=False):
+                        index.setdefault(('T20100', year), year_data)
+                elif 'TimePeriod' in df.columns:
+                    for period, year_data in df.groupby('TimePeriod', sort=False):
+                        # Only string periods like '1990' matched str(year) before
+                        if isinstance(period, str) and period.isdigit() and str(int(period)) == period:
+                            index.setdefault(('T20100', int(period)), year_data)
+
+        for dataset_name in list(bls_robin):
+            if 'bls_data' in dataset_name and dataset_name in bls_robin:
+                df = bls_robin[dataset_name]
+                if 'year' in df.columns and 'series_id' in df.columns:
+                    is_comp = df['series_id'].str.contains('compensation|wages', case=False, na=False)
+                    for year, year_data in df[is_comp].groupby('year', sort=False):
+                        index.setdefault(('bls_compensation', year), year_data)
+
+        # Capital stock by year (first row per year, as in the per-year filter)
+        if 'fixed_assets' in self.data_loader.bea_data:
+            fixed_assets = self.data_loader.bea_data['fixed_assets']
+            first = fixed_assets.drop_duplicates('year', keep='first')
+            self._capital_by_year = dict(zip(first['year'], first['modern_K_st_consistent'].astype(float)))
+
+        self._table_index = index
+        self.logger.info(f"Built lookup index: {len(index)} (table, year) entries")
+        return index
+
+    def _lookup(self, table_id: str, year: int) -> Optional[pd.DataFrame]:
+        """Rows for (table id, year) from the per-run index"""
+        if self._table_index is None:
+            self.build_lookup_index()
+        return self._table_index.get((table_id, year))
+
+    def _memoized(self, component: str, year: int, compute) -> Optional[float]:
+        """Compute a per-year component once per run"""
+        key = (component, year)
+        if key not in self._component_cache:
+            self._component_cache[key] = compute(year)
+        return self._component_cache[key]
+
     def get_bea_value_added_by_industry(self, year: int) -> Optional[pd.DataFrame]:
         """
         Get BEA value added by industry for a specific year
@@ -112,22 +183,11 @@ class AdvancedShaikhReconstructor:
         Returns:
             DataFrame with industry-level value added data
         """
-        # Look for value added data in Robin BEA datasets
-        for dataset_name, df in self.all_data['bea_robin'].items():
-            if 'T20100' in dataset_name and 'A_' in dataset_name:  # Annual value added table
-                # Filter for the specific year
-                if 'year' in df.columns:
-                    year_data = df[df['year'] == year]
-                    if not year_data.empty:
-                        self.logger.info(f"Found BEA value added data for {year}: {len(year_data)} industries")
-                        return year_data
-                elif 'TimePeriod' in df.columns:
-                    year_data = df[df['TimePeriod'] == str(year)]
-                    if not year_data.empty:
-                        self.logger.info(f"Found BEA value added data for {year}: {len(year_data)} industries")
-                        return year_data
-
-        return None
+        # Look up the annual value added table (T20100) in the per-run index
+        year_data = self._lookup('T20100', year)
+        if year_data is not None:
+            self.logger.info(f"Found BEA value added data for {year}: {len(year_data)} industries")
+        return year_data
 
     def get_bls_compensation_by_industry(self, year: int) -> Optional[pd.DataFrame]:
         """
@@ -139,17 +199,14 @@ class AdvancedShaikhReconstructor:
         Returns:
             DataFrame with industry-level compensation data
         """
-        # Look for compensation data in Robin BLS datasets
-        for dataset_name, df in self.all_data['bls_robin'].items():
-            if 'bls_data' in dataset_name and year >= 2015:  # BLS data available from 2015
-                # Filter for the specific year and compensation series
-                if 'year' in df.columns:
-                    year_data = df[(df['year'] == year) & df['series_id'].str.contains('compensation|wages', case=False, na=False)]
-                    if not year_data.empty:
-                        self.logger.info(f"Found BLS compensation data for {year}: {len(year_data)} series")
-                        return year_data
+        if year < 2015:  # BLS data available from 2015
+            return None
 
-        return None
+        # Look up compensation/wage series in the per-run index
+        year_data = self._lookup('bls_compensation', year)
+        if year_data is not None:
+            self.logger.info(f"Found BLS compensation data for {year}: {len(year_data)} series")
+        return year_data
 
     def calculate_sophisticated_surplus_value(self, year: int) -> Optional[float]:
         """
@@ -161,6 +218,10 @@ class AdvancedShaikhReconstructor:
         Returns:
             S* in millions of dollars
         """
+        return self._memoized('S', year, self._compute_sophisticated_surplus_value)
+
+    def _compute_sophisticated_surplus_value(self, year: int) -> Optional[float]:
+        """Uncached S* calculation (see calculate_sophisticated_surplus_value)"""
         # Method 1: Try to use detailed industry data
         value_added_data = self.get_bea_value_added_by_industry(year)
         compensation_data = self.get_bls_compensation_by_industry(year)
@@ -195,24 +256,28 @@ class AdvancedShaikhReconstructor:
         Returns:
             C* in millions of dollars
         """
+        return self._memoized('C', year, self._compute_sophisticated_constant_capital)
+
+    def _compute_sophisticated_constant_capital(self, year: int) -> Optional[float]:
+        """Uncached C* calculation (see calculate_sophisticated_constant_capital)"""
         # Look for intermediate inputs data or depreciation data
         # For now, use a more sophisticated scaling of fixed assets
 
-        if 'fixed_assets' in self.data_loader.bea_data:
-            fixed_assets = self.data_loader.bea_data['fixed_assets']
-            year_data = fixed_assets[fixed_assets['year'] == year]
-            if not year_data.empty:
-                # Use depreciation rate approach: C* ≈ depreciation + intermediate inputs
-                # Typical depreciation is 6-8% of capital stock
-                # Intermediate inputs are typically 50-60% of gross output
+        if self._table_index is None:
+            self.build_lookup_index()
+
+        if year in self._capital_by_year:
+            # Use depreciation rate approach: C* ≈ depreciation + intermediate inputs
+            # Typical depreciation is 6-8% of capital stock
+            # Intermediate inputs are typically 50-60% of gross output
 
-                capital_stock = float(year_data['modern_K_st_consistent'].iloc[0])
+            capital_stock = self._capital_by_year[year]
 
-                # Estimate constant capital as depreciation (7%) plus portion of capital for intermediates (25%)
-                constant_capital = capital_stock * 0.32  # 7% + 25% = 32%
+            # Estimate constant capital as depreciation (7%) plus portion of capital for intermediates (25%)
+            constant_capital = capital_stock * 0.32  # 7% + 25% = 32%
 
-                self.logger.info(f"Sophisticated C* ({year}): ${constant_capital:,.0f} million")
-                return constant_capital
+            self.logger.info(f"Sophisticated C* ({year}): ${constant_capital:,.0f} million")
+            return constant_capital
 
         return None
 
@@ -226,6 +291,10 @@ class AdvancedShaikhReconstructor:
         Returns:
             V* in millions of dollars
         """
+        return self._memoized('V', year, self._compute_sophisticated_variable_capital)
+
+    def _compute_sophisticated_variable_capital(self, year: int) -> Optional[float]:
+        """Uncached V* calculation (see calculate_sophisticated_variable_capital)"""
         # Try to get actual compensation data for productive sectors
         compensation_data = self.get_bls_compensation_by_industry(year)
 
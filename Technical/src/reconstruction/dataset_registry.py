@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Lazy Dataset Registry
+=====================
+
+Manifest-driven registry of CSV datasets used by the reconstruction scripts.
+Files are registered from their metadata only (path, size, mtime, header
+columns); a dataset is parsed with pd.read_csv the first time it is accessed.
+Parsed frames are kept in an in-memory LRU cache bounded by total frame size.
+
+The manifest (JSON) records the scanned metadata so later runs can reuse the
+header columns of unchanged files without reopening them.
+
+A file that fails to parse is logged as a warning and dropped from the
+registry, so it reads as absent, as the eager loader left such files out.
+"""
+
+import csv
+import json
+import logging
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+
+class DatasetRegistry:
+    """
+    Registry of named CSV datasets, parsed on first access and LRU-cached
+    """
+
+    def __init__(self, manifest_path: Optional[Path] = None,
+                 max_cache_bytes: int = DEFAULT_CACHE_BYTES,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the registry
+
+        Args:
+            manifest_path: JSON manifest to reuse and update (None = in-memory only)
+            max_cache_bytes: Upper bound on the total size of cached frames
+            logger: Logger to report loads and evictions to
+        """
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+        self.max_cache_bytes = max_cache_bytes
+        self.logger = logger or logging.getLogger('DatasetRegistry')
+
+        self.entries: Dict[str, Dict] = {}
+        self.failed: Dict[str, str] = {}
+        self._previous: Dict[str, Dict] = {}
+        self._cache: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._cache_sizes: Dict[str, int] = {}
+        self.cache_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+        if self.manifest_path and self.manifest_path.exists():
+            try:
+                self._previous = json.loads(self.manifest_path.read_text(encoding='utf-8')).get('datasets', {})
+            except (ValueError, OSError) as e:
+                self.logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+
+    def register(self, name: str, path: Path, group: str) -> None:
+        """
+        Register one file from its metadata (no parse)
+
+        Args:
+            name: Dataset name used for access
+            path: CSV file path
+            group: Source group (e.g. 'bea_project', 'bea_robin')
+        """
+        path = Path(path)
+        st = path.stat()
+        previous = self._previous.get(name)
+        if previous and previous['path'] == str(path) and previous['size'] == st.st_size \
+                and previous['mtime_ns'] == st.st_mtime_ns:
+            columns = previous['columns']
+        else:
+            columns = self._read_header(path)
+
+        if name in self._cache and self.entries.get(name, {}).get('mtime_ns') != st.st_mtime_ns:
+            self._evict(name)
+
+        self.failed.pop(name, None)
+        self.entries[name] = {
+            'group': group,
+            'path': str(path),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'columns': columns,
+        }
+
+    def scan(self, group: str, directory: Path, pattern: str = "*.csv",
+             prefix: str = "", exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Register every file matching pattern in a directory
+
+        Args:
+            group: Source group for the registered datasets
+            directory: Directory to scan (missing directories register nothing)
+            pattern: Glob pattern
+            prefix: Prefix added to each file stem to form the dataset name
+            exclude: File names to skip
+
+        Returns:
+            Names of the registered datasets
+        """
+        names = []
+        directory = Path(directory)
+        if not directory.exists():
+            return names
+        excluded = set(exclude)
+        for file_path in sorted(directory.glob(pattern)):
+            if file_path.name in excluded:
+                continue
+            name = f"{prefix}{file_path.stem}"
+            try:
+                self.register(name, file_path, group)
+                names.append(name)
+            except OSError as e:
+                self.logger.warning(f"Could not register {file_path}: {e}")
+        return names
+
+    def save_manifest(self) -> None:
+        """Write the current entries to the manifest file"""
+        if not self.manifest_path:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps({'datasets': self.entries}, indent=2), encoding='utf-8')
+
+    def get(self, name: str) -> pd.DataFrame:
+        """
+        Return a dataset, parsing it on first access
+
+        Args:
+            name: Registered dataset name
+
+        Returns:
+            Parsed DataFrame
+
+        Raises:
+            KeyError: Unknown dataset, or a file that failed to parse (logged
+                      and dropped from the registry)
+        """
+        if name in self._cache:
+            self._cache.move_to_end(name)
+            self.stats['hits'] += 1
+            return self._cache[name]
+
+        if name not in self.entries:
+            raise KeyError(name)
+
+        self.stats['misses'] += 1
+        path = self.entries[name]['path']
+        try:
+            df = pd.read_csv(path)
+        except Exception as e:
+            self.logger.warning(f"Could not load {path}: {e}")
+            del self.entries[name]
+            self.failed[name] = str(e)
+            raise KeyError(name) from e
+        self.logger.info(f"Loaded {name}: {len(df)} records")
+        self._store(name, df)
+        return df
+
+    def group(self, group: str) -> "LazyDatasets":
+        """Mapping view of one group; values are parsed on access"""
+        return LazyDatasets(self, group)
+
+    def names(self, group: Optional[str] = None) -> List[str]:
+        """Registered dataset names, optionally restricted to one group"""
+        return [n for n, e in self.entries.items() if group is None or e['group'] == group]
+
+    def cache_info(self) -> Dict[str, int]:
+        """Cache counters and current size"""
+        return {**self.stats, 'cached': len(self._cache), 'cache_bytes': self.cache_bytes,
+                'max_cache_bytes': self.max_cache_bytes}
+
+    def _store(self, name: str, df: pd.DataFrame) -> None:
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self.max_cache_bytes:
+            # Larger than the whole budget: hand it out uncached
+            return
+        while self._cache and self.cache_bytes + nbytes > self.max_cache_bytes:
+            oldest = next(iter(self._cache))
+            self._evict(oldest)
+            self.stats['evictions'] += 1
+            self.logger.info(f"Evicted {oldest} from dataset cache")
+        self._cache[name] = df
+        self._cache_sizes[name] = nbytes
+        self.cache_bytes += nbytes
+
+    def _evict(self, name: str) -> None:
+        self._cache.pop(name, None)
+        self.cache_bytes -= self._cache_sizes.pop(name, 0)
+
+    @staticmethod
+    def _read_header(path: Path) -> List[str]:
+        with path.open('r', encoding='utf-8', errors='replace', newline='') as f:
+            return next(csv.reader(f), [])
+
+
+class LazyDatasets(Mapping):
+    """
+    Read-only dict-like view of one registry group
+
+    len() and key iteration use the manifest only; indexing (and
+    .items()/.values()) parses the dataset through the registry cache.
+    Membership of a dataset not parsed yet parses it, so a file that fails
+    to parse is absent (KeyError, `in` is False, skipped by items/values)
+    just as the eager loader left it out.
+    """
+
+    def __init__(self, registry: DatasetRegistry, group: str):
+        self.registry = registry
+        self.group_name = group
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        if name not in self.registry.entries or self.registry.entries[name]['group'] != self.group_name:
+            raise KeyError(name)
+        return self.registry.get(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.registry.names(self.group_name))
+
+    def __len__(self) -> int:
+        return len(self.registry.names(self.group_name))
+
+    def __contains__(self, name: object) -> bool:
+        entry = self.registry.entries.get(name) if isinstance(name, str) else None
+        if entry is None or entry['group'] != self.group_name:
+            return False
+        try:
+            self.registry.get(name)
+        except KeyError:
+            return False
+        return True
+
+    def items(self) -> List:
+        """(name, frame) pairs of the datasets that parse"""
+        pairs = []
+        for name in list(self):
+            try:
+                pairs.append((name, self.registry.get(name)))
+            except KeyError:
+                continue
+        return pairs
+
+    def values(self) -> List[pd.DataFrame]:
+        """Frames of the datasets that parse"""
+        return [df for _, df in self.items()]
+
+    def columns(self, name: str) -> List[str]:
+        """Header columns from the manifest, without parsing the file"""
+        entry = self.registry.entries.get(name)
+        if entry is None or entry['group'] != self.group_name:
+            raise KeyError(name)
+        return self.registry.entries[name]['columns']
@@ -5,6 +5,10 @@ Shaikh & Tonak Data Loader
 
 This module loads and processes actual BEA/BLS data for Shaikh methodology reconstruction.
 It integrates with existing project data and Robin API modules.
+
+By default datasets are registered lazily (see dataset_registry.py): files are
+listed in a manifest up front and only parsed when a dataset is first used.
+Pass lazy=False for the original eager loading.
 """
 
 import pandas as pd
@@ -14,6 +18,8 @@ from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import logging
 
+from dataset_registry import DatasetRegistry, DEFAULT_CACHE_BYTES
+
 # Add Robin API modules to path
 robin_bea_path = Path("D:/Arcanum/Robin/API_MODULES/BEA")
 robin_bls_path = Path("D:/Arcanum/Robin/API_MODULES/BLS")
@@ -25,17 +31,26 @@ class ShaikhDataLoader:
     Loads actual BEA/BLS data for Shaikh methodology reconstruction
     """
 
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, lazy: bool = True, cache_max_bytes: int = DEFAULT_CACHE_BYTES):
         """
         Initialize the data loader
 
         Args:
             project_path: Path to Shaikh Tonak project directory
+            lazy: Register datasets and parse on first access instead of loading everything
+            cache_max_bytes: Size bound of the in-memory LRU cache for lazily parsed frames
         """
         self.project_path = Path(project_path)
         self.modern_data_path = self.project_path / "Technical" / "data" / "modern"
         self.logger = self._setup_logging()
 
+        self.lazy = lazy
+        self.registry = DatasetRegistry(
+            manifest_path=self.modern_data_path.parent / "cache" / "dataset_manifest.json",
+            max_cache_bytes=cache_max_bytes,
+            logger=self.logger
+        )
+
         # Data storage
         self.bea_data = {}
         self.bls_data = {}
@@ -67,6 +82,9 @@ class ShaikhDataLoader:
         """
         self.logger.info("Loading existing BEA data from project")
 
+        if self.lazy:
+            return self._register_existing_bea_data()
+
         bea_data = {}
 
         # Load corporate profits
@@ -95,6 +113,23 @@ class ShaikhDataLoader:
         self.bea_data = bea_data
         return bea_data
 
+    def _register_existing_bea_data(self):
+        """Lazy counterpart of load_existing_bea_data (registers, does not parse)"""
+        corporate_profits_path = self.modern_data_path / "bea_nipa" / "corporate_profits_1990_2024_extracted.csv"
+        if corporate_profits_path.exists():
+            self.registry.register('corporate_profits', corporate_profits_path, 'bea_project')
+
+        fixed_assets_path = self.modern_data_path / "processed" / "bea_fixed_assets" / "private_net_stock_current_cost.csv"
+        if fixed_assets_path.exists():
+            self.registry.register('fixed_assets', fixed_assets_path, 'bea_project')
+
+        self.registry.scan('bea_project', self.modern_data_path / "bea_nipa",
+                           exclude=['corporate_profits_1990_2024_extracted.csv'])
+
+        self.bea_data = self.registry.group('bea_project')
+        self.logger.info(f"Registered {len(self.bea_data)} BEA datasets (parsed on first use)")
+        return self.bea_data
+
     def load_existing_bls_data(self) -> Dict[str, pd.DataFrame]:
         """
         Load existing BLS data from project
@@ -104,6 +139,11 @@ class ShaikhDataLoader:
         """
         self.logger.info("Loading existing BLS data from project")
 
+        if self.lazy:
+            self.registry.scan('bls_project', self.modern_data_path / "bls_employment")
+            self.bls_data = self.registry.group('bls_project')
+            return self.bls_data
+
         bls_data = {}
 
         # Check BLS employment directory
@@ -129,6 +169,10 @@ class ShaikhDataLoader:
         """
         self.logger.info("Loading additional BEA data from Robin modules")
 
+        if self.lazy:
+            self.registry.scan('bea_robin', Path("D:/Arcanum/Robin/API_MODULES/BEA/data"), prefix="robin_")
+            return self.registry.group('bea_robin')
+
         robin_bea_data = {}
 
         try:
@@ -165,6 +209,10 @@ class ShaikhDataLoader:
         """
         self.logger.info("Loading additional BLS data from Robin modules")
 
+        if self.lazy:
+            self.registry.scan('bls_robin', Path("D:/Arcanum/Robin/API_MODULES/BLS/data"), prefix="robin_")
+            return self.registry.group('bls_robin')
+
         robin_bls_data = {}
 
         try:
@@ -201,6 +249,16 @@ class ShaikhDataLoader:
         """
         self.logger.info("Loading integrated data from project")
 
+        if self.lazy:
+            integrated_path = self.modern_data_path / "final_results" / "shaikh_tonak_extended_1958_2025_FINAL.csv"
+            if integrated_path.exists():
+                self.registry.register('main_series', integrated_path, 'integrated')
+            output_path = self.project_path / "OUTPUT_TABLES" / "04_INTEGRATED_DATA_1958-2025.csv"
+            if output_path.exists():
+                self.registry.register('output_integrated', output_path, 'integrated')
+            self.integrated_data = self.registry.group('integrated')
+            return self.integrated_data
+
         integrated_data = {}
 
         # Load the main integrated dataset
@@ -360,7 +418,11 @@ class ShaikhDataLoader:
         }
 
         total_datasets = sum(len(datasets) for datasets in all_data.values())
-        self.logger.info(f"Loaded {total_datasets} total datasets from all sources")
+        if self.lazy:
+            self.registry.save_manifest()
+            self.logger.info(f"Registered {total_datasets} total datasets from all sources")
+        else:
+            self.logger.info(f"Loaded {total_datasets} total datasets from all sources")
 
         return all_data
 
@@ -407,6 +469,67 @@ class ShaikhDataLoader:
 
         return reconstruction_df
 
+    def _year_series(self, dataset: str, column: str, years: pd.Index) -> pd.Series:
+        """First value per year of a BEA dataset column, aligned to `years` (NaN where absent)"""
+        if dataset not in self.bea_data:
+            return pd.Series(np.nan, index=years, dtype=float)
+        df = self.bea_data[dataset]
+        # Per-year getters take the first matching row, so keep='first' here too
+        first = df.drop_duplicates('year', keep='first').set_index('year')[column]
+        return first.reindex(years).astype(float)
+
+    def compute_panel(self, start_year: int = 1990, end_year: int = 2025) -> pd.DataFrame:
+        """
+        Vectorized equivalent of create_shaikh_reconstruction_data over a year range
+
+        Builds S*, C*, V* and r* for all years at once with aligned column
+        operations instead of per-year boolean-mask lookups. Numbers and the
+        year filter match the per-year path exactly. Uses already loaded BEA
+        data; loads only the project BEA datasets if nothing is loaded yet.
+
+        Args:
+            start_year: First year to reconstruct
+            end_year: Last year to reconstruct
+
+        Returns:
+            DataFrame with S*, C*, V*, r* for each year (same layout as
+            create_shaikh_reconstruction_data)
+        """
+        if not self.bea_data:
+            self.load_existing_bea_data()
+
+        years = pd.Index(range(start_year, end_year + 1), name='year')
+
+        # Same proxies as get_surplus_value_data / get_constant_capital_data / get_variable_capital_data
+        surplus_value = self._year_series('corporate_profits', 'value', years) * 1000
+        constant_capital = self._year_series('fixed_assets', 'modern_K_st_consistent', years) * 0.2
+        variable_capital = surplus_value * 0.3
+        denominator = constant_capital + variable_capital
+        profit_rate = surplus_value / denominator
+
+        # Per-year path keeps a year only if every component is truthy and C*+V* > 0
+        complete = (
+            surplus_value.notna() & (surplus_value != 0) &
+            constant_capital.notna() & (constant_capital != 0) &
+            (denominator > 0)
+        )
+
+        panel = pd.DataFrame({
+            'S_star': surplus_value,
+            'C_star': constant_capital,
+            'V_star': variable_capital,
+            'r_star': profit_rate,
+        })[complete]
+        panel['methodology'] = 'Shaikh_1994_reconstructed'
+        panel['data_source'] = 'BEA_BLS_actual_data'
+
+        missing = years[~complete.to_numpy()]
+        if len(missing):
+            self.logger.warning(f"Could not calculate complete Shaikh variables for {len(missing)} years: {list(missing)}")
+        self.logger.info(f"Created reconstruction panel: {len(panel)} years")
+
+        return panel.reset_index()
+
 def main():
     """
     Main function to demonstrate the data loader
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Batched Error Test Battery
+==========================
+
+Runs the systematic-error audit's tests on many error series at once:
+
+- Randomness: Wald–Wolfowitz runs test about the median (z-score)
+- Autocorrelation at configurable lags (Pearson, as pandas autocorr)
+- Magnitude dependence: correlation of |error| with the published value
+- Temporal trend: OLS slope of error on year (analytic p as scipy linregress)
+- Period split: pooled two-sample t-test, years before vs from split_year
+
+Series are the columns of a year-indexed DataFrame. Each series is packed so
+its non-missing years come first (the same order as Series.dropna()), and
+every statistic is computed as masked array operations over all series.
+
+Permutation p-values shuffle each series' observed values among its own years
+(magnitudes and years stay fixed) and count |statistic| at least as extreme as
+observed: p = (1 + exceedances) / (1 + permutations). Permutations run in
+batches, each with its own RNG stream spawned from one SeedSequence, so the
+result does not depend on the number of worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+DEFAULT_PERMUTATIONS = 999
+DEFAULT_BATCH = 128
+DEFAULT_LAGS = (1, 2, 3, 5)
+SPLIT_YEAR = 1974
+
+
+def _masked_mean(x, m):
+    n = m.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(m, x, 0.0).sum(axis=-1) / n
+
+
+def _masked_corr(a, b, m):
+    """Pearson correlation over positions where m holds (NaN if undefined)."""
+    ma = _masked_mean(a, m)[..., None]
+    mb = _masked_mean(b, m)[..., None]
+    da = np.where(m, a - ma, 0.0)
+    db = np.where(m, b - mb, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (da * db).sum(axis=-1) / np.sqrt((da * da).sum(axis=-1) * (db * db).sum(axis=-1))
+
+
+def _statistics(x, m, years, magnitude, lags, split_year):
+    """
+    All test statistics for packed series.
+
+    Args:
+        x: Packed errors, shape (..., series, years)
+        m: Validity mask broadcastable to x (valid positions first)
+        years, magnitude: Packed year and published-value arrays (series, years)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = {}
+        n = m.sum(axis=-1)
+
+        # Runs test about the median
+        median = np.nanmedian(np.where(m, x, np.nan), axis=-1)
+        above = (x > median[..., None]) & m
+        n1 = above.sum(axis=-1)
+        n2 = n - n1
+        runs = ((above[..., 1:] != above[..., :-1]) & m[..., 1:]).sum(axis=-1) + 1
+        expected = 2.0 * n1 * n2 / n + 1
+        variance = 2.0 * n1 * n2 * (2.0 * n1 * n2 - n1 - n2) / (n ** 2 * (n - 1))
+        out['runs'] = runs
+        out['expected_runs'] = expected
+        out['runs_z'] = np.where(variance > 0, (runs - expected) / np.sqrt(np.where(variance > 0, variance, 1.0)), 0.0)
+
+        # Autocorrelation on the packed (dropna) order
+        for lag in lags:
+            if x.shape[-1] > lag:
+                out[f'autocorr_lag{lag}'] = _masked_corr(x[..., lag:], x[..., :-lag], m[..., lag:])
+            else:
+                out[f'autocorr_lag{lag}'] = np.full(n.shape, np.nan)
+
+        # Magnitude dependence
+        mg = m & ~np.isnan(magnitude)
+        out['magnitude_corr'] = _masked_corr(magnitude, np.abs(x), mg)
+
+        # Linear trend in time
+        my = _masked_mean(years, m)[..., None]
+        dy = np.where(m, years - my, 0.0)
+        dx = np.where(m, x - _masked_mean(x, m)[..., None], 0.0)
+        syy = (dy * dy).sum(axis=-1)
+        out['trend_slope'] = np.where(syy > 0, (dx * dy).sum(axis=-1) / syy, np.nan)
+        out['trend_r'] = (dx * dy).sum(axis=-1) / np.sqrt(syy * (dx * dx).sum(axis=-1))
+
+        # Period split (pooled-variance t)
+        p1 = m & (years < split_year)
+        p2 = m & (years >= split_year)
+        k1, k2 = p1.sum(axis=-1), p2.sum(axis=-1)
+        mean1, mean2 = _masked_mean(x, p1), _masked_mean(x, p2)
+        ss1 = np.where(p1, (x - mean1[..., None]) ** 2, 0.0).sum(axis=-1)
+        ss2 = np.where(p2, (x - mean2[..., None]) ** 2, 0.0).sum(axis=-1)
+        pooled = (ss1 + ss2) / (k1 + k2 - 2)
+        out['period1_mean'] = mean1
+        out['period2_mean'] = mean2
+        out['period_t'] = (mean1 - mean2) / np.sqrt(pooled * (1.0 / k1 + 1.0 / k2))
+        return out
+
+
+PERMUTED_STATISTICS = ('runs_z', 'magnitude_corr', 'trend_slope', 'period_t')
+
+
+def _permutation_counts(seed, n_perm, x, m, years, magnitude, lags, split_year, observed):
+    """Count permutations with |statistic| >= |observed| for one batch."""
+    rng = np.random.default_rng(seed)
+    keys = rng.random((n_perm,) + x.shape)
+    keys[:, ~m] = np.inf  # invalid positions stay at the tail
+    order = np.argsort(keys, axis=-1)
+    permuted = np.take_along_axis(np.broadcast_to(x, keys.shape), order, axis=-1)
+
+    perm_stats = _statistics(permuted, m, years, magnitude, lags, split_year)
+    counts = {}
+    for name, value in observed.items():
+        with np.errstate(invalid='ignore'):
+            counts[name] = (np.abs(perm_stats[name]) >= np.abs(value) - 1e-12).sum(axis=0)
+    return counts
+
+
+class ErrorTestBattery:
+    """
+    Vectorized randomness / dependence tests with permutation p-values.
+    """
+
+    def __init__(self, n_permutations: int = DEFAULT_PERMUTATIONS, seed: int = 19940101,
+                 workers: int = 1, lags: Sequence[int] = DEFAULT_LAGS,
+                 split_year: int = SPLIT_YEAR, batch_size: int = DEFAULT_BATCH):
+        self.n_permutations = n_permutations
+        self.seed = seed
+        self.workers = workers
+        self.lags = tuple(lags)
+        self.split_year = split_year
+        self.batch_size = batch_size
+
+    @staticmethod
+    def pack(errors: pd.DataFrame, magnitude: Optional[pd.DataFrame] = None):
+        """
+        Move each series' valid years to the front.
+
+        Returns:
+            x, m, years, magnitude arrays of shape (series, years)
+        """
+        x = errors.to_numpy(dtype=float).T
+        valid = ~np.isnan(x)
+        order = np.argsort(~valid, axis=1, kind='stable')
+        years = np.broadcast_to(errors.index.to_numpy(dtype=float), x.shape)
+        if magnitude is None:
+            mag = np.full(x.shape, np.nan)
+        else:
+            mag = magnitude.reindex(index=errors.index, columns=errors.columns).to_numpy(dtype=float).T
+
+        m = np.arange(x.shape[1]) < valid.sum(axis=1)[:, None]
+        return (np.take_along_axis(x, order, axis=1), m,
+                np.take_along_axis(years, order, axis=1), np.take_along_axis(mag, order, axis=1))
+
+    def run(self, errors: pd.DataFrame, magnitude: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Run every test on every series.
+
+        Args:
+            errors: Year-indexed errors (calculated − published), one column per series
+            magnitude: Published values with the same layout (for magnitude dependence)
+
+        Returns:
+            DataFrame indexed by series with statistics, analytic and permutation p-values
+        """
+        x, m, years, mag = self.pack(errors, magnitude)
+        observed = _statistics(x, m, years, mag, self.lags, self.split_year)
+
+        result = pd.DataFrame(index=errors.columns)
+        result.index.name = 'series'
+        result['n'] = m.sum(axis=1)
+        for name, value in observed.items():
+            result[name] = value
+
+        # Analytic p-values (as scipy linregress / ttest_ind)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            n = result['n'].to_numpy(dtype=float)
+            r = result['trend_r'].to_numpy()
+            t_trend = r * np.sqrt((n - 2) / (1 - r ** 2))
+            result['trend_r_squared'] = r ** 2
+            result['trend_p'] = 2 * stats.t.sf(np.abs(t_trend), n - 2)
+            k1 = (m & (years < self.split_year)).sum(axis=1)
+            k2 = (m & (years >= self.split_year)).sum(axis=1)
+            result['period_n1'] = k1
+            result['period_n2'] = k2
+            result['period_p'] = 2 * stats.t.sf(np.abs(result['period_t'].to_numpy()), k1 + k2 - 2)
+            result['runs_p'] = 2 * stats.norm.sf(np.abs(result['runs_z'].to_numpy()))
+
+        if self.n_permutations > 0:
+            tested = {name: observed[name] for name in PERMUTED_STATISTICS}
+            tested.update({f'autocorr_lag{lag}': observed[f'autocorr_lag{lag}'] for lag in self.lags})
+            for name, counts in self._permute(x, m, years, mag, tested).items():
+                p = (1.0 + counts) / (1.0 + self.n_permutations)
+                result[f'{name}_perm_p'] = np.where(np.isnan(tested[name]), np.nan, p)
+        return result
+
+    def _permute(self, x, m, years, mag, observed) -> Dict[str, np.ndarray]:
+        sizes = [self.batch_size] * (self.n_permutations // self.batch_size)
+        if self.n_permutations % self.batch_size:
+            sizes.append(self.n_permutations % self.batch_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        args = [(s, k, x, m, years, mag, self.lags, self.split_year, observed) for s, k in zip(seeds, sizes)]
+
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                parts = list(pool.map(_permutation_counts, *zip(*args)))
+        else:
+            parts = [_permutation_counts(*a) for a in args]
+
+        return {name: sum(p[name] for p in parts) for name in observed}
@@ -16,33 +16,58 @@ Key Questions to Answer:
 
 This is a critical validation step to ensure we haven't achieved "false precision"
 while missing fundamental methodology issues.
+
+The randomness, autocorrelation, magnitude and period tests run through the
+batched ErrorTestBattery over every replicated variable and every methodology
+variant of the perfect-replication grid at once, with permutation p-values.
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
+import sys
 import matplotlib.pyplot as plt
-from scipy import stats
 from scipy.stats import jarque_bera, shapiro
 import seaborn as sns
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.perfect_replication_engine import PerfectReplicationEngine
+from validation.error_test_battery import ErrorTestBattery, DEFAULT_PERMUTATIONS
+
 # Configuration
 BASE_DIR = Path("src/analysis/replication/output")
 ULTRA_PATH = BASE_DIR / "table_5_4_ultra_precise_replication.csv"
 AUTHENTIC_PATH = BASE_DIR / "table_5_4_authentic.csv"
 AUDIT_PATH = BASE_DIR / "systematic_error_audit.json"
 REPORT_PATH = BASE_DIR / "SYSTEMATIC_ERROR_AUDIT.md"
+BATTERY_PATH = BASE_DIR / "systematic_error_test_battery.csv"
+
+PRIMARY_SERIES = 'r_ultra_precise'
+
+# Replicated column -> published column(s) (first non-missing wins)
+REPLICATED_VARIABLES = {
+    'r_ultra_precise': ["r'"],
+    'r_calculated_raw': ["r'"],
+    'r_prime_calc': ["r'"],
+    'gK_ultra_precise': ['gK'],
+    's_u_ultra_precise': ["s'u", "s'«u"],
+    's_u_calc': ["s'u", "s'«u"],
+}
 
 class SystematicErrorAuditor:
     """
     Conducts comprehensive audit for systematic vs random errors.
     """
 
-    def __init__(self):
+    def __init__(self, n_permutations=DEFAULT_PERMUTATIONS, workers=1, include_variants=True):
         self.audit_findings = {}
         self.red_flags = []
         self.validation_passed = True
+        self.battery = ErrorTestBattery(n_permutations=n_permutations, workers=workers)
+        self.include_variants = include_variants
+        self.battery_results = None
 
     def load_data(self):
         """Load ultra-precise and authentic datasets."""
@@ -56,58 +81,88 @@ class SystematicErrorAuditor:
 
         return ultra_df, authentic_df
 
+    def build_error_series(self, ultra_df, authentic_df):
+        """
+        Errors (calculated − published) for every replicated variable and methodology variant.
+
+        Returns:
+            (errors, published): year-indexed DataFrames with one column per series
+        """
+        errors, published = {}, {}
+        for column, targets in REPLICATED_VARIABLES.items():
+            if column not in ultra_df.columns:
+                continue
+            pub = pd.Series(np.nan, index=authentic_df.index)
+            for target in targets:
+                if target in authentic_df.columns:
+                    pub = pub.fillna(authentic_df[target])
+            errors[column] = ultra_df[column] - pub
+            published[column] = pub
+
+        if self.include_variants:
+            engine = PerfectReplicationEngine()
+            canonical = engine.load_authentic_data()
+            variants, series, pub_arrays = engine.variant_series(canonical)
+            labels = pd.Series(['|'.join(f'{k}={v}' for k, v in row.items())
+                                for row in variants.to_dict('records')])
+            for target, values in series.items():
+                names = 'variant:' + target + ':' + labels
+                err = pd.DataFrame((values - pub_arrays[target][None, :]).T, index=canonical.index, columns=names)
+                pub = pd.DataFrame(np.repeat(pub_arrays[target][:, None], len(names), axis=1),
+                                   index=canonical.index, columns=names)
+                errors.update(err.reindex(authentic_df.index).items())
+                published.update(pub.reindex(authentic_df.index).items())
+
+        return pd.DataFrame(errors), pd.DataFrame(published)
+
+    def run_test_battery(self, ultra_df, authentic_df):
+        """Run the batched test battery over all error series."""
+        errors, published = self.build_error_series(ultra_df, authentic_df)
+        print(f"Running test battery on {errors.shape[1]} series "
+              f"({self.battery.n_permutations} permutations)...")
+
+        results = self.battery.run(errors, published)
+        results.to_csv(BATTERY_PATH)
+        self.battery_results = results
+
+        flagged = {}
+        for name in [c for c in results.columns if c.endswith('_perm_p')]:
+            flagged[name[:-len('_perm_p')]] = int((results[name] < 0.05).sum())
+        self.audit_findings['test_battery'] = {
+            'series': int(len(results)),
+            'n_permutations': self.battery.n_permutations,
+            'significant_at_5pct': flagged,
+            'results_file': str(BATTERY_PATH)
+        }
+        return results
+
+    def _primary(self, ultra_df, authentic_df):
+        """Battery row and error series for the primary profit-rate replication."""
+        if self.battery_results is None:
+            self.run_test_battery(ultra_df, authentic_df)
+        errors = ultra_df[PRIMARY_SERIES] - authentic_df['r\'']
+        return self.battery_results.loc[PRIMARY_SERIES], errors
+
     def analyze_error_patterns(self, ultra_df, authentic_df):
         """Analyze error patterns for signs of systematic bias."""
         print("Analyzing error patterns...")
 
         analysis = {}
-
-        # Focus on profit rate - our "best" result
-        r_calc = ultra_df['r_ultra_precise']
-        r_pub = authentic_df['r\'']
-        errors = r_calc - r_pub
+        tests, errors = self._primary(ultra_df, authentic_df)
+        n = int(tests['n'])
 
         # 1. Test for randomness
         analysis['randomness_tests'] = {}
 
         # Runs test for randomness
-        def runs_test(errors):
-            """Test if errors are random or show patterns."""
-            median_error = errors.median()
-            runs, n1, n2 = 0, 0, 0
-
-            # Convert to above/below median
-            above_below = errors > median_error
-
-            # Count runs
-            for i in range(len(above_below)):
-                if above_below.iloc[i]:
-                    n1 += 1
-                else:
-                    n2 += 1
-
-                if i > 0 and above_below.iloc[i] != above_below.iloc[i-1]:
-                    runs += 1
-
-            runs += 1  # Add final run
-
-            # Calculate expected runs and standard deviation
-            expected_runs = (2 * n1 * n2) / (n1 + n2) + 1
-            variance = (2 * n1 * n2 * (2 * n1 * n2 - n1 - n2)) / ((n1 + n2)**2 * (n1 + n2 - 1))
-
-            if variance > 0:
-                z_score = (runs - expected_runs) / np.sqrt(variance)
-                return runs, expected_runs, z_score, abs(z_score) < 1.96  # 95% confidence
-            else:
-                return runs, expected_runs, 0, True
-
-        if len(errors.dropna()) > 5:
-            runs, expected_runs, z_score, is_random = runs_test(errors.dropna())
+        if n > 5:
+            is_random = abs(tests['runs_z']) < 1.96  # 95% confidence
             analysis['randomness_tests']['runs_test'] = {
-                'runs': runs,
-                'expected_runs': expected_runs,
-                'z_score': z_score,
+                'runs': int(tests['runs']),
+                'expected_runs': float(tests['expected_runs']),
+                'z_score': float(tests['runs_z']),
                 'is_random': is_random,
+                'permutation_p': float(tests.get('runs_z_perm_p', np.nan)),
                 'interpretation': 'Errors appear random' if is_random else 'Errors show systematic pattern'
             }
 
@@ -125,15 +180,14 @@ class SystematicErrorAuditor:
                 analysis['randomness_tests']['normality_test'] = {'error': str(e)}
 
         # 3. Autocorrelation test (systematic errors often show correlation)
-        if len(errors.dropna()) > 3:
-            error_series = errors.dropna()
-            if len(error_series) > 1:
-                autocorr_1 = error_series.autocorr(lag=1)
-                analysis['randomness_tests']['autocorrelation'] = {
-                    'lag_1_autocorr': float(autocorr_1) if not pd.isna(autocorr_1) else 0,
-                    'is_independent': abs(autocorr_1) < 0.3 if not pd.isna(autocorr_1) else True,
-                    'interpretation': 'Errors independent' if abs(autocorr_1) < 0.3 or pd.isna(autocorr_1) else 'Errors show autocorrelation'
-                }
+        if n > 3:
+            autocorr_1 = tests['autocorr_lag1']
+            analysis['randomness_tests']['autocorrelation'] = {
+                'lag_1_autocorr': float(autocorr_1) if not pd.isna(autocorr_1) else 0,
+                'is_independent': abs(autocorr_1) < 0.3 if not pd.isna(autocorr_1) else True,
+                'permutation_p': float(tests.get('autocorr_lag1_perm_p', np.nan)),
+                'interpretation': 'Errors independent' if abs(autocorr_1) < 0.3 or pd.isna(autocorr_1) else 'Errors show autocorrelation'
+            }
 
         self.audit_findings['error_patterns'] = analysis
         return analysis
@@ -143,27 +197,18 @@ class SystematicErrorAuditor:
         print("Testing magnitude dependence...")
 
         analysis = {}
-
-        # Test profit rate errors vs magnitude
-        r_calc = ultra_df['r_ultra_precise']
+        tests, errors = self._primary(ultra_df, authentic_df)
         r_pub = authentic_df['r\'']
-        errors = r_calc - r_pub
-        abs_errors = errors.abs()
 
         # Correlate absolute errors with value magnitude
-        if len(r_pub.dropna()) > 5:
-            combined = pd.DataFrame({
-                'magnitude': r_pub,
-                'abs_error': abs_errors
-            }).dropna()
-
-            if len(combined) > 3:
-                corr_coef = combined['magnitude'].corr(combined['abs_error'])
-                analysis['magnitude_correlation'] = {
-                    'correlation': float(corr_coef) if not pd.isna(corr_coef) else 0,
-                    'is_magnitude_dependent': abs(corr_coef) > 0.5 if not pd.isna(corr_coef) else False,
-                    'interpretation': 'Errors depend on value magnitude' if abs(corr_coef) > 0.5 and not pd.isna(corr_coef) else 'Errors independent of magnitude'
-                }
+        if len(r_pub.dropna()) > 5 and tests['n'] > 3:
+            corr_coef = tests['magnitude_corr']
+            analysis['magnitude_correlation'] = {
+                'correlation': float(corr_coef) if not pd.isna(corr_coef) else 0,
+                'is_magnitude_dependent': abs(corr_coef) > 0.5 if not pd.isna(corr_coef) else False,
+                'permutation_p': float(tests.get('magnitude_corr_perm_p', np.nan)),
+                'interpretation': 'Errors depend on value magnitude' if abs(corr_coef) > 0.5 and not pd.isna(corr_coef) else 'Errors independent of magnitude'
+            }
 
         # Test if errors are proportional (percentage errors constant)
         relative_errors = (errors / r_pub * 100).dropna()
@@ -183,54 +228,42 @@ class SystematicErrorAuditor:
         print("Analyzing temporal patterns...")
 
         analysis = {}
-
-        # Profit rate temporal analysis
-        r_calc = ultra_df['r_ultra_precise']
-        r_pub = authentic_df['r\'']
-        errors = r_calc - r_pub
+        tests, _ = self._primary(ultra_df, authentic_df)
+        n = int(tests['n'])
 
         # Test for trends over time
-        if len(errors.dropna()) > 3:
-            years = errors.dropna().index
-            error_vals = errors.dropna().values
-
-            # Linear trend
-            if len(years) > 2:
-                slope, intercept, r_value, p_value, std_err = stats.linregress(years, error_vals)
-                analysis['temporal_trend'] = {
-                    'slope': float(slope),
-                    'r_squared': float(r_value**2),
-                    'p_value': float(p_value),
-                    'significant_trend': p_value < 0.05,
-                    'interpretation': f'{"Significant" if p_value < 0.05 else "No significant"} temporal trend in errors'
-                }
+        if n > 3:
+            p_value = tests['trend_p']
+            analysis['temporal_trend'] = {
+                'slope': float(tests['trend_slope']),
+                'r_squared': float(tests['trend_r_squared']),
+                'p_value': float(p_value),
+                'significant_trend': p_value < 0.05,
+                'permutation_p': float(tests.get('trend_slope_perm_p', np.nan)),
+                'interpretation': f'{"Significant" if p_value < 0.05 else "No significant"} temporal trend in errors'
+            }
 
         # Test for structural breaks (Part 1 vs Part 2)
-        part1_errors = errors[(errors.index >= 1958) & (errors.index <= 1973)].dropna()
-        part2_errors = errors[(errors.index >= 1974) & (errors.index <= 1989)].dropna()
-
-        if len(part1_errors) > 2 and len(part2_errors) > 2:
-            # Two-sample t-test
-            t_stat, p_val = stats.ttest_ind(part1_errors, part2_errors)
+        if tests['period_n1'] > 2 and tests['period_n2'] > 2:
+            p_val = tests['period_p']
             analysis['structural_break'] = {
-                'part1_mean_error': float(part1_errors.mean()),
-                'part2_mean_error': float(part2_errors.mean()),
-                't_statistic': float(t_stat),
+                'part1_mean_error': float(tests['period1_mean']),
+                'part2_mean_error': float(tests['period2_mean']),
+                't_statistic': float(tests['period_t']),
                 'p_value': float(p_val),
                 'significant_break': p_val < 0.05,
+                'permutation_p': float(tests.get('period_t_perm_p', np.nan)),
                 'interpretation': f'{"Significant" if p_val < 0.05 else "No significant"} difference between periods'
             }
 
-        # Test for cyclical patterns
-        if len(errors.dropna()) > 10:
-            # Simple test: correlation with lagged errors
-            error_series = errors.dropna()
+        # Test for cyclical patterns: correlation with lagged errors
+        if n > 10:
             lags_to_test = [2, 3, 5]  # Business cycle type lags
             cyclical_correlations = {}
 
             for lag in lags_to_test:
-                if len(error_series) > lag:
-                    lagged_corr = error_series.corr(error_series.shift(lag))
+                if n > lag:
+                    lagged_corr = tests[f'autocorr_lag{lag}']
                     cyclical_correlations[f'lag_{lag}'] = float(lagged_corr) if not pd.isna(lagged_corr) else 0
 
             analysis['cyclical_patterns'] = {
@@ -471,6 +504,7 @@ differences may not be simple rounding errors. Further investigation is required
 - Statistical tests applied with appropriate confidence levels
 - Cross-validation performed using alternative calculation methods
 - Temporal and magnitude dependence tested systematically
+- Test battery with permutation p-values run across all replicated variables and methodology variants (`systematic_error_test_battery.csv`)
 
 This audit ensures we distinguish between acceptable measurement precision
 and unacceptable systematic errors.
@@ -491,6 +525,7 @@ and unacceptable systematic errors.
         ultra_df, authentic_df = self.load_data()
 
         # Run audit analyses
+        self.run_test_battery(ultra_df, authentic_df)
         self.analyze_error_patterns(ultra_df, authentic_df)
         self.test_magnitude_dependence(ultra_df, authentic_df)
         self.analyze_temporal_patterns(ultra_df, authentic_df)
@@ -533,7 +568,16 @@ and unacceptable systematic errors.
 
 def main():
     """Main execution."""
-    auditor = SystematicErrorAuditor()
+    parser = argparse.ArgumentParser(description="Systematic error audit")
+    parser.add_argument("--permutations", type=int, default=DEFAULT_PERMUTATIONS,
+                        help="Permutation resamples per test (0 = analytic p-values only)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for permutations")
+    parser.add_argument("--no-variants", action="store_true",
+                        help="Test only the replicated variables, not the methodology-variant grid")
+    args = parser.parse_args()
+
+    auditor = SystematicErrorAuditor(n_permutations=args.permutations, workers=args.workers,
+                                     include_variants=not args.no_variants)
     findings, validation_passed = auditor.run_systematic_audit()
 
     return findings, validation_passed
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Table 5.4 Variant Diff
+======================
+
+Answers "which file changed which number" across the overlapping Table 5.4
+variants (authentic, calculated, consolidated, perfect, perfect_replication,
+ultra_precise, reconstructed, complete, ...).
+
+Method:
+- Every numeric column of every variant file is a source, labelled
+  "<file stem>:<column>". Column names are mapped to canonical variables
+  through ALIASES (e.g. r', r_perfect, original_r', r_ultra_precise -> r');
+  the prefix 'original_' and suffixes '_raw'/'_calc' are stripped before
+  lookup, and unmapped names are their own canonical variable.
+- All sources are aligned on year in one (sources × years) array. The
+  difference matrices of every same-variable source pair are computed in
+  a single gather-and-subtract over the pair index arrays.
+- Two values disagree when |a − b| > atol + rtol × max(|a|, |b|).
+
+Outputs (default: src/analysis/replication/output):
+- TABLE_5_4_VARIANT_DIFF.md: per-variable summary and the disagreeing cells
+  with the sources grouped by value
+- table_5_4_variant_pairs.csv: per source pair overlap and disagreement stats
+- table_5_4_variant_cells.csv: one row per source value in a disagreeing cell
+
+Usage:
+    python src/validation/table_variant_diff.py [paths ...] [--atol 0.0005]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.table_5_4_loader import canonicalize
+
+DEFAULT_PATHS = [Path("data/historical/processed")]
+OUT_DIR = Path("src/analysis/replication/output")
+REPORT_PATH = OUT_DIR / "TABLE_5_4_VARIANT_DIFF.md"
+PAIRS_PATH = OUT_DIR / "table_5_4_variant_pairs.csv"
+CELLS_PATH = OUT_DIR / "table_5_4_variant_cells.csv"
+
+# Canonical variable -> column names used for it across the variant files
+ALIASES: Dict[str, List[str]] = {
+    "r'": ["r'", "r_published", "r_perfect", "r_ultra_precise", "r_calculated_raw", "r_sp_over_Ku",
+           "r_prime_calc", "rate_of_profit", "calculated_rate_of_profit"],
+    "r_textbook": ["r_calc"],
+    "gK": ["gK", "gK_published", "gK_perfect", "gK_ultra_precise"],
+    "s'u": ["s'u", "s'«u", "s_u_calc", "s_u_calc_perfect", "s_u_ultra_precise"],
+    "s'": ["s'", "rate_of_surplus_value", "calculated_rate_of_surplus_value"],
+    "c'": ["c'", "organic_composition", "calculated_organic_composition"],
+    "u": ["u", "u_corrected", "capacity_utilization", "calculated_capacity_utilization"],
+    "K_unified": ["K_unified", "K_star", "capital_stock", "calculated_capital_stock"],
+    "V_from_SP": ["V_from_SP", "V_from_SP_perfect"],
+    "C_from_SP": ["C_from_SP", "C_from_SP_perfect"],
+    "V_from_S": ["V_from_S", "V_from_S_perfect"],
+    "C_from_S": ["C_from_S", "C_from_S_perfect"],
+}
+STRIP_PREFIXES = ("original_",)
+STRIP_SUFFIXES = ("_raw", "_calc")
+
+_LOOKUP = {name: canonical for canonical, names in ALIASES.items() for name in names}
+
+
+def canonical_name(column: str) -> str:
+    """Canonical variable for a column name."""
+    if column in _LOOKUP:
+        return _LOOKUP[column]
+    base = column
+    for prefix in STRIP_PREFIXES:
+        if base.startswith(prefix):
+            base = base[len(prefix):]
+    for suffix in STRIP_SUFFIXES:
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+    return _LOOKUP.get(base, base)
+
+
+def load_variant(path: Path) -> Optional[pd.DataFrame]:
+    """Year-indexed numeric frame of one variant file (None if not year-keyed)."""
+    df = pd.read_csv(path)
+    if "year" in df.columns:
+        df = df.set_index("year")
+    else:
+        # Variables-as-rows layout (e.g. the raw merged table)
+        df = df.set_index(df.columns[0])
+        try:
+            df = canonicalize(df)
+        except (TypeError, ValueError):
+            return None
+    df = df[pd.to_numeric(pd.Series(df.index), errors="coerce").notna().to_numpy()]
+    df.index = df.index.astype(int)
+    df = df.apply(pd.to_numeric, errors="coerce").dropna(axis=1, how="all")
+    return df if len(df.columns) else None
+
+
+class TableVariantDiff:
+    """
+    Aligns Table 5.4 variants on year and diffs every same-variable source pair.
+    """
+
+    def __init__(self, atol: float = 1e-9, rtol: float = 1e-9):
+        self.atol = atol
+        self.rtol = rtol
+
+    def load(self, paths: Sequence[Path]) -> Dict[str, pd.DataFrame]:
+        """Variant name -> frame for all CSVs in the given files/directories."""
+        variants = {}
+        for path in paths:
+            path = Path(path)
+            files = sorted(path.glob("*.csv")) if path.is_dir() else [path]
+            for f in files:
+                df = load_variant(f)
+                if df is not None:
+                    variants[f.stem] = df
+        return variants
+
+    def align(self, variants: Dict[str, pd.DataFrame]):
+        """
+        Stack all sources on a common year axis.
+
+        Returns:
+            values (sources × years), sources DataFrame (source, file, column, variable), years
+        """
+        years = pd.Index(sorted(set().union(*[set(df.index) for df in variants.values()])))
+        rows, arrays = [], []
+        for name, df in variants.items():
+            aligned = df.groupby(level=0).first().reindex(years)
+            for col in aligned.columns:
+                rows.append({"source": f"{name}:{col}", "file": name, "column": col,
+                             "variable": canonical_name(str(col))})
+                arrays.append(aligned[col].to_numpy(dtype=float))
+        sources = pd.DataFrame(rows)
+        values = np.vstack(arrays) if arrays else np.empty((0, len(years)))
+
+        # Group sources of the same variable together
+        order = np.argsort(sources["variable"].to_numpy(), kind="stable")
+        return values[order], sources.iloc[order].reset_index(drop=True), years
+
+    def _differs(self, a, b):
+        with np.errstate(invalid="ignore"):
+            return np.abs(a - b) > self.atol + self.rtol * np.maximum(np.abs(a), np.abs(b))
+
+    def compare(self, variants: Dict[str, pd.DataFrame]):
+        """
+        Diff all variants.
+
+        Returns:
+            (pairs, cells, sources): pair statistics, long table of values in
+            disagreeing cells, and the source catalogue
+        """
+        values, sources, years = self.align(variants)
+        codes = pd.factorize(sources["variable"])[0]
+        year_values = years.to_numpy()
+
+        # Every same-variable pair at once: (pairs × years) difference matrix
+        ii, jj = np.triu_indices(len(sources), 1)
+        same = codes[ii] == codes[jj]
+        ii, jj = ii[same], jj[same]
+        a, b = values[ii], values[jj]
+        both = ~np.isnan(a) & ~np.isnan(b)
+        diff = np.where(both, b - a, np.nan)
+        differs = both & self._differs(a, b)
+        abs_diff = np.abs(np.nan_to_num(diff))
+
+        n_common = both.sum(axis=1)
+        pairs = pd.DataFrame({
+            "variable": sources["variable"].to_numpy()[ii],
+            "source_a": sources["source"].to_numpy()[ii],
+            "source_b": sources["source"].to_numpy()[jj],
+            "n_common": n_common,
+            "only_in_a": (~np.isnan(a) & np.isnan(b)).sum(axis=1),
+            "only_in_b": (np.isnan(a) & ~np.isnan(b)).sum(axis=1),
+            "n_disagree": differs.sum(axis=1),
+            "max_abs_diff": np.where(n_common > 0, abs_diff.max(axis=1), np.nan),
+            "mean_abs_diff": np.where(n_common > 0, abs_diff.sum(axis=1) / np.maximum(n_common, 1), np.nan),
+            "disagree_years": [" ".join(str(y) for y in year_values[row]) for row in differs],
+        })
+
+        # Per (variable, year) spread across sources via segment reductions
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], int)
+        with np.errstate(invalid="ignore"):
+            high = np.fmax.reduceat(values, starts, axis=0) if len(starts) else values
+            low = np.fmin.reduceat(values, starts, axis=0) if len(starts) else values
+        spread = high - low
+        disagree_cell = self._differs(low, high)
+
+        cell_rows = []
+        for g, y in zip(*np.nonzero(disagree_cell)):
+            members = np.arange(starts[g], starts[g + 1] if g + 1 < len(starts) else len(sources))
+            vals = values[members, y]
+            present = ~np.isnan(vals)
+            median = float(np.median(vals[present]))
+            for m, v in zip(members[present], vals[present]):
+                cell_rows.append({
+                    "variable": sources.at[m, "variable"],
+                    "year": int(year_values[y]),
+                    "source": sources.at[m, "source"],
+                    "value": float(v),
+                    "cell_median": median,
+                    "deviation": float(v - median),
+                    "spread": float(spread[g, y]),
+                    "deviates": bool(self._differs(np.array([v]), np.array([median]))[0]),
+                })
+        cells = pd.DataFrame(cell_rows, columns=["variable", "year", "source", "value", "cell_median",
+                                                 "deviation", "spread", "deviates"])
+        return pairs, cells, sources
+
+    def report(self, pairs: pd.DataFrame, cells: pd.DataFrame, sources: pd.DataFrame,
+               max_cells: int = 10) -> str:
+        """Compact markdown report of where the variants disagree."""
+        lines = [
+            "# TABLE 5.4 VARIANT DIFF",
+            "",
+            f"- Files: {sources['file'].nunique()}; sources (file:column): {len(sources)}; "
+            f"canonical variables: {sources['variable'].nunique()}",
+            f"- Disagreement: |a − b| > {self.atol:g} + {self.rtol:g} × max(|a|, |b|)",
+            "",
+            "| Variable | Sources | Pairs compared | Pairs disagreeing | Cells disagreeing | Max spread |",
+            "|---|---|---|---|---|---|",
+        ]
+        by_var = pairs.groupby("variable")
+        for var, group in sources.groupby("variable"):
+            p = by_var.get_group(var) if var in by_var.groups else pairs.iloc[0:0]
+            compared = p[p["n_common"] > 0]
+            c = cells[cells["variable"] == var]
+            lines.append(
+                f"| {var} | {len(group)} | {len(compared)} | {int((compared['n_disagree'] > 0).sum())} | "
+                f"{c[['year']].drop_duplicates().shape[0]} | {c['spread'].max() if len(c) else 0:.6g} |"
+            )
+
+        for var, c in cells.groupby("variable"):
+            lines.extend(["", f"## {var}", ""])
+            top = c.drop_duplicates("year").nlargest(max_cells, "spread")["year"]
+            for year in sorted(top):
+                cell = c[c["year"] == year]
+                groups = cell.groupby("value")["source"].apply(lambda s: ", ".join(s))
+                lines.append(f"- {year}: " + " | ".join(f"{v:.6g} [{s}]" for v, s in groups.items()))
+            hidden = c["year"].nunique() - len(top)
+            if hidden > 0:
+                lines.append(f"- ... {hidden} more years (see {CELLS_PATH.name})")
+        return "\n".join(lines) + "\n"
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(description="Diff Table 5.4 variants on canonical variables")
+    parser.add_argument("paths", nargs="*", type=Path, default=DEFAULT_PATHS,
+                        help="Variant CSV files or directories (default: data/historical/processed)")
+    parser.add_argument("--atol", type=float, default=1e-9, help="Absolute tolerance")
+    parser.add_argument("--rtol", type=float, default=1e-9, help="Relative tolerance")
+    parser.add_argument("--out", type=Path, default=OUT_DIR, help="Output directory")
+    args = parser.parse_args()
+    missing = [str(p) for p in args.paths if not p.exists()]
+    if missing:
+        parser.error(f"no such file or directory: {', '.join(missing)}")
+
+    differ = TableVariantDiff(atol=args.atol, rtol=args.rtol)
+    variants = differ.load(args.paths)
+    if not variants:
+        parser.error("no Table 5.4 variant CSVs found in " + ", ".join(str(p) for p in args.paths))
+    print(f"Loaded {len(variants)} variants")
+    pairs, cells, sources = differ.compare(variants)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    pairs.to_csv(args.out / PAIRS_PATH.name, index=False)
+    cells.to_csv(args.out / CELLS_PATH.name, index=False)
+    (args.out / REPORT_PATH.name).write_text(differ.report(pairs, cells, sources), encoding="utf-8")
+
+    disagreeing = pairs[pairs["n_disagree"] > 0]
+    print(f"{len(pairs)} source pairs compared; {len(disagreeing)} disagree in at least one year")
+    print(f"Report: {args.out / REPORT_PATH.name}")
+    return pairs, cells
+
+
+if __name__ == "__main__":
+    main()
@@ -14,15 +14,23 @@ Checks included:
 4) Internal consistency of c' and s' via V_from_SP and C_from_SP
    - s' ≈ SP / V_from_SP; c' ≈ C_from_SP / V_from_SP
 
+The checks are entries of the shared registry in core/identity_checks.py;
+the same registry is also run over the other Table 5.4 variants in one pass.
+
 Outputs:
 - src/analysis/replication/output/TEXTUAL_CHECKS_SUMMARY.json
 - src/analysis/replication/output/TEXTUAL_CHECKS_SUMMARY.md
+- src/analysis/replication/output/IDENTITY_CHECKS_BY_DATASET.csv
 """
 
 from pathlib import Path
 import json
+import sys
 import pandas as pd
-import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.table_5_4_loader import load_table_5_4
+from core.identity_checks import IdentityEngine
 
 OUT_DIR = Path("src/analysis/replication/output")
 RAW_PATH = OUT_DIR / "table_5_4_authentic_raw_merged.csv"
@@ -30,94 +38,58 @@ CALC_PATH = OUT_DIR / "table_5_4_authentic_calculated.csv"
 MD_OUT = OUT_DIR / "TEXTUAL_CHECKS_SUMMARY.md"
 JSON_OUT = OUT_DIR / "TEXTUAL_CHECKS_SUMMARY.json"
 ALIGN_MD = OUT_DIR / "BOOK_TEXT_ALIGNMENT.md"
+BY_DATASET_OUT = OUT_DIR / "IDENTITY_CHECKS_BY_DATASET.csv"
 
 
-def _mae_max(a: pd.Series, b: pd.Series) -> dict:
-    diff = a - b
-    common = diff.dropna()
-    if len(common) == 0:
-        return {"observations": 0}
-    return {
-        "observations": int(len(common)),
-        "mae": float(common.abs().mean()),
-        "max_abs_err": float(common.abs().max())
-    }
+# Output key -> identity name in core.identity_checks.IDENTITIES
+CHECK_LAYOUT = {
+    "s_u_identity": {"s'u_vs_s'x_u": "s_u_part1", "s'«u_vs_s'x_u": "s_u_part2"},
+    "r_prime_vs_SP_over_Ku": "r_sp_over_Ku",
+    "gK_vs_I_over_K": "gK_I_over_K",
+    "s_prime_vs_SP_over_V_from_SP": "s_prime_SP_over_V",
+    "c_prime_vs_C_over_V_from_SP": "c_prime_C_over_V",
+    "s_prime_vs_1_minus_c_prime": "s_prime_1_minus_c_prime",
+}
+
+# Other Table 5.4 variants checked against the full registry in the same pass
+VARIANT_PATHS = {
+    "perfect_replication": OUT_DIR / "table_5_4_perfect_replication.csv",
+    "ultra_precise": OUT_DIR / "table_5_4_ultra_precise_replication.csv",
+    "authentic_final": OUT_DIR / "table_5_4_authentic.csv",
+}
 
 
 def main() -> None:
-    raw = pd.read_csv(RAW_PATH, index_col=0).T
-    raw.index.name = "year"
-    raw.index = raw.index.astype(int)
+    raw = load_table_5_4(RAW_PATH)
 
     calc = pd.read_csv(CALC_PATH)
     if 'year' in calc.columns:
         calc = calc.set_index('year')
 
+    # Book values from the raw table, derived columns from the calculated table
+    authentic = calc.copy()
+    for col in raw.columns:
+        authentic[col] = raw[col]
+
+    datasets = {"authentic": authentic}
+    for name, path in VARIANT_PATHS.items():
+        if path.exists():
+            datasets[name] = pd.read_csv(path, index_col='year')
+
+    engine = IdentityEngine()
+    results = engine.evaluate(datasets)
+    results.assign(columns=results["columns"].map(json.dumps)).to_csv(BY_DATASET_OUT, index=False)
+
     # Prepare containers
-    summary = {"checks": {}, "notes": []}
-
-    # 1) s'u identity across parts vs s'×u
-    if all(col in calc.columns for col in ["s_u_calc"]):
-        # Part 1 label: s'u; Part 2 label: s'«u
-        results = {}
-        if "s'u" in raw.columns:
-            m = _mae_max(raw["s'u"], calc["s_u_calc"])  # type: ignore
-            results["s'u_vs_s'x_u"] = m
-        if "s'«u" in raw.columns:
-            m = _mae_max(raw["s'«u"], calc["s_u_calc"])  # type: ignore
-            results["s'«u_vs_s'x_u"] = m
-        if results:
-            summary["checks"]["s_u_identity"] = results
-
-    # 2) Profit rate candidate: r' vs SP/(K_unified × u)
-    if all(col in calc.columns for col in ["r_sp_over_Ku"]) and "r'" in raw.columns:
-        m = _mae_max(raw["r'"], calc["r_sp_over_Ku"])  # type: ignore
-        summary["checks"]["r_prime_vs_SP_over_Ku"] = m
-
-    # 3) Investment-capital ratio: gK ≈ I / K_unified (or I! if present)
-    # Heuristic: text references In/K*, while we have I or I!; definitions may differ.
-    if "gK" in raw.columns and "K_unified" in calc.columns:
-        inv_col = None
-        if "I" in raw.columns:
-            inv_col = "I"
-        elif "I!" in raw.columns:
-            inv_col = "I!"
-        if inv_col is not None:
-            with np.errstate(divide='ignore', invalid='ignore'):
-                ratio = raw[inv_col] / calc["K_unified"]
-            # Compare only where both are present
-            common_idx = ratio.dropna().index.intersection(raw["gK"].dropna().index)  # type: ignore
-            if len(common_idx) > 0:
-                diff = raw.loc[common_idx, "gK"] - ratio.loc[common_idx]
-                summary["checks"]["gK_vs_I_over_K"] = {
-                    "observations": int(len(common_idx)),
-                    "mae": float(diff.abs().mean()),
-                    "max_abs_err": float(diff.abs().max()),
-                    "investment_column": inv_col
-                }
-            summary["notes"].append(
-                "gK vs I/K_unified is heuristic; the text refers to In/K* (net investment, specific capital measure)."
-            )
-
-    # 4) Internal consistency of s' and c' via V_from_SP and C_from_SP
-    if all(col in calc.columns for col in ["V_from_SP"]) and "s'" in raw.columns:
-        with np.errstate(divide='ignore', invalid='ignore'):
-            s_from_sp = calc["SP"] / calc["V_from_SP"] if "SP" in calc.columns else np.nan
-        if isinstance(s_from_sp, pd.Series):
-            m = _mae_max(raw["s'"], s_from_sp)
-            summary["checks"]["s_prime_vs_SP_over_V_from_SP"] = m
-
-    if all(col in calc.columns for col in ["V_from_SP", "C_from_SP"]) and "c'" in raw.columns:
-        with np.errstate(divide='ignore', invalid='ignore'):
-            c_from_sp = calc["C_from_SP"] / calc["V_from_SP"]
-        m = _mae_max(raw["c'"], c_from_sp)
-        summary["checks"]["c_prime_vs_C_over_V_from_SP"] = m
-
-    # 5) s' vs (1 - c') relationship noted in book text (warning: may depend on conventions)
-    if all(col in raw.columns for col in ["s'", "c'"]):
-        one_minus_c = 1.0 - raw["c'"]
-        m = _mae_max(raw["s'"], one_minus_c)
-        summary["checks"]["s_prime_vs_1_minus_c_prime"] = m
+    summary = {"checks": engine.summarize(authentic, CHECK_LAYOUT, "authentic", results), "notes": []}
+
+    # gK ≈ I / K_unified: heuristic; text references In/K*, while we have I or I!
+    if "gK_vs_I_over_K" in summary["checks"]:
+        row = results[(results["dataset"] == "authentic") & (results["identity"] == "gK_I_over_K")].iloc[0]
+        summary["checks"]["gK_vs_I_over_K"]["investment_column"] = row["columns"]["I_book"]
+        summary["notes"].append(
+            "gK vs I/K_unified is heuristic; the text refers to In/K* (net investment, specific capital measure)."
+        )
 
     # Write outputs
     JSON_OUT.write_text(json.dumps(summary, indent=2), encoding="utf-8")
@@ -183,6 +155,7 @@ def main() -> None:
     print(f"Wrote textual checks JSON: {JSON_OUT}")
     print(f"Wrote textual checks MD: {MD_OUT}")
     print(f"Wrote text alignment MD: {ALIGN_MD}")
+    print(f"Wrote identity checks by dataset: {BY_DATASET_OUT}")
 
 
 if __name__ == "__main__":
@@ -13,10 +13,14 @@ Outputs:
 """
 
 from pathlib import Path
+import sys
 import pandas as pd
 import numpy as np
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from core.table_5_4_loader import load_table_5_4
+
 OUT_DIR = Path("src/analysis/replication/output")
 RAW_PATH = OUT_DIR / "table_5_4_authentic_raw_merged.csv"
 FINAL_PATH = OUT_DIR / "table_5_4_authentic.csv"
@@ -38,10 +42,8 @@ def _normalize_numeric(s: pd.Series) -> pd.Series:
 
 
 def main() -> None:
-    # Load raw (variables-as-rows) then transpose to years × variables
-    raw = pd.read_csv(RAW_PATH, index_col=0).T
-    raw.index.name = "year"
-    raw.index = raw.index.astype(int)
+    # Canonical years × variables frame of the raw (variables-as-rows) table
+    raw = load_table_5_4(RAW_PATH)
 
     final_df = pd.read_csv(FINAL_PATH)
     if "year" in final_df.columns:
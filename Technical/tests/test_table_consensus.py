@@ -0,0 +1,52 @@
+"""Suspect-zero voting of table_consensus on synthetic candidates."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from extraction.table_consensus import Candidate, TableConsensus
+
+
+def grid(u_1973, years=("1971", "1972", "1973")):
+    """Raw grid with a header row, an SP row and a u row; u's 1973 cell is u_1973."""
+    cells = {"1971": "1.0", "1972": "2.0", "1973": u_1973}
+    return pd.DataFrame([
+        ["", *years],
+        ["SP", *("5.0" for _ in years)],
+        ["u", *(cells[y] for y in years)],
+    ])
+
+
+def test_blank_reads_outweigh_a_zero():
+    # One extractor reads the blank printed cell as 0.0, two read it blank
+    result = TableConsensus().merge([
+        Candidate("a", grid("0")),
+        Candidate("b", grid("")),
+        Candidate("c", grid("")),
+    ])
+    assert np.isnan(result.values.loc["u", "1973"])
+    assert result.suspect_zeros == [{"candidate": "a", "row": "u", "column": "1973"}]
+    assert result.values.loc["u", "1972"] == 2.0
+
+
+def test_zero_outweighing_the_blank_is_kept():
+    result = TableConsensus().merge([
+        Candidate("a", grid("0")),
+        Candidate("b", grid("0")),
+        Candidate("c", grid("")),
+    ])
+    assert result.values.loc["u", "1973"] == 0.0
+    assert result.suspect_zeros == []
+
+
+def test_candidate_without_the_column_does_not_vote():
+    # b lacks the 1973 column, so it says nothing about that cell
+    result = TableConsensus().merge([
+        Candidate("a", grid("0")),
+        Candidate("b", grid("", years=("1971", "1972"))),
+    ])
+    assert result.values.loc["u", "1973"] == 0.0
+    assert result.suspect_zeros == []